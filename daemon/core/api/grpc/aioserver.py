@@ -0,0 +1,266 @@
+"""
+Asyncio based gRPC server, streaming RPCs are ran as coroutines within the event
+loop, while all other RPCs are ran within a bounded thread pool.
+"""
+
+import asyncio
+import logging
+import sys
+from concurrent import futures
+from typing import AsyncIterable, AsyncIterator, Optional
+
+import grpc
+from grpc.aio import ServicerContext
+
+from core.api.grpc import core_pb2, core_pb2_grpc, grpcutils
+from core.api.grpc.events import AsyncEventStreamer
+from core.api.grpc.server import CoreGrpcServer
+from core.api.grpc.throughputs import DEFAULT_INTERVAL
+from core.emulator.coreemu import CoreEmu
+from core.emulator.session import Session
+from core.errors import CoreCommandError, CoreError
+from core.nodes.base import CoreNode, NodeBase
+
+logger = logging.getLogger(__name__)
+# max threads for running non streaming rpcs
+_MAX_WORKERS: int = 32
+
+
+class AsyncCoreGrpcServer(CoreGrpcServer):
+    """
+    Create AsyncCoreGrpcServer instance
+
+    :param coreemu: coreemu object
+    :param max_workers: max threads used to run non streaming rpcs
+    """
+
+    def __init__(self, coreemu: CoreEmu, max_workers: int = _MAX_WORKERS) -> None:
+        super().__init__(coreemu)
+        self.max_workers: int = max_workers
+        self.executor: Optional[futures.ThreadPoolExecutor] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _signal_handler(self, signal_number: int, _) -> None:
+        logger.info("caught signal: %s", signal_number)
+        self.coreemu.shutdown()
+        self.running = False
+        sys.exit(signal_number)
+
+    def _is_running(self, context: ServicerContext) -> bool:
+        # sync handlers ran within the migration thread pool are provided a
+        # context without is_active, cancelled streams end on their next write,
+        # streams needing to stop work once cancelled are ran as coroutines
+        return self.running
+
+    def listen(self, address: str) -> None:
+        try:
+            asyncio.run(self.serve(address))
+        except KeyboardInterrupt:
+            pass
+
+    async def serve(self, address: str) -> None:
+        """
+        Start the server and wait for it to terminate.
+
+        :param address: address to listen on
+        :return: nothing
+        """
+        logger.info("CORE asyncio gRPC API listening on: %s", address)
+        self.loop = asyncio.get_running_loop()
+        self.executor = futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        self.server = grpc.aio.server(migration_thread_pool=self.executor)
+        core_pb2_grpc.add_CoreApiServicer_to_server(self, self.server)
+        self.server.add_insecure_port(address)
+        await self.server.start()
+        self.throughputs.start()
+        try:
+            await self.server.wait_for_termination()
+        finally:
+            await self.server.stop(None)
+            self.executor.shutdown(wait=False)
+
+    def stop(self) -> None:
+        """
+        Stop the server, from outside of the event loop.
+
+        :return: nothing
+        """
+        self.running = False
+        self.throughputs.stop()
+        if self.loop and self.server:
+            future = asyncio.run_coroutine_threadsafe(self.server.stop(None), self.loop)
+            future.result()
+
+    async def get_session_async(
+        self, session_id: int, context: ServicerContext
+    ) -> Session:
+        """
+        Retrieve session given the session id, within a coroutine.
+
+        :param session_id: session id
+        :param context: grpc context
+        :return: session
+        :raises Exception: raises grpc exception when session does not exist
+        """
+        session = self.coreemu.sessions.get(session_id)
+        if not session:
+            await context.abort(
+                grpc.StatusCode.NOT_FOUND, f"session {session_id} not found"
+            )
+        return session
+
+    async def Events(
+        self, request: core_pb2.EventsRequest, context: ServicerContext
+    ) -> AsyncIterator[core_pb2.Event]:
+        session = await self.get_session_async(request.session_id, context)
+        event_types = set(request.events)
+        if not event_types:
+            event_types = set(core_pb2.EventType.Enum.values())
+        window = request.batch_window / 1000
+        node_cache = self.get_node_cache(session)
+        streamer = AsyncEventStreamer(
+            session,
+            event_types,
+            self.loop,
+            node_cache,
+            request.node_ids,
+            request.network_ids,
+            request.link_types,
+        )
+        try:
+            while self.running:
+                if window > 0:
+                    event = await streamer.process_batch_async(window)
+                else:
+                    event = await streamer.process_async()
+                if event:
+                    yield event
+        finally:
+            streamer.remove_handlers()
+        await context.abort(grpc.StatusCode.CANCELLED, "server stopping")
+
+    async def Throughputs(
+        self, request: core_pb2.ThroughputsRequest, context: ServicerContext
+    ) -> AsyncIterator[core_pb2.ThroughputsEvent]:
+        session = await self.get_session_async(request.session_id, context)
+        interval = request.interval or DEFAULT_INTERVAL
+        interval = max(interval, self.throughputs.interval)
+        self.throughputs.start()
+        while self.running:
+            await asyncio.sleep(interval)
+            yield self.throughputs.get_throughputs(session, interval)
+
+    async def CpuUsage(
+        self, request: core_pb2.CpuUsageRequest, context: ServicerContext
+    ) -> AsyncIterator[core_pb2.CpuUsageEvent]:
+        cpu_usage = grpcutils.CpuUsage()
+        while self.running:
+            usage = cpu_usage.run()
+            yield core_pb2.CpuUsageEvent(usage=usage)
+            await asyncio.sleep(request.delay)
+
+    async def NodeCommandStream(
+        self, request: core_pb2.NodeCommandStreamRequest, context: ServicerContext
+    ) -> AsyncIterator[core_pb2.NodeCommandStreamResponse]:
+        session = await self.get_session_async(request.session_id, context)
+        try:
+            node = session.get_node(request.node_id, CoreNode)
+        except CoreError as e:
+            await context.abort(grpc.StatusCode.NOT_FOUND, str(e))
+        try:
+            stream = node.cmd_stream(request.command, request.shell)
+        except (CoreError, CoreCommandError) as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        # output is read within the event loop as it becomes available, None is
+        # queued for each closed pipe
+        queue = asyncio.Queue()
+
+        def read(fd: int) -> None:
+            is_stderr = stream.is_stderr(fd)
+            data = stream.read_fd(fd)
+            if data is None:
+                self.loop.remove_reader(fd)
+                queue.put_nowait(None)
+            elif data:
+                queue.put_nowait((is_stderr, data))
+
+        fds = stream.fds()
+        for fd in fds:
+            self.loop.add_reader(fd, read, fd)
+        try:
+            remaining = len(fds)
+            while remaining:
+                output = await queue.get()
+                if output is None:
+                    remaining -= 1
+                else:
+                    yield grpcutils.convert_command_output(*output)
+            return_code = await self.loop.run_in_executor(self.executor, stream.wait)
+            yield core_pb2.NodeCommandStreamResponse(
+                exited=True, return_code=return_code
+            )
+        finally:
+            for fd in stream.fds():
+                self.loop.remove_reader(fd)
+            await self.loop.run_in_executor(self.executor, stream.close)
+
+    async def NodesCommand(
+        self, request: core_pb2.NodesCommandRequest, context: ServicerContext
+    ) -> AsyncIterator[core_pb2.NodesCommandResponse]:
+        session = await self.get_session_async(request.session_id, context)
+        nodes = []
+        for node_id in request.node_ids:
+            try:
+                nodes.append(session.get_node(node_id, CoreNode))
+            except CoreError as e:
+                await context.abort(grpc.StatusCode.NOT_FOUND, str(e))
+        workers = self.get_command_workers(request)
+        executor = futures.ThreadPoolExecutor(max_workers=workers)
+        node_futures = [
+            self.loop.run_in_executor(executor, self.run_node_cmds, x, request)
+            for x in nodes
+        ]
+        try:
+            for future in asyncio.as_completed(node_futures):
+                yield await future
+        finally:
+            # cancelled streams cancel commands for nodes yet to be ran
+            for future in node_futures:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def MoveNodes(
+        self,
+        request_iterator: AsyncIterable[core_pb2.MoveNodesRequest],
+        context: ServicerContext,
+    ) -> core_pb2.MoveNodesResponse:
+        async for request in request_iterator:
+            if request.HasField("positions") or request.HasField("geos"):
+                session = await self.get_session_async(request.session_id, context)
+                try:
+                    await self.loop.run_in_executor(
+                        self.executor, self.set_nodes_positions, session, request
+                    )
+                except CoreError as e:
+                    await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+                continue
+            geo = request.geo if request.HasField("geo") else None
+            position = request.position if request.HasField("position") else None
+            if not geo and not position:
+                raise CoreError("move node must provide a geo or position to move")
+            session = await self.get_session_async(request.session_id, context)
+            try:
+                node = session.get_node(request.node_id, NodeBase)
+            except CoreError as e:
+                await context.abort(grpc.StatusCode.NOT_FOUND, str(e))
+            # moving nodes may result in link changes, ran within the executor
+            await self.loop.run_in_executor(
+                self.executor,
+                self.set_node_position,
+                session,
+                node,
+                geo,
+                position,
+                request.source,
+            )
+        return core_pb2.MoveNodesResponse()
@@ -0,0 +1,84 @@
+"""
+Helpers for transferring files over grpc streams in chunks, optionally zlib
+compressed, so files of any size are transferred in bounded memory.
+"""
+
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+from core.errors import CoreError
+
+CHUNK_SIZE: int = 64 * 1024
+
+
+def read_chunks(
+    file_path: Path, compress: bool = False, size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Read a file in chunks, at least one chunk is always provided, even for
+    empty files.
+
+    :param file_path: path of file to read
+    :param compress: True to zlib compress chunks as a single stream
+    :param size: max number of file bytes read for each chunk
+    :return: iterator of file chunks
+    """
+    compressor = zlib.compressobj() if compress else None
+    sent = False
+    with file_path.open("rb") as f:
+        while True:
+            data = f.read(size)
+            if not data:
+                break
+            if compressor:
+                data = compressor.compress(data)
+                if not data:
+                    continue
+            sent = True
+            yield data
+    if compressor:
+        yield compressor.flush()
+    elif not sent:
+        yield b""
+
+
+def write_chunks(
+    chunks: Iterable[bytes],
+    f: BinaryIO,
+    compress: bool = False,
+    size: int = CHUNK_SIZE,
+) -> int:
+    """
+    Write chunks to a file, decompressing each chunk in bounded pieces when
+    compressed.
+
+    :param chunks: chunks to write
+    :param f: file to write to
+    :param compress: True when chunks are a single zlib compressed stream
+    :param size: max number of decompressed bytes to write at once
+    :return: number of bytes written
+    :raises CoreError: when compressed data is invalid or incomplete
+    """
+    decompressor = zlib.decompressobj() if compress else None
+    written = 0
+    try:
+        for data in chunks:
+            if not decompressor:
+                f.write(data)
+                written += len(data)
+                continue
+            while data:
+                output = decompressor.decompress(data, size)
+                f.write(output)
+                written += len(output)
+                data = decompressor.unconsumed_tail
+        if decompressor:
+            output = decompressor.flush()
+            f.write(output)
+            written += len(output)
+            if not decompressor.eof:
+                raise CoreError("incomplete compressed data")
+    except zlib.error as e:
+        raise CoreError(f"invalid compressed data: {e}")
+    return written
@@ -7,11 +7,23 @@ import threading
 from contextlib import contextmanager
 from pathlib import Path
 from queue import Queue
-from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import grpc
 
 from core.api.grpc import core_pb2, core_pb2_grpc, emane_pb2, wrappers
+from core.api.grpc.chunks import read_chunks, write_chunks
 from core.api.grpc.configservices_pb2 import (
     GetConfigServiceDefaultsRequest,
     GetConfigServiceRenderedRequest,
@@ -82,14 +94,49 @@ class MoveNodesStreamer:
         )
         self.send(request)
 
-    def send(self, request: wrappers.MoveNodesRequest) -> None:
+    def send_positions(
+        self, node_ids: List[int], positions: List[Tuple[float, float]]
+    ) -> None:
+        """
+        Send x,y positions for a group of nodes, applied together.
+
+        :param node_ids: ids of nodes to move
+        :param positions: x,y position for each node
+        :return: nothing
+        """
+        request = wrappers.MoveNodesBatch(
+            session_id=self.session_id,
+            node_ids=node_ids,
+            source=self.source,
+            positions=positions,
+        )
+        self.send(request)
+
+    def send_geos(
+        self, node_ids: List[int], geos: List[Tuple[float, float, float]]
+    ) -> None:
+        """
+        Send geospatial positions for a group of nodes, applied together.
+
+        :param node_ids: ids of nodes to move
+        :param geos: lon,lat,alt position for each node
+        :return: nothing
+        """
+        request = wrappers.MoveNodesBatch(
+            session_id=self.session_id, node_ids=node_ids, source=self.source, geos=geos
+        )
+        self.send(request)
+
+    def send(
+        self, request: Union[wrappers.MoveNodesRequest, wrappers.MoveNodesBatch]
+    ) -> None:
         self.queue.put(request)
 
     def stop(self) -> None:
         self.queue.put(None)
 
     def next(self) -> Optional[core_pb2.MoveNodesRequest]:
-        request: Optional[wrappers.MoveNodesRequest] = self.queue.get()
+        request = self.queue.get()
         if request:
             return request.to_proto()
         else:
@@ -208,8 +255,11 @@ def event_listener(stream: Any, handler: Callable[[wrappers.Event], None]) -> No
     """
     try:
         for event_proto in stream:
-            event = wrappers.Event.from_proto(event_proto)
-            handler(event)
+            if event_proto.HasField("batch"):
+                for batch_proto in event_proto.batch.events:
+                    handler(wrappers.Event.from_proto(batch_proto))
+            else:
+                handler(wrappers.Event.from_proto(event_proto))
     except grpc.RpcError as e:
         if e.code() == grpc.StatusCode.CANCELLED:
             logger.debug("session stream closed")
@@ -322,6 +372,26 @@ class CoreGrpcClient:
         response = self.stub.GetSession(request)
         return wrappers.Session.from_proto(response.session)
 
+    def get_session_changes(
+        self, session_id: int, since_version: int = 0
+    ) -> wrappers.SessionChanges:
+        """
+        Retrieve nodes and links that have been added, updated or deleted since a
+        previously retrieved session version. The full session is provided
+        instead, when changes since the version are no longer known.
+
+        :param session_id: id of session
+        :param since_version: version to get changes after, version returned by a
+            previous call
+        :return: session changes
+        :raises grpc.RpcError: when session doesn't exist
+        """
+        request = core_pb2.GetSessionChangesRequest(
+            session_id=session_id, since_version=since_version
+        )
+        response = self.stub.GetSessionChanges(request)
+        return wrappers.SessionChanges.from_proto(response)
+
     def alert(
         self,
         session_id: int,
@@ -355,6 +425,10 @@ class CoreGrpcClient:
         session_id: int,
         handler: Callable[[wrappers.Event], None],
         events: List[wrappers.EventType] = None,
+        batch_window: int = None,
+        node_ids: List[int] = None,
+        network_ids: List[int] = None,
+        link_types: List[wrappers.LinkType] = None,
     ) -> grpc.Future:
         """
         Listen for session events.
@@ -362,10 +436,29 @@ class CoreGrpcClient:
         :param session_id: id of session
         :param handler: handler for received events
         :param events: events to listen to, defaults to all
+        :param batch_window: when provided, milliseconds the server will batch
+            events for, coalescing node and link updates, events within a batch
+            are provided to the handler individually
+        :param node_ids: receive node events for these nodes, and link events
+            involving them
+        :param network_ids: receive node events for these networks and nodes
+            linked to them, and link events within them, when provided with node
+            ids, events matching either are received, defaults to all
+        :param link_types: only receive link events of these types, defaults to
+            all types
         :return: stream processing events, can be used to cancel stream
         :raises grpc.RpcError: when session doesn't exist
         """
-        request = core_pb2.EventsRequest(session_id=session_id, events=events)
+        if link_types is not None:
+            link_types = [x.value for x in link_types]
+        request = core_pb2.EventsRequest(
+            session_id=session_id,
+            events=events,
+            batch_window=batch_window,
+            node_ids=node_ids,
+            network_ids=network_ids,
+            link_types=link_types,
+        )
         stream = self.stub.Events(request)
         thread = threading.Thread(
             target=event_listener, args=(stream, handler), daemon=True
@@ -374,17 +467,22 @@ class CoreGrpcClient:
         return stream
 
     def throughputs(
-        self, session_id: int, handler: Callable[[wrappers.ThroughputsEvent], None]
+        self,
+        session_id: int,
+        handler: Callable[[wrappers.ThroughputsEvent], None],
+        interval: float = None,
     ) -> grpc.Future:
         """
         Listen for throughput events with information for interfaces and bridges.
 
         :param session_id: session id
         :param handler: handler for every event
+        :param interval: seconds between events and to average throughputs over,
+            defaults to 3 seconds
         :return: stream processing events, can be used to cancel stream
         :raises grpc.RpcError: when session doesn't exist
         """
-        request = core_pb2.ThroughputsRequest(session_id=session_id)
+        request = core_pb2.ThroughputsRequest(session_id=session_id, interval=interval)
         stream = self.stub.Throughputs(request)
         thread = threading.Thread(
             target=throughput_listener, args=(stream, handler), daemon=True
@@ -392,6 +490,25 @@ class CoreGrpcClient:
         thread.start()
         return stream
 
+    def get_throughputs(
+        self, session_id: int, interval: float = None, duration: float = None
+    ) -> List[wrappers.ThroughputsEvent]:
+        """
+        Retrieve previous throughputs for interfaces and bridges, for each
+        interval within a previous duration of time.
+
+        :param session_id: session id
+        :param interval: seconds to average throughputs over, defaults to 3 seconds
+        :param duration: seconds of history to retrieve, defaults to the interval
+        :return: throughputs events, oldest first
+        :raises grpc.RpcError: when session doesn't exist
+        """
+        request = core_pb2.GetThroughputsRequest(
+            session_id=session_id, interval=interval, duration=duration
+        )
+        response = self.stub.GetThroughputs(request)
+        return [wrappers.ThroughputsEvent.from_proto(x) for x in response.events]
+
     def cpu_usage(
         self, delay: int, handler: Callable[[wrappers.CpuUsageEvent], None]
     ) -> grpc.Future:
@@ -558,6 +675,133 @@ class CoreGrpcClient:
         response = self.stub.NodeCommand(request)
         return response.return_code, response.output
 
+    def upload_node_file(
+        self,
+        session_id: int,
+        node_id: int,
+        src_path: Path,
+        dst_path: str,
+        mode: int = None,
+        compress: bool = False,
+    ) -> int:
+        """
+        Upload a local file to a node, streamed in chunks.
+
+        :param session_id: session id
+        :param node_id: node id
+        :param src_path: local file to upload
+        :param dst_path: node path to upload file to
+        :param mode: mode for node file, defaults to 0o644
+        :param compress: True to compress chunks sent
+        :return: size of file uploaded
+        :raises grpc.RpcError: when session or node doesn't exist, or upload fails
+        """
+
+        # read first chunk before streaming, to raise file errors to the caller
+        chunks = read_chunks(src_path, compress)
+        first = next(chunks)
+
+        def requests() -> Iterator[core_pb2.UploadNodeFileRequest]:
+            yield core_pb2.UploadNodeFileRequest(
+                session_id=session_id,
+                node_id=node_id,
+                path=dst_path,
+                mode=mode,
+                compress=compress,
+                data=first,
+            )
+            for data in chunks:
+                yield core_pb2.UploadNodeFileRequest(data=data)
+
+        response = self.stub.UploadNodeFile(requests())
+        return response.size
+
+    def download_node_file(
+        self,
+        session_id: int,
+        node_id: int,
+        src_path: str,
+        dst_path: Path,
+        compress: bool = False,
+    ) -> int:
+        """
+        Download a node file to a local file, streamed in chunks.
+
+        :param session_id: session id
+        :param node_id: node id
+        :param src_path: node file to download
+        :param dst_path: local path to download file to
+        :param compress: True to have chunks compressed
+        :return: size of file downloaded
+        :raises grpc.RpcError: when session, node or file doesn't exist
+        """
+        request = core_pb2.DownloadNodeFileRequest(
+            session_id=session_id, node_id=node_id, path=src_path, compress=compress
+        )
+        stream = self.stub.DownloadNodeFile(request)
+        with dst_path.open("wb") as f:
+            return write_chunks((x.data for x in stream), f, compress)
+
+    def nodes_command(
+        self,
+        session_id: int,
+        node_ids: List[int],
+        commands: List[str],
+        wait: bool = True,
+        shell: bool = False,
+        workers: int = None,
+    ) -> Iterator[wrappers.NodeCommandResults]:
+        """
+        Run commands, in order, on a set of nodes concurrently, receiving the
+        results for each node as they complete.
+
+        :param session_id: session id
+        :param node_ids: ids of nodes to run commands on
+        :param commands: commands to run on each node
+        :param wait: wait for commands to complete
+        :param shell: send shell commands
+        :param workers: max number of nodes to run commands on at once, defaults
+            to 10
+        :return: iterator of command results for each node, as they complete
+        :raises grpc.RpcError: when session or a node doesn't exist
+        """
+        request = core_pb2.NodesCommandRequest(
+            session_id=session_id,
+            node_ids=node_ids,
+            commands=commands,
+            wait=wait,
+            shell=shell,
+            workers=workers,
+        )
+        for response in self.stub.NodesCommand(request):
+            yield wrappers.NodeCommandResults.from_proto(response)
+
+    def node_command_stream(
+        self, session_id: int, node_id: int, command: str, shell: bool = False
+    ) -> Iterator[wrappers.CommandOutput]:
+        """
+        Run a command on a node, receiving its output as it is produced, followed
+        by its return code once exited. Stopping iteration early cancels the
+        stream, which stops the command.
+
+        :param session_id: session id
+        :param node_id: node id
+        :param command: command to run on node
+        :param shell: send shell command
+        :return: iterator of command output
+        :raises grpc.RpcError: when session or node doesn't exist, or the
+            command fails to start
+        """
+        request = core_pb2.NodeCommandStreamRequest(
+            session_id=session_id, node_id=node_id, command=command, shell=shell
+        )
+        stream = self.stub.NodeCommandStream(request)
+        try:
+            for response in stream:
+                yield wrappers.CommandOutput.from_proto(response)
+        finally:
+            stream.cancel()
+
     def get_node_terminal(self, session_id: int, node_id: int) -> str:
         """
         Retrieve terminal command string for launching a local terminal.
@@ -923,6 +1167,53 @@ class CoreGrpcClient:
         response = self.stub.OpenXml(request)
         return response.result, response.session_id
 
+    def save_xml_stream(
+        self, session_id: int, file_path: Path, compress: bool = False
+    ) -> None:
+        """
+        Save the current scenario to an XML file, streamed in chunks to support
+        scenarios of any size.
+
+        :param session_id: session to save xml file for
+        :param file_path: local path to save scenario XML file to
+        :param compress: True to have chunks compressed
+        :return: nothing
+        :raises grpc.RpcError: when session doesn't exist
+        """
+        request = core_pb2.SaveXmlStreamRequest(
+            session_id=session_id, compress=compress
+        )
+        stream = self.stub.SaveXmlStream(request)
+        with file_path.open("wb") as f:
+            write_chunks((x.data for x in stream), f, compress)
+
+    def open_xml_stream(
+        self, file_path: Path, start: bool = False, compress: bool = False
+    ) -> Tuple[bool, int]:
+        """
+        Load a local scenario XML file to open as a new session, streamed in
+        chunks to support scenarios of any size.
+
+        :param file_path: path of scenario XML file
+        :param start: True to start session, False otherwise
+        :param compress: True to compress chunks sent
+        :return: tuple of result and session id
+        """
+
+        # read first chunk before streaming, to raise file errors to the caller
+        chunks = read_chunks(file_path, compress)
+        first = next(chunks)
+
+        def requests() -> Iterator[core_pb2.OpenXmlStreamRequest]:
+            yield core_pb2.OpenXmlStreamRequest(
+                start=start, file=str(file_path), compress=compress, data=first
+            )
+            for data in chunks:
+                yield core_pb2.OpenXmlStreamRequest(data=data)
+
+        response = self.stub.OpenXmlStream(requests())
+        return response.result, response.session_id
+
     def emane_link(self, session_id: int, nem1: int, nem2: int, linked: bool) -> bool:
         """
         Helps broadcast wireless link/unlink between EMANE nodes.
@@ -1,6 +1,9 @@
+import asyncio
 import logging
+import threading
+import time
 from queue import Empty, Queue
-from typing import Iterable, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from core.api.grpc import core_pb2, grpcutils
 from core.api.grpc.grpcutils import convert_link_data
@@ -12,7 +15,9 @@ from core.emulator.data import (
     LinkData,
     NodeData,
 )
+from core.emulator.enumerations import MessageFlags
 from core.emulator.session import Session
+from core.nodes.base import NodeBase
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +31,8 @@ def handle_node_event(session: Session, node_data: NodeData) -> core_pb2.Event:
     :return: node event that contains node id, name, model, position, and services
     """
     node = node_data.node
-    emane_configs = grpcutils.get_emane_model_configs_dict(session)
-    node_emane_configs = emane_configs.get(node.id, [])
-    node_proto = grpcutils.get_node_proto(session, node, node_emane_configs)
+    emane_configs = grpcutils.get_node_emane_configs(session, node.id)
+    node_proto = grpcutils.get_node_proto(session, node, emane_configs)
     message_type = node_data.message_type.value
     node_event = core_pb2.NodeEvent(message_type=message_type, node=node_proto)
     return core_pb2.Event(node_event=node_event, source=node_data.source)
@@ -131,25 +135,255 @@ def handle_file_event(file_data: FileData) -> core_pb2.Event:
     return core_pb2.Event(file_event=file_event)
 
 
+def get_event_key(data: Any) -> Optional[Tuple]:
+    """
+    Retrieve the key identifying what node or link event data is for.
+
+    :param data: session event data
+    :return: key for node and link events, None otherwise
+    """
+    if isinstance(data, NodeData):
+        return "node", data.node.id
+    elif isinstance(data, LinkData):
+        iface1_id = data.iface1.id if data.iface1 else None
+        iface2_id = data.iface2.id if data.iface2 else None
+        return (
+            "link",
+            data.network_id,
+            data.node1_id,
+            data.node2_id,
+            iface1_id,
+            iface2_id,
+        )
+    return None
+
+
+class EventBatcher:
+    """
+    Collects session event data for a batch, coalescing node and link updates.
+    Updates are replaced by later updates for the same node or link, while
+    adds, deletes and all other events are kept in the order received.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create an EventBatcher instance.
+        """
+        self.data: List[Any] = []
+        self.updates: Dict[Tuple, int] = {}
+
+    def add(self, data: Any) -> None:
+        """
+        Add session event data to the batch.
+
+        :param data: session event data
+        :return: nothing
+        """
+        key = get_event_key(data)
+        if key is not None:
+            index = self.updates.pop(key, None)
+            if data.message_type == MessageFlags.NONE:
+                if index is not None:
+                    self.data[index] = None
+                self.updates[key] = len(self.data)
+        self.data.append(data)
+
+    def pop(self) -> List[Any]:
+        """
+        Retrieve and clear the current batch.
+
+        :return: batched session event data
+        """
+        data = [x for x in self.data if x is not None]
+        self.data.clear()
+        self.updates.clear()
+        return data
+
+
+class NodeProtoCache:
+    """
+    Cache of node protobufs for a session, shared by all event streamers for the
+    session. Node protobufs are created once and reused until invalidated by a
+    change to the node's configuration, positions are updated from the node for
+    every event created. The last event created for a node is also kept, so a
+    node broadcast is converted once for all streamers receiving it.
+    """
+
+    def __init__(self, session: Session) -> None:
+        """
+        Create a NodeProtoCache instance.
+
+        :param session: session to cache node protobufs for
+        """
+        self.session: Session = session
+        self.lock: threading.Lock = threading.Lock()
+        self.generation: int = 0
+        self.protos: Dict[int, Tuple[NodeBase, core_pb2.Node]] = {}
+        self.events: Dict[int, Tuple[NodeData, core_pb2.Event]] = {}
+
+    def invalidate(self, node_id: int = None) -> None:
+        """
+        Invalidate cached protobufs for a node, or all nodes when not provided.
+
+        :param node_id: id of node to invalidate
+        :return: nothing
+        """
+        with self.lock:
+            self.generation += 1
+            if node_id is None:
+                self.protos.clear()
+                self.events.clear()
+            else:
+                self.protos.pop(node_id, None)
+                self.events.pop(node_id, None)
+
+    def get_node_proto(self, node: NodeBase) -> core_pb2.Node:
+        """
+        Retrieve a protobuf for a node, with its current position.
+
+        :param node: node to get protobuf for
+        :return: node protobuf
+        """
+        with self.lock:
+            generation = self.generation
+            cached = self.protos.get(node.id)
+        if cached is None or cached[0] is not node:
+            emane_configs = grpcutils.get_node_emane_configs(self.session, node.id)
+            cached_proto = grpcutils.get_node_proto(self.session, node, emane_configs)
+            with self.lock:
+                if generation == self.generation:
+                    self.protos[node.id] = (node, cached_proto)
+        else:
+            cached_proto = cached[1]
+        node_proto = core_pb2.Node()
+        node_proto.CopyFrom(cached_proto)
+        position = core_pb2.Position(
+            x=node.position.x, y=node.position.y, z=node.position.z
+        )
+        geo = core_pb2.Geo(
+            lat=node.position.lat, lon=node.position.lon, alt=node.position.alt
+        )
+        node_proto.position.CopyFrom(position)
+        node_proto.geo.CopyFrom(geo)
+        return node_proto
+
+    def get_node_event(self, node_data: NodeData) -> core_pb2.Event:
+        """
+        Retrieve the event for node data, events are shared and must not be
+        modified.
+
+        :param node_data: node data to get event for
+        :return: node event
+        """
+        node = node_data.node
+        with self.lock:
+            cached = self.events.get(node.id)
+        if cached is not None and cached[0] is node_data:
+            return cached[1]
+        node_proto = self.get_node_proto(node)
+        message_type = node_data.message_type.value
+        node_event = core_pb2.NodeEvent(message_type=message_type, node=node_proto)
+        event = core_pb2.Event(
+            node_event=node_event, source=node_data.source, session_id=self.session.id
+        )
+        with self.lock:
+            self.events[node.id] = (node_data, event)
+        return event
+
+
 class EventStreamer:
     """
     Processes session events to generate grpc events.
     """
 
     def __init__(
-        self, session: Session, event_types: Iterable[core_pb2.EventType]
+        self,
+        session: Session,
+        event_types: Iterable[core_pb2.EventType],
+        node_cache: NodeProtoCache = None,
+        node_ids: Iterable[int] = None,
+        network_ids: Iterable[int] = None,
+        link_types: Iterable[int] = None,
     ) -> None:
         """
         Create a EventStreamer instance.
 
         :param session: session to process events for
         :param event_types: types of events to process
+        :param node_cache: node protobuf cache shared with other streamers
+        :param node_ids: process node events for these nodes, and link events
+            involving them
+        :param network_ids: process node events for these networks and nodes
+            linked to them, and link events within them, when provided with
+            node ids, events matching either are processed, defaults to all
+        :param link_types: only process link events of these types, defaults to
+            all types
         """
         self.session: Session = session
+        self.node_cache: Optional[NodeProtoCache] = node_cache
+        self.node_ids: Set[int] = set(node_ids or [])
+        self.network_ids: Set[int] = set(network_ids or [])
+        self.link_types: Set[int] = set(link_types or [])
         self.event_types: Iterable[core_pb2.EventType] = event_types
         self.queue: Queue = Queue()
+        self.batcher: EventBatcher = EventBatcher()
         self.add_handlers()
 
+    def is_filtered(self, data: Any) -> bool:
+        """
+        Check if session event data is excluded by the node, network and link
+        type filters. Node and link events are kept when matching either the node
+        or network filters, link events must also match the link type filter.
+
+        :param data: session event data
+        :return: True if event should be dropped, False otherwise
+        """
+        if isinstance(data, NodeData):
+            if not self.node_ids and not self.network_ids:
+                return False
+            node = data.node
+            if node.id in self.node_ids or node.id in self.network_ids:
+                return False
+            return not self.is_linked_network(node)
+        elif isinstance(data, LinkData):
+            if self.link_types and data.type.value not in self.link_types:
+                return True
+            if not self.node_ids and not self.network_ids:
+                return False
+            ids = {data.node1_id, data.node2_id}
+            if not self.node_ids.isdisjoint(ids):
+                return False
+            ids.add(data.network_id)
+            return self.network_ids.isdisjoint(ids)
+        return False
+
+    def is_linked_network(self, node: NodeBase) -> bool:
+        """
+        Check if a node is linked to any of the networks being filtered for.
+
+        :param node: node to check
+        :return: True if linked to a filtered network, False otherwise
+        """
+        if not self.network_ids:
+            return False
+        for core_link in list(self.session.link_manager.node_links(node)):
+            if (
+                core_link.node1.id in self.network_ids
+                or core_link.node2.id in self.network_ids
+            ):
+                return True
+        return False
+
+    def handle(self, data: Any) -> None:
+        """
+        Session handler for events being watched.
+
+        :param data: session event data
+        :return: nothing
+        """
+        if not self.is_filtered(data):
+            self.queue.put(data)
+
     def add_handlers(self) -> None:
         """
         Add a session event handler for desired event types.
@@ -157,17 +391,17 @@ class EventStreamer:
         :return: nothing
         """
         if core_pb2.EventType.NODE in self.event_types:
-            self.session.node_handlers.append(self.queue.put)
+            self.session.node_handlers.append(self.handle)
         if core_pb2.EventType.LINK in self.event_types:
-            self.session.link_handlers.append(self.queue.put)
+            self.session.link_handlers.append(self.handle)
         if core_pb2.EventType.CONFIG in self.event_types:
-            self.session.config_handlers.append(self.queue.put)
+            self.session.config_handlers.append(self.handle)
         if core_pb2.EventType.FILE in self.event_types:
-            self.session.file_handlers.append(self.queue.put)
+            self.session.file_handlers.append(self.handle)
         if core_pb2.EventType.EXCEPTION in self.event_types:
-            self.session.exception_handlers.append(self.queue.put)
+            self.session.exception_handlers.append(self.handle)
         if core_pb2.EventType.SESSION in self.event_types:
-            self.session.event_handlers.append(self.queue.put)
+            self.session.event_handlers.append(self.handle)
 
     def process(self) -> Optional[core_pb2.Event]:
         """
@@ -175,25 +409,78 @@ class EventStreamer:
 
         :return: grpc event, or None when invalid event or queue timeout
         """
-        event = None
         try:
             data = self.queue.get(timeout=1)
-            if isinstance(data, NodeData):
-                event = handle_node_event(self.session, data)
-            elif isinstance(data, LinkData):
-                event = handle_link_event(data)
-            elif isinstance(data, EventData):
-                event = handle_session_event(data)
-            elif isinstance(data, ConfigData):
-                event = handle_config_event(data)
-            elif isinstance(data, ExceptionData):
-                event = handle_exception_event(data)
-            elif isinstance(data, FileData):
-                event = handle_file_event(data)
-            else:
-                logger.error("unknown event: %s", data)
         except Empty:
-            pass
+            return None
+        return self.convert(data)
+
+    def process_batch(self, window: float) -> Optional[core_pb2.Event]:
+        """
+        Process events in the queue received within a window of time, starting
+        from the next event received, as a single batch.
+
+        :param window: time in seconds to collect events for
+        :return: grpc event batch, or None when no valid events or queue timeout
+        """
+        try:
+            data = self.queue.get(timeout=1)
+        except Empty:
+            return None
+        self.batcher.add(data)
+        deadline = time.monotonic() + window
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                data = self.queue.get(timeout=remaining)
+            except Empty:
+                break
+            self.batcher.add(data)
+        return self.convert_batch(self.batcher.pop())
+
+    def convert_batch(self, batch: List[Any]) -> Optional[core_pb2.Event]:
+        """
+        Convert a batch of session event data to a grpc event batch.
+
+        :param batch: session event data to convert
+        :return: grpc event batch, or None when no valid events
+        """
+        events = []
+        for data in batch:
+            event = self.convert(data)
+            if event:
+                events.append(event)
+        if not events:
+            return None
+        event_batch = core_pb2.EventBatch(events=events)
+        return core_pb2.Event(session_id=self.session.id, batch=event_batch)
+
+    def convert(self, data: Any) -> Optional[core_pb2.Event]:
+        """
+        Convert session event data to a grpc event.
+
+        :param data: session event data
+        :return: grpc event, or None when invalid event
+        """
+        event = None
+        if isinstance(data, NodeData):
+            if self.node_cache:
+                return self.node_cache.get_node_event(data)
+            event = handle_node_event(self.session, data)
+        elif isinstance(data, LinkData):
+            event = handle_link_event(data)
+        elif isinstance(data, EventData):
+            event = handle_session_event(data)
+        elif isinstance(data, ConfigData):
+            event = handle_config_event(data)
+        elif isinstance(data, ExceptionData):
+            event = handle_exception_event(data)
+        elif isinstance(data, FileData):
+            event = handle_file_event(data)
+        else:
+            logger.error("unknown event: %s", data)
         if event:
             event.session_id = self.session.id
         return event
@@ -205,14 +492,105 @@ class EventStreamer:
         :return: nothing
         """
         if core_pb2.EventType.NODE in self.event_types:
-            self.session.node_handlers.remove(self.queue.put)
+            self.session.node_handlers.remove(self.handle)
         if core_pb2.EventType.LINK in self.event_types:
-            self.session.link_handlers.remove(self.queue.put)
+            self.session.link_handlers.remove(self.handle)
         if core_pb2.EventType.CONFIG in self.event_types:
-            self.session.config_handlers.remove(self.queue.put)
+            self.session.config_handlers.remove(self.handle)
         if core_pb2.EventType.FILE in self.event_types:
-            self.session.file_handlers.remove(self.queue.put)
+            self.session.file_handlers.remove(self.handle)
         if core_pb2.EventType.EXCEPTION in self.event_types:
-            self.session.exception_handlers.remove(self.queue.put)
+            self.session.exception_handlers.remove(self.handle)
         if core_pb2.EventType.SESSION in self.event_types:
-            self.session.event_handlers.remove(self.queue.put)
+            self.session.event_handlers.remove(self.handle)
+
+
+class AsyncEventStreamer(EventStreamer):
+    """
+    Processes session events to generate grpc events, for use within an asyncio
+    event loop. Session handlers, ran from session threads, pass events to the
+    loop using call_soon_threadsafe.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        event_types: Iterable[core_pb2.EventType],
+        loop: asyncio.AbstractEventLoop,
+        node_cache: NodeProtoCache = None,
+        node_ids: Iterable[int] = None,
+        network_ids: Iterable[int] = None,
+        link_types: Iterable[int] = None,
+    ) -> None:
+        """
+        Create an AsyncEventStreamer instance.
+
+        :param session: session to process events for
+        :param event_types: types of events to process
+        :param loop: event loop events are processed within
+        :param node_cache: node protobuf cache shared with other streamers
+        :param node_ids: process node events for these nodes, and link events
+            involving them
+        :param network_ids: process node events for these networks and nodes
+            linked to them, and link events within them, when provided with
+            node ids, events matching either are processed, defaults to all
+        :param link_types: only process link events of these types, defaults to
+            all types
+        """
+        self.loop: asyncio.AbstractEventLoop = loop
+        self.async_queue: asyncio.Queue = asyncio.Queue()
+        super().__init__(
+            session, event_types, node_cache, node_ids, network_ids, link_types
+        )
+
+    def handle(self, data: Any) -> None:
+        """
+        Session handler passing event data to the event loop.
+
+        :param data: session event data
+        :return: nothing
+        """
+        if self.is_filtered(data):
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.async_queue.put_nowait, data)
+        except RuntimeError:
+            logger.debug("event loop closed, dropping event: %s", data)
+
+    async def process_async(self, timeout: float = 1.0) -> Optional[core_pb2.Event]:
+        """
+        Process the next event in the queue.
+
+        :param timeout: time to wait for an event
+        :return: grpc event, or None when invalid event or queue timeout
+        """
+        try:
+            data = await asyncio.wait_for(self.async_queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self.convert(data)
+
+    async def process_batch_async(self, window: float) -> Optional[core_pb2.Event]:
+        """
+        Process events in the queue received within a window of time, starting
+        from the next event received, as a single batch.
+
+        :param window: time in seconds to collect events for
+        :return: grpc event batch, or None when no valid events or queue timeout
+        """
+        try:
+            data = await asyncio.wait_for(self.async_queue.get(), 1.0)
+        except asyncio.TimeoutError:
+            return None
+        self.batcher.add(data)
+        deadline = time.monotonic() + window
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                data = await asyncio.wait_for(self.async_queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            self.batcher.add(data)
+        return self.convert_batch(self.batcher.pop())
@@ -1,7 +1,7 @@
 import logging
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
 
 import grpc
 from grpc import ServicerContext
@@ -18,9 +18,10 @@ from core.api.grpc.services_pb2 import (
 )
 from core.config import ConfigurableOptions
 from core.emane.nodes import EmaneNet, EmaneOptions
+from core.emulator.changes import Change, ChangeKind
 from core.emulator.data import InterfaceData, LinkData, LinkOptions
-from core.emulator.enumerations import LinkTypes, NodeTypes
-from core.emulator.links import CoreLink
+from core.emulator.enumerations import LinkTypes, MessageFlags, NodeTypes
+from core.emulator.links import CoreLink, LinkKeyType
 from core.emulator.session import Session
 from core.errors import CoreError
 from core.location.mobility import BasicRangeModel, Ns2ScriptedMobility
@@ -751,6 +752,31 @@ def get_emane_model_configs_dict(session: Session) -> Dict[int, List[NodeEmaneCo
     return configs
 
 
+def get_node_emane_configs(session: Session, node_id: int) -> List[NodeEmaneConfig]:
+    """
+    Get emane model configuration protobuf data for a single node.
+
+    :param session: session to get emane model configuration for
+    :param node_id: id of node to get configurations for
+    :return: node emane model protobuf configurations
+    """
+    configs = []
+    for _id, model_configs in session.emane.node_configs.items():
+        config_node_id, iface_id = utils.parse_iface_config_id(_id)
+        if config_node_id != node_id:
+            continue
+        iface_id = iface_id if iface_id is not None else -1
+        for model_name in model_configs:
+            model_class = session.emane.get_model(model_name)
+            current_config = session.emane.get_config(_id, model_name)
+            config = get_config_options(current_config, model_class)
+            node_config = NodeEmaneConfig(
+                model=model_name, iface_id=iface_id, config=config
+            )
+            configs.append(node_config)
+    return configs
+
+
 def get_hooks(session: Session) -> List[core_pb2.Hook]:
     """
     Retrieve hook protobuf data for a session.
@@ -852,6 +878,88 @@ def convert_session(session: Session) -> wrappers.Session:
     )
 
 
+def convert_command_output(
+    is_stderr: bool, data: bytes
+) -> core_pb2.NodeCommandStreamResponse:
+    """
+    Convert streamed command output to a protobuf response.
+
+    :param is_stderr: True when output is from stderr, False for stdout
+    :param data: command output
+    :return: node command stream response
+    """
+    if is_stderr:
+        return core_pb2.NodeCommandStreamResponse(stderr=data)
+    else:
+        return core_pb2.NodeCommandStreamResponse(stdout=data)
+
+
+def convert_link_key(key: LinkKeyType) -> core_pb2.Link:
+    """
+    Convert a link key to a protobuf link, only identifying the link.
+
+    :param key: link key to convert
+    :return: protobuf link
+    """
+    node1_id, iface1_id, node2_id, iface2_id = key
+    iface1 = core_pb2.Interface(id=iface1_id) if iface1_id is not None else None
+    iface2 = core_pb2.Interface(id=iface2_id) if iface2_id is not None else None
+    return core_pb2.Link(
+        node1_id=node1_id, node2_id=node2_id, iface1=iface1, iface2=iface2
+    )
+
+
+def convert_session_changes(
+    session: Session,
+    version: int,
+    changes: List[Change],
+    get_proto: Callable[[NodeBase], core_pb2.Node] = None,
+) -> core_pb2.GetSessionChangesResponse:
+    """
+    Convert session changes to a response containing the current state of
+    changed nodes and links, along with what has been deleted.
+
+    :param session: session changes are for
+    :param version: session version the changes are up to
+    :param changes: session changes to convert
+    :param get_proto: function to create node protobufs, defaults to creating a
+        new protobuf for every node
+    :return: session changes response
+    """
+    response = core_pb2.GetSessionChangesResponse(
+        version=version, state=session.state.value
+    )
+    emane_configs = None
+    for change in changes:
+        if change.kind == ChangeKind.NODE:
+            node = session.nodes.get(change.key)
+            if node is None:
+                response.deleted_node_ids.append(change.key)
+            elif isinstance(node, (PtpNet, CtrlNet)):
+                continue
+            elif get_proto:
+                response.nodes.append(get_proto(node))
+            else:
+                if emane_configs is None:
+                    emane_configs = get_emane_model_configs_dict(session)
+                node_emane_configs = emane_configs.get(node.id, [])
+                node_proto = get_node_proto(session, node, node_emane_configs)
+                response.nodes.append(node_proto)
+        elif change.kind == ChangeKind.LINK:
+            core_link = session.link_manager.get_link_by_key(change.key)
+            if core_link is None:
+                response.deleted_links.append(convert_link_key(change.key))
+            else:
+                response.links.extend(convert_core_link(core_link))
+        else:
+            link = convert_link_data(change.data)
+            if change.data.message_type == MessageFlags.DELETE:
+                response.deleted_links.append(link)
+            else:
+                response.links.append(link)
+    return response
+
+
 def configure_node(
     session: Session, node: core_pb2.Node, core_node: NodeBase, context: ServicerContext
 ) -> None:
@@ -1,13 +1,14 @@
+import itertools
 import logging
 import os
-import re
 import signal
 import sys
 import tempfile
+import threading
 import time
 from concurrent import futures
 from pathlib import Path
-from typing import Iterable, Optional, Pattern, Type
+from typing import Dict, Iterable, Iterator, Optional, Type
 
 import grpc
 from grpc import ServicerContext
@@ -20,6 +21,7 @@ from core.api.grpc import (
     core_pb2_grpc,
     grpcutils,
 )
+from core.api.grpc.chunks import read_chunks, write_chunks
 from core.api.grpc.configservices_pb2 import (
     ConfigService,
     GetConfigServiceDefaultsRequest,
@@ -52,8 +54,8 @@ from core.api.grpc.emane_pb2 import (
     SetEmaneModelConfigRequest,
     SetEmaneModelConfigResponse,
 )
-from core.api.grpc.events import EventStreamer
-from core.api.grpc.grpcutils import get_config_options, get_links, get_net_stats
+from core.api.grpc.events import EventStreamer, NodeProtoCache
+from core.api.grpc.grpcutils import get_config_options, get_links
 from core.api.grpc.mobility_pb2 import (
     GetMobilityConfigRequest,
     GetMobilityConfigResponse,
@@ -77,6 +79,7 @@ from core.api.grpc.services_pb2 import (
     SetServiceDefaultsRequest,
     SetServiceDefaultsResponse,
 )
+from core.api.grpc.throughputs import DEFAULT_INTERVAL, ThroughputSampler
 from core.api.grpc.wlan_pb2 import (
     GetWlanConfigRequest,
     GetWlanConfigResponse,
@@ -98,15 +101,18 @@ from core.emulator.enumerations import (
 from core.emulator.session import NT, Session
 from core.errors import CoreCommandError, CoreError
 from core.location.mobility import BasicRangeModel, Ns2ScriptedMobility
-from core.nodes.base import CoreNode, NodeBase
+from core.nodes.base import CoreNode, CoreNodeBase, NodeBase
 from core.nodes.network import CoreNetwork, WlanNode
 from core.nodes.wireless import WirelessNode
 from core.services.coreservices import ServiceManager
 
 logger = logging.getLogger(__name__)
 _ONE_DAY_IN_SECONDS: int = 60 * 60 * 24
-_INTERFACE_REGEX: Pattern = re.compile(r"beth(?P<node>[0-9a-fA-F]+)")
 _MAX_WORKERS = 1000
+_COMMAND_WORKERS: int = 10
+_MAX_COMMAND_WORKERS: int = 100
+# max time to wait for streamed command output, before checking the stream is active
+_COMMAND_STREAM_TIMEOUT: float = 0.5
 
 
 class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
@@ -121,6 +127,9 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         self.coreemu: CoreEmu = coreemu
         self.running: bool = True
         self.server: Optional[grpc.Server] = None
+        self.node_caches: Dict[int, NodeProtoCache] = {}
+        self.node_caches_lock: threading.Lock = threading.Lock()
+        self.throughputs: ThroughputSampler = ThroughputSampler(coreemu)
         # catch signals
         signal.signal(signal.SIGHUP, self._signal_handler)
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -148,6 +157,7 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         core_pb2_grpc.add_CoreApiServicer_to_server(self, self.server)
         self.server.add_insecure_port(address)
         self.server.start()
+        self.throughputs.start()
 
         try:
             while True:
@@ -155,6 +165,37 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         except KeyboardInterrupt:
             self.server.stop(None)
 
+    def get_node_cache(self, session: Session) -> NodeProtoCache:
+        """
+        Retrieve the node protobuf cache shared by event streams for a session.
+
+        :param session: session to get cache for
+        :return: session node protobuf cache
+        """
+        with self.node_caches_lock:
+            node_cache = self.node_caches.get(session.id)
+            if node_cache is None or node_cache.session is not session:
+                node_cache = NodeProtoCache(session)
+                self.node_caches[session.id] = node_cache
+            return node_cache
+
+    def invalidate_node_cache(self, session: Session, node_id: int = None) -> None:
+        """
+        Invalidate cached node protobufs for a session, after node configuration
+        changes, and record the nodes as changed for the session.
+
+        :param session: session to invalidate cache for
+        :param node_id: node to invalidate, all nodes when not provided
+        :return: nothing
+        """
+        with self.node_caches_lock:
+            node_cache = self.node_caches.get(session.id)
+        if node_cache and node_cache.session is session:
+            node_cache.invalidate(node_id)
+        node_ids = [node_id] if node_id is not None else list(session.nodes)
+        for changed_id in node_ids:
+            session.changes.node_changed(changed_id)
+
     def get_session(self, session_id: int, context: ServicerContext) -> Session:
         """
         Retrieve session given the session id
@@ -201,6 +242,27 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
             raise CoreError("move node must provide a geo or position to move")
         session = self.get_session(session_id, context)
         node = self.get_node(session, node_id, context, NodeBase)
+        self.set_node_position(session, node, geo, position, source)
+
+    def set_node_position(
+        self,
+        session: Session,
+        node: NodeBase,
+        geo: core_pb2.Geo = None,
+        position: core_pb2.Position = None,
+        source: str = None,
+    ) -> None:
+        """
+        Set a node position, either by x,y position or geospatial, and broadcast
+        the change.
+
+        :param session: session node is within
+        :param node: node to move
+        :param geo: geospatial position to move to
+        :param position: x,y position to move to
+        :param source: source of the move
+        :return: nothing
+        """
         if geo:
             session.set_node_geo(node, geo.lon, geo.lat, geo.alt)
         else:
@@ -208,6 +270,30 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         source = source if source else None
         session.broadcast_node(node, source=source)
 
+    def set_nodes_positions(
+        self, session: Session, request: core_pb2.MoveNodesRequest
+    ) -> None:
+        """
+        Set positions for a group of nodes, either by x,y positions or geospatial,
+        together and broadcast the changes.
+
+        :param session: session nodes are within
+        :param request: move nodes request with packed node positions or geos
+        :return: nothing
+        :raises CoreError: when a node does not exist or positions are invalid
+        """
+        if request.HasField("positions"):
+            positions = request.positions
+            nodes = [session.get_node(x, NodeBase) for x in positions.node_ids]
+            session.set_node_positions(nodes, positions.x, positions.y)
+        else:
+            geos = request.geos
+            nodes = [session.get_node(x, NodeBase) for x in geos.node_ids]
+            session.set_node_geos(nodes, geos.lon, geos.lat, geos.alt)
+        # changes and sdt were updated for the group when moved
+        source = request.source if request.source else None
+        session.broadcast_nodes(nodes, source, update=False)
+
     def validate_service(
         self, name: str, context: ServicerContext
     ) -> Type[ConfigService]:
@@ -308,6 +394,7 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         for node in request.session.nodes:
             core_node = self.get_node(session, node.id, context, NodeBase)
             grpcutils.configure_node(session, node, core_node, context)
+        self.invalidate_node_cache(session)
 
         # create links
         links = []
@@ -395,6 +482,8 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         """
         logger.debug("delete session: %s", request)
         result = self.coreemu.delete_session(request.session_id)
+        with self.node_caches_lock:
+            self.node_caches.pop(request.session_id, None)
         return core_pb2.DeleteSessionResponse(result=result)
 
     def GetSessions(
@@ -450,6 +539,30 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         session_proto = grpcutils.convert_session(session)
         return core_pb2.GetSessionResponse(session=session_proto)
 
+    def GetSessionChanges(
+        self, request: core_pb2.GetSessionChangesRequest, context: ServicerContext
+    ) -> core_pb2.GetSessionChangesResponse:
+        """
+        Retrieve nodes and links changed since a session version, or the full
+        session when changes since the version are no longer known.
+
+        :param request: get-session-changes request
+        :param context: context object
+        :return: get-session-changes response
+        """
+        logger.debug("get session changes: %s", request)
+        session = self.get_session(request.session_id, context)
+        version, changes = session.changes.since(request.since_version)
+        if changes is None:
+            session_proto = grpcutils.convert_session(session)
+            return core_pb2.GetSessionChangesResponse(
+                version=version, state=session.state.value, session=session_proto
+            )
+        node_cache = self.get_node_cache(session)
+        return grpcutils.convert_session_changes(
+            session, version, changes, node_cache.get_node_proto
+        )
+
     def SessionAlert(
         self, request: core_pb2.SessionAlertRequest, context: ServicerContext
     ) -> core_pb2.SessionAlertResponse:
@@ -465,9 +578,21 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         if not event_types:
             event_types = set(core_pb2.EventType.Enum.values())
 
-        streamer = EventStreamer(session, event_types)
+        window = request.batch_window / 1000
+        node_cache = self.get_node_cache(session)
+        streamer = EventStreamer(
+            session,
+            event_types,
+            node_cache,
+            request.node_ids,
+            request.network_ids,
+            request.link_types,
+        )
         while self._is_running(context):
-            event = streamer.process()
+            if window > 0:
+                event = streamer.process_batch(window)
+            else:
+                event = streamer.process()
             if event:
                 yield event
 
@@ -478,67 +603,39 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         self, request: core_pb2.ThroughputsRequest, context: ServicerContext
     ) -> None:
         """
-        Calculate average throughput after every certain amount of delay time
+        Stream average throughputs for session interfaces and bridges, every
+        requested interval, calculated from the shared interface sampler.
 
         :param request: throughputs request
         :param context: context object
         :return: nothing
         """
         session = self.get_session(request.session_id, context)
-        delay = 3
-        last_check = None
-        last_stats = None
-
+        interval = request.interval or DEFAULT_INTERVAL
+        interval = max(interval, self.throughputs.interval)
+        self.throughputs.start()
         while self._is_running(context):
-            now = time.monotonic()
-            stats = get_net_stats()
-            # calculate average
-            if last_check is not None:
-                interval = now - last_check
-                throughputs_event = core_pb2.ThroughputsEvent(session_id=session.id)
-                for key in stats:
-                    current_rxtx = stats[key]
-                    previous_rxtx = last_stats.get(key)
-                    if not previous_rxtx:
-                        continue
-                    rx_kbps = (
-                        (current_rxtx["rx"] - previous_rxtx["rx"]) * 8.0 / interval
-                    )
-                    tx_kbps = (
-                        (current_rxtx["tx"] - previous_rxtx["tx"]) * 8.0 / interval
-                    )
-                    throughput = rx_kbps + tx_kbps
-                    if key.startswith("beth"):
-                        key = key.split(".")
-                        node_id = _INTERFACE_REGEX.search(key[0]).group("node")
-                        node_id = int(node_id, base=16)
-                        iface_id = int(key[1])
-                        session_id = key[2]
-                        if session.short_session_id() != session_id:
-                            continue
-                        iface_throughput = throughputs_event.iface_throughputs.add()
-                        iface_throughput.node_id = node_id
-                        iface_throughput.iface_id = iface_id
-                        iface_throughput.throughput = throughput
-                    elif key.startswith("b."):
-                        try:
-                            key = key.split(".")
-                            node_id = int(key[1], base=16)
-                            session_id = key[2]
-                            if session.short_session_id() != session_id:
-                                continue
-                            bridge_throughput = (
-                                throughputs_event.bridge_throughputs.add()
-                            )
-                            bridge_throughput.node_id = node_id
-                            bridge_throughput.throughput = throughput
-                        except ValueError:
-                            pass
-                yield throughputs_event
-
-            last_check = now
-            last_stats = stats
-            time.sleep(delay)
+            time.sleep(interval)
+            yield self.throughputs.get_throughputs(session, interval)
+
+    def GetThroughputs(
+        self, request: core_pb2.GetThroughputsRequest, context: ServicerContext
+    ) -> core_pb2.GetThroughputsResponse:
+        """
+        Retrieve average throughputs for session interfaces and bridges, for each
+        interval within a previous duration of time.
+
+        :param request: get throughputs request
+        :param context: context object
+        :return: get throughputs response
+        """
+        session = self.get_session(request.session_id, context)
+        interval = request.interval or DEFAULT_INTERVAL
+        interval = max(interval, self.throughputs.interval)
+        duration = request.duration or interval
+        self.throughputs.start()
+        events = self.throughputs.get_history(session, interval, duration)
+        return core_pb2.GetThroughputsResponse(events=events)
 
     def CpuUsage(
         self, request: core_pb2.CpuUsageRequest, context: ServicerContext
@@ -631,6 +728,13 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         :return: move nodes response
         """
         for request in request_iterator:
+            if request.HasField("positions") or request.HasField("geos"):
+                session = self.get_session(request.session_id, context)
+                try:
+                    self.set_nodes_positions(session, request)
+                except CoreError as e:
+                    context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+                continue
             geo = request.geo if request.HasField("geo") else None
             position = request.position if request.HasField("position") else None
             self.move_node(
@@ -658,6 +762,7 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         node = self.get_node(session, request.node_id, context, NodeBase)
         node.icon = request.icon or None
         source = request.source or None
+        self.invalidate_node_cache(session, node.id)
         session.broadcast_node(node, source=source)
         return core_pb2.EditNodeResponse(result=True)
 
@@ -702,6 +807,167 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
             return_code = e.returncode
         return core_pb2.NodeCommandResponse(output=output, return_code=return_code)
 
+    def NodeCommandStream(
+        self, request: core_pb2.NodeCommandStreamRequest, context: ServicerContext
+    ) -> Iterator[core_pb2.NodeCommandStreamResponse]:
+        """
+        Run a command on a node, streaming its output as it is produced and its
+        return code once exited. The command is stopped when the client cancels
+        or disconnects.
+
+        :param request: node-command-stream request
+        :param context: context object
+        :return: stream of command output
+        """
+        logger.debug("node command stream: %s", request)
+        session = self.get_session(request.session_id, context)
+        node = self.get_node(session, request.node_id, context, CoreNode)
+        try:
+            stream = node.cmd_stream(request.command, request.shell)
+        except (CoreError, CoreCommandError) as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        # stop command on termination, ending any waiting read
+        context.add_callback(stream.stop)
+        with stream:
+            while not stream.done:
+                if not self._is_running(context):
+                    return
+                for is_stderr, data in stream.read(_COMMAND_STREAM_TIMEOUT):
+                    yield grpcutils.convert_command_output(is_stderr, data)
+            return_code = stream.wait()
+        yield core_pb2.NodeCommandStreamResponse(exited=True, return_code=return_code)
+
+    def NodesCommand(
+        self, request: core_pb2.NodesCommandRequest, context: ServicerContext
+    ) -> None:
+        """
+        Run commands, in order, on a set of nodes within a pool of workers,
+        streaming the results for each node as they complete.
+
+        :param request: nodes-command request
+        :param context: context object
+        :return: nothing
+        """
+        logger.debug("sending nodes command: %s", request)
+        session = self.get_session(request.session_id, context)
+        nodes = [self.get_node(session, x, context, CoreNode) for x in request.node_ids]
+        workers = self.get_command_workers(request)
+        executor = futures.ThreadPoolExecutor(max_workers=workers)
+        try:
+            node_futures = [
+                executor.submit(self.run_node_cmds, x, request) for x in nodes
+            ]
+            for future in futures.as_completed(node_futures):
+                if not self._is_running(context):
+                    break
+                yield future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_command_workers(self, request: core_pb2.NodesCommandRequest) -> int:
+        """
+        Retrieve the number of workers to run node commands within, limited to a
+        valid range.
+
+        :param request: nodes-command request
+        :return: number of workers
+        """
+        workers = request.workers or _COMMAND_WORKERS
+        return max(1, min(workers, _MAX_COMMAND_WORKERS))
+
+    def run_node_cmds(
+        self, node: CoreNode, request: core_pb2.NodesCommandRequest
+    ) -> core_pb2.NodesCommandResponse:
+        """
+        Run commands, in order, on a node and time them.
+
+        :param node: node to run commands on
+        :param request: nodes-command request
+        :return: nodes command response for node
+        """
+        response = core_pb2.NodesCommandResponse(node_id=node.id)
+        for command in request.commands:
+            start = time.monotonic()
+            try:
+                output = node.cmd(command, request.wait, request.shell)
+                return_code = 0
+            except CoreCommandError as e:
+                output = e.stderr
+                return_code = e.returncode
+            duration = time.monotonic() - start
+            response.results.add(
+                command=command,
+                output=output,
+                return_code=return_code,
+                duration=duration,
+            )
+        return response
+
+    def UploadNodeFile(
+        self,
+        request_iterator: Iterable[core_pb2.UploadNodeFileRequest],
+        context: ServicerContext,
+    ) -> core_pb2.UploadNodeFileResponse:
+        """
+        Upload a file to a node, from streamed chunks written to a temporary file
+        before being copied to the node.
+
+        :param request_iterator: upload-node-file request stream, the first
+            request provides the node, path, mode and compression used
+        :param context: context object
+        :return: upload-node-file response
+        """
+        request = next(request_iterator, None)
+        if request is None:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "no file provided")
+        logger.debug(
+            "upload node file: session(%s) node(%s) path(%s)",
+            request.session_id,
+            request.node_id,
+            request.path,
+        )
+        session = self.get_session(request.session_id, context)
+        node = self.get_node(session, request.node_id, context, CoreNodeBase)
+        data = itertools.chain([request.data], (x.data for x in request_iterator))
+        mode = request.mode or 0o644
+        temp = tempfile.NamedTemporaryFile(delete=False)
+        try:
+            with temp:
+                size = write_chunks(data, temp, request.compress)
+            node.copy_file(Path(temp.name), Path(request.path), mode)
+        except (CoreError, CoreCommandError, OSError) as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        finally:
+            os.unlink(temp.name)
+        return core_pb2.UploadNodeFileResponse(result=True, size=size)
+
+    def DownloadNodeFile(
+        self, request: core_pb2.DownloadNodeFileRequest, context: ServicerContext
+    ) -> Iterator[core_pb2.FileChunk]:
+        """
+        Download a file from a node in chunks, the node file is copied to a
+        temporary file before being streamed.
+
+        :param request: download-node-file request
+        :param context: context object
+        :return: file chunk stream
+        """
+        logger.debug("download node file: %s", request)
+        session = self.get_session(request.session_id, context)
+        node = self.get_node(session, request.node_id, context, CoreNodeBase)
+        fd, temp_path = tempfile.mkstemp()
+        os.close(fd)
+        temp_path = Path(temp_path)
+        try:
+            try:
+                node.get_file(Path(request.path), temp_path)
+            except (CoreError, CoreCommandError, OSError) as e:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+            for data in read_chunks(temp_path, request.compress):
+                yield core_pb2.FileChunk(data=data)
+        finally:
+            temp_path.unlink()
+
     def GetNodeTerminal(
         self, request: core_pb2.GetNodeTerminalRequest, context: ServicerContext
     ) -> core_pb2.GetNodeTerminalResponse:
@@ -884,6 +1150,7 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         session.mobility.set_model_config(
             mobility_config.node_id, Ns2ScriptedMobility.name, mobility_config.config
         )
+        self.invalidate_node_cache(session, mobility_config.node_id)
         return SetMobilityConfigResponse(result=True)
 
     def MobilityAction(
@@ -1103,6 +1370,7 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         node_id = request.wlan_config.node_id
         config = request.wlan_config.config
         session.mobility.set_model_config(node_id, BasicRangeModel.name, config)
+        self.invalidate_node_cache(session, node_id)
         if session.state == EventTypes.RUNTIME_STATE:
             node = self.get_node(session, node_id, context, WlanNode)
             node.updatemodel(config)
@@ -1143,6 +1411,7 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         model_config = request.emane_model_config
         _id = utils.iface_config_id(model_config.node_id, model_config.iface_id)
         session.emane.set_config(_id, model_config.model, model_config.config)
+        self.invalidate_node_cache(session, model_config.node_id)
         return SetEmaneModelConfigResponse(result=True)
 
     def SaveXml(
@@ -1174,14 +1443,84 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
         :return: Open-XML response or raise an exception if invalid XML file
         """
         logger.debug("open xml: %s", request)
-        session = self.coreemu.create_session()
         temp = tempfile.NamedTemporaryFile(delete=False)
         temp.write(request.data.encode("utf-8"))
         temp.close()
-        temp_path = Path(temp.name)
-        file_path = Path(request.file)
         try:
-            session.open_xml(temp_path, request.start)
+            return self.open_session_xml(
+                Path(temp.name), Path(request.file), request.start, context
+            )
+        finally:
+            os.unlink(temp.name)
+
+    def SaveXmlStream(
+        self, request: core_pb2.SaveXmlStreamRequest, context: ServicerContext
+    ) -> Iterator[core_pb2.FileChunk]:
+        """
+        Export the session into the EmulationScript XML format, streamed in
+        chunks.
+
+        :param request: save-xml-stream request
+        :param context: context object
+        :return: file chunk stream
+        """
+        logger.debug("save xml stream: %s", request)
+        session = self.get_session(request.session_id, context)
+        fd, temp_path = tempfile.mkstemp()
+        os.close(fd)
+        temp_path = Path(temp_path)
+        try:
+            session.save_xml(temp_path)
+            for data in read_chunks(temp_path, request.compress):
+                yield core_pb2.FileChunk(data=data)
+        finally:
+            temp_path.unlink()
+
+    def OpenXmlStream(
+        self,
+        request_iterator: Iterable[core_pb2.OpenXmlStreamRequest],
+        context: ServicerContext,
+    ) -> core_pb2.OpenXmlResponse:
+        """
+        Import a session from the EmulationScript XML format, streamed in chunks.
+
+        :param request_iterator: open-xml-stream request stream, the first
+            request provides the file name, start and compression used
+        :param context: context object
+        :return: Open-XML response or raise an exception if invalid XML file
+        """
+        request = next(request_iterator, None)
+        if request is None:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "no xml file provided")
+        logger.debug("open xml stream: file(%s) start(%s)", request.file, request.start)
+        data = itertools.chain([request.data], (x.data for x in request_iterator))
+        temp = tempfile.NamedTemporaryFile(delete=False)
+        try:
+            with temp:
+                write_chunks(data, temp, request.compress)
+            return self.open_session_xml(
+                Path(temp.name), Path(request.file), request.start, context
+            )
+        except CoreError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        finally:
+            os.unlink(temp.name)
+
+    def open_session_xml(
+        self, xml_path: Path, file_path: Path, start: bool, context: ServicerContext
+    ) -> core_pb2.OpenXmlResponse:
+        """
+        Create a new session from a received XML file.
+
+        :param xml_path: path of received XML file
+        :param file_path: original path of XML file, used for session name
+        :param start: True to start session, False otherwise
+        :param context: context object
+        :return: Open-XML response or raise an exception if invalid XML file
+        """
+        session = self.coreemu.create_session()
+        try:
+            session.open_xml(xml_path, start)
             session.name = file_path.name
             session.file_path = file_path
             return core_pb2.OpenXmlResponse(session_id=session.id, result=True)
@@ -1189,8 +1528,6 @@ class CoreGrpcServer(core_pb2_grpc.CoreApiServicer):
             logger.exception("error opening session file")
             self.coreemu.delete_session(session.id)
             context.abort(grpc.StatusCode.INVALID_ARGUMENT, "invalid xml file")
-        finally:
-            os.unlink(temp.name)
 
     def GetInterfaces(
         self, request: core_pb2.GetInterfacesRequest, context: ServicerContext
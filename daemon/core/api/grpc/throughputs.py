@@ -0,0 +1,328 @@
+"""
+Shared sampling of interface statistics for all sessions within the daemon,
+keeping a history of counters for each session interface and bridge, used to
+calculate throughputs for any number of subscribers.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Tuple
+
+from core.api.grpc import core_pb2
+from core.nodes.base import CoreNodeBase
+from core.nodes.network import CoreNetwork
+
+if TYPE_CHECKING:
+    from core.emulator.coreemu import CoreEmu
+    from core.emulator.session import Session
+
+logger = logging.getLogger(__name__)
+NET_DEV_PATH: str = "/proc/net/dev"
+SAMPLE_INTERVAL: float = 0.5
+HISTORY_SIZE: int = 600
+DEFAULT_INTERVAL: float = 3.0
+
+
+def read_net_dev() -> List[str]:
+    """
+    Read interface statistics lines from /proc/net/dev, without headers.
+
+    :return: interface statistics lines
+    """
+    with open(NET_DEV_PATH, "r") as f:
+        return f.readlines()[2:]
+
+
+class InterfaceSeries:
+    """
+    Ring buffer of counter samples for a session interface or bridge.
+    """
+
+    def __init__(self, node_id: int, iface_id: Optional[int], size: int) -> None:
+        """
+        Create an InterfaceSeries instance.
+
+        :param node_id: id of node the interface or bridge belongs to
+        :param iface_id: id of node interface, None for bridges
+        :param size: max number of samples to keep
+        """
+        self.node_id: int = node_id
+        self.iface_id: Optional[int] = iface_id
+        self.samples: Deque[Tuple[float, float, float]] = deque(maxlen=size)
+
+    def add(self, now: float, rx: float, tx: float) -> None:
+        """
+        Add a counter sample.
+
+        :param now: time of sample
+        :param rx: received bytes
+        :param tx: transmitted bytes
+        :return: nothing
+        """
+        self.samples.append((now, rx, tx))
+
+    def get_sample(self, end: float) -> Optional[Tuple[float, float, float]]:
+        """
+        Retrieve the latest sample taken at or before a given time.
+
+        :param end: time to get sample for
+        :return: sample time, rx and tx, None when no sample exists
+        """
+        for sample in reversed(self.samples):
+            if sample[0] <= end:
+                return sample
+        return None
+
+    def throughput(self, start: float, end: float) -> Optional[float]:
+        """
+        Calculate average throughput in bits per second between two times, using
+        the samples taken closest to, but not after, the given times.
+
+        :param start: start time
+        :param end: end time
+        :return: throughput, None when there are not enough samples
+        """
+        last = self.get_sample(end)
+        first = self.get_sample(start)
+        if last is None or first is None or last[0] <= first[0]:
+            return None
+        interval = last[0] - first[0]
+        return ((last[1] - first[1]) + (last[2] - first[2])) * 8.0 / interval
+
+
+class SessionSeries:
+    """
+    Interface series for all interfaces and bridges within a session.
+    """
+
+    def __init__(self, session: "Session", size: int) -> None:
+        """
+        Create a SessionSeries instance.
+
+        :param session: session to track interfaces for
+        :param size: max number of samples to keep for each interface
+        """
+        self.session: "Session" = session
+        self.size: int = size
+        self.version: Optional[Tuple[int, int]] = None
+        self.series: Dict[str, InterfaceSeries] = {}
+
+    def update(self) -> None:
+        """
+        Update the mapping of interface names to the nodes and interfaces they
+        belong to, when session nodes or links have changed.
+
+        :return: nothing
+        """
+        version = (self.session.link_manager.version, len(self.session.nodes))
+        if version == self.version:
+            return
+        self.version = version
+        series = {}
+        for node in list(self.session.nodes.values()):
+            if isinstance(node, CoreNetwork):
+                series[node.brname] = self.series.get(node.brname) or InterfaceSeries(
+                    node.id, None, self.size
+                )
+            elif isinstance(node, CoreNodeBase):
+                for iface in node.get_ifaces(control=False):
+                    name = iface.localname
+                    series[name] = self.series.get(name) or InterfaceSeries(
+                        node.id, iface.id, self.size
+                    )
+        self.series = series
+
+    def throughputs(
+        self, end: float, interval: float, timestamp: float
+    ) -> core_pb2.ThroughputsEvent:
+        """
+        Create a throughputs event, for the average throughputs over an interval.
+
+        :param end: time to calculate throughputs up to
+        :param interval: interval to average throughputs over
+        :param timestamp: wall clock time of event
+        :return: throughputs event
+        """
+        event = core_pb2.ThroughputsEvent(session_id=self.session.id, time=timestamp)
+        start = end - interval
+        for series in self.series.values():
+            throughput = series.throughput(start, end)
+            if throughput is None:
+                continue
+            if series.iface_id is None:
+                bridge_throughput = event.bridge_throughputs.add()
+                bridge_throughput.node_id = series.node_id
+                bridge_throughput.throughput = throughput
+            else:
+                iface_throughput = event.iface_throughputs.add()
+                iface_throughput.node_id = series.node_id
+                iface_throughput.iface_id = series.iface_id
+                iface_throughput.throughput = throughput
+        return event
+
+
+class ThroughputSampler:
+    """
+    Periodically samples interface statistics for all session interfaces and
+    bridges, shared by all throughput subscriptions.
+    """
+
+    def __init__(
+        self,
+        coreemu: "CoreEmu",
+        interval: float = SAMPLE_INTERVAL,
+        size: int = HISTORY_SIZE,
+    ) -> None:
+        """
+        Create a ThroughputSampler instance.
+
+        :param coreemu: coreemu containing sessions to sample
+        :param interval: time between samples
+        :param size: max number of samples to keep for each interface
+        """
+        self.coreemu: "CoreEmu" = coreemu
+        self.interval: float = interval
+        self.size: int = size
+        self.lock: threading.Lock = threading.Lock()
+        self.sessions: Dict[int, SessionSeries] = {}
+        # monotonic and wall clock times of samples taken
+        self.times: Deque[Tuple[float, float]] = deque(maxlen=size)
+        self.running: threading.Event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Start sampling within a thread, if not already started.
+
+        :return: nothing
+        """
+        with self.lock:
+            if self.thread:
+                return
+            self.running.set()
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop sampling.
+
+        :return: nothing
+        """
+        with self.lock:
+            thread, self.thread = self.thread, None
+            self.running.clear()
+        if thread and thread != threading.current_thread():
+            thread.join()
+
+    def run(self) -> None:
+        """
+        Sample interface statistics every interval, while running.
+
+        :return: nothing
+        """
+        while self.running.is_set():
+            start = time.monotonic()
+            try:
+                self.sample()
+            except Exception:
+                logger.exception("error sampling interface statistics")
+            elapsed = time.monotonic() - start
+            time.sleep(max(self.interval - elapsed, 0))
+
+    def sample(
+        self, now: float = None, lines: List[str] = None, timestamp: float = None
+    ) -> None:
+        """
+        Sample interface statistics for all session interfaces and bridges.
+
+        :param now: monotonic time of sample, defaults to current time
+        :param lines: interface statistics lines, defaults to reading
+            /proc/net/dev
+        :param timestamp: wall clock time of sample, defaults to current time
+        :return: nothing
+        """
+        with self.lock:
+            for session_id in list(self.sessions):
+                if self.coreemu.sessions.get(session_id) is None:
+                    self.sessions.pop(session_id)
+            names = {}
+            for session in list(self.coreemu.sessions.values()):
+                session_series = self.sessions.get(session.id)
+                if session_series is None or session_series.session is not session:
+                    session_series = SessionSeries(session, self.size)
+                    self.sessions[session.id] = session_series
+                session_series.update()
+                names.update(session_series.series)
+        if not names:
+            return
+        if now is None:
+            now = time.monotonic()
+        if timestamp is None:
+            timestamp = time.time()
+        if lines is None:
+            lines = read_net_dev()
+        with self.lock:
+            self.times.append((now, timestamp))
+            for line in lines:
+                name, _, values = line.partition(":")
+                series = names.get(name.strip())
+                if series is None:
+                    continue
+                values = values.split()
+                series.add(now, float(values[0]), float(values[8]))
+
+    def get_throughputs(
+        self, session: "Session", interval: float, end: float = None
+    ) -> core_pb2.ThroughputsEvent:
+        """
+        Retrieve average throughputs for a session over an interval.
+
+        :param session: session to get throughputs for
+        :param interval: interval to average throughputs over
+        :param end: time to calculate throughputs up to, defaults to current time
+        :return: throughputs event
+        """
+        if end is None:
+            end = time.monotonic()
+        with self.lock:
+            timestamp = self.get_timestamp(end)
+            session_series = self.sessions.get(session.id)
+            if session_series is None or session_series.session is not session:
+                return core_pb2.ThroughputsEvent(session_id=session.id, time=timestamp)
+            return session_series.throughputs(end, interval, timestamp)
+
+    def get_timestamp(self, end: float) -> float:
+        """
+        Retrieve the wall clock time of the latest sample taken at or before a
+        given monotonic time, must be called while holding the lock.
+
+        :param end: monotonic time to get wall clock time for
+        :return: wall clock time of sample, or the wall clock time equivalent of
+            the provided time when no sample exists
+        """
+        for now, timestamp in reversed(self.times):
+            if now <= end:
+                return timestamp
+        return time.time() - (time.monotonic() - end)
+
+    def get_history(
+        self, session: "Session", interval: float, duration: float, end: float = None
+    ) -> List[core_pb2.ThroughputsEvent]:
+        """
+        Retrieve average throughputs for a session for each interval within a
+        previous duration of time, limited by the history kept.
+
+        :param session: session to get throughputs for
+        :param interval: interval to average throughputs over
+        :param duration: duration of time to get throughputs for
+        :param end: time the duration ends at, defaults to current time
+        :return: throughputs events, oldest first
+        """
+        if end is None:
+            end = time.monotonic()
+        count = max(int(duration / interval), 1)
+        ends = [end - (interval * x) for x in reversed(range(count))]
+        return [self.get_throughputs(session, interval, x) for x in ends]
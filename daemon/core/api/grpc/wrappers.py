@@ -336,11 +336,58 @@ class InterfaceThroughput:
         )
 
 
+@dataclass
+class CommandResult:
+    command: str
+    output: str
+    return_code: int
+    duration: float
+
+    @classmethod
+    def from_proto(cls, proto: core_pb2.CommandResult) -> "CommandResult":
+        return CommandResult(
+            command=proto.command,
+            output=proto.output,
+            return_code=proto.return_code,
+            duration=proto.duration,
+        )
+
+
+@dataclass
+class CommandOutput:
+    stdout: bytes
+    stderr: bytes
+    exited: bool = False
+    return_code: int = None
+
+    @classmethod
+    def from_proto(cls, proto: core_pb2.NodeCommandStreamResponse) -> "CommandOutput":
+        return_code = proto.return_code if proto.exited else None
+        return CommandOutput(
+            stdout=proto.stdout,
+            stderr=proto.stderr,
+            exited=proto.exited,
+            return_code=return_code,
+        )
+
+
+@dataclass
+class NodeCommandResults:
+    node_id: int
+    results: List[CommandResult]
+
+    @classmethod
+    def from_proto(cls, proto: core_pb2.NodesCommandResponse) -> "NodeCommandResults":
+        results = [CommandResult.from_proto(x) for x in proto.results]
+        return NodeCommandResults(node_id=proto.node_id, results=results)
+
+
 @dataclass
 class ThroughputsEvent:
     session_id: int
     bridge_throughputs: List[BridgeThroughput]
     iface_throughputs: List[InterfaceThroughput]
+    time: float = None
 
     @classmethod
     def from_proto(cls, proto: core_pb2.ThroughputsEvent) -> "ThroughputsEvent":
@@ -350,6 +397,7 @@ class ThroughputsEvent:
             session_id=proto.session_id,
             bridge_throughputs=bridges,
             iface_throughputs=ifaces,
+            time=proto.time,
         )
 
 
@@ -993,6 +1041,32 @@ class Session:
             self.options[key] = option
 
 
+@dataclass
+class SessionChanges:
+    version: int
+    state: SessionState
+    session: Optional[Session] = None
+    nodes: List[Node] = field(default_factory=list)
+    deleted_node_ids: List[int] = field(default_factory=list)
+    links: List[Link] = field(default_factory=list)
+    deleted_links: List[Link] = field(default_factory=list)
+
+    @classmethod
+    def from_proto(cls, proto: core_pb2.GetSessionChangesResponse) -> "SessionChanges":
+        session = None
+        if proto.HasField("session"):
+            session = Session.from_proto(proto.session)
+        return SessionChanges(
+            version=proto.version,
+            state=SessionState(proto.state),
+            session=session,
+            nodes=[Node.from_proto(x) for x in proto.nodes],
+            deleted_node_ids=list(proto.deleted_node_ids),
+            links=[Link.from_proto(x) for x in proto.links],
+            deleted_links=[Link.from_proto(x) for x in proto.deleted_links],
+        )
+
+
 @dataclass
 class CoreConfig:
     services: List[Service] = field(default_factory=list)
@@ -1199,6 +1273,33 @@ class EmanePathlossesRequest:
         )
 
 
+@dataclass(frozen=True, eq=False)
+class MoveNodesBatch:
+    session_id: int
+    node_ids: List[int]
+    source: str = None
+    positions: List[Tuple[float, float]] = None
+    geos: List[Tuple[float, float, float]] = None
+
+    def to_proto(self) -> core_pb2.MoveNodesRequest:
+        positions = None
+        geos = None
+        if self.positions is not None:
+            xs, ys = zip(*self.positions) if self.positions else ([], [])
+            positions = core_pb2.NodePositions(node_ids=self.node_ids, x=xs, y=ys)
+        else:
+            lons, lats, alts = zip(*self.geos) if self.geos else ([], [], [])
+            geos = core_pb2.NodeGeos(
+                node_ids=self.node_ids, lon=lons, lat=lats, alt=alts
+            )
+        return core_pb2.MoveNodesRequest(
+            session_id=self.session_id,
+            source=self.source,
+            positions=positions,
+            geos=geos,
+        )
+
+
 @dataclass(frozen=True)
 class MoveNodesRequest:
     session_id: int
@@ -5,19 +5,37 @@ Implements configuration and control of an EMANE emulation.
 import logging
 import os
 import threading
+import time
 from enum import Enum
-from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 from core import utils
 from core.emane.emanemodel import EmaneModel
 from core.emane.linkmonitor import EmaneLinkMonitor
 from core.emane.modelmanager import EmaneModelManager
 from core.emane.nodes import EmaneNet, TunTap
+from core.emane.pathloss import (
+    DEFAULT_EXPONENT,
+    PathlossEngine,
+    Pathlosses,
+    PathlossModel,
+)
 from core.emulator.data import LinkData
 from core.emulator.enumerations import LinkTypes, MessageFlags, RegisterTlvs
 from core.errors import CoreCommandError, CoreError
 from core.nodes.base import CoreNode, NodeBase
 from core.nodes.interface import CoreInterface
+from core.nodes.netlink import LinkWatcher
 from core.xml import emanexml
 
 logger = logging.getLogger(__name__)
@@ -46,6 +64,11 @@ except ImportError:
         logger.debug("compatible emane python bindings not installed")
 
 DEFAULT_LOG_LEVEL: int = 3
+# max number of nodes to start emane for at once
+MAX_STARTUP_WORKERS: int = 16
+# max time in seconds to wait for nem tap devices to exist
+DEVICE_TIMEOUT: float = 10.0
+NemIface = Tuple[EmaneNet, TunTap, Dict[str, str]]
 
 
 class EmaneState(Enum):
@@ -130,6 +153,8 @@ class EmaneManager:
         self.ifaces_to_nems: Dict[CoreInterface, int] = {}
         self._emane_nets: Dict[int, EmaneNet] = {}
         self._emane_node_lock: threading.Lock = threading.Lock()
+        # time taken for each phase of the last startup
+        self.startup_times: Dict[str, float] = {}
         # port numbers are allocated from these counters
         self.platformport: int = self.session.options.get_int(
             "emane_platform_port", 8100
@@ -146,6 +171,8 @@ class EmaneManager:
 
         # link  monitor
         self.link_monitor: EmaneLinkMonitor = EmaneLinkMonitor(self)
+        # pathloss engine, when enabled
+        self.pathloss: Optional[PathlossEngine] = None
         # emane event monitoring
         self.services: Dict[str, EmaneEventService] = {}
         self.nem_service: Dict[int, EmaneEventService] = {}
@@ -309,20 +336,127 @@ class EmaneManager:
         status = self.setup()
         if status != EmaneState.SUCCESS:
             return status
+        self.pathloss = self.create_pathloss()
         self.startup_nodes()
         if self.links_enabled():
             self.link_monitor.start()
         return EmaneState.SUCCESS
 
+    def create_pathloss(self) -> Optional[PathlossEngine]:
+        """
+        Create the pathloss engine, when enabled by session options.
+
+        :return: pathloss engine, None when not enabled
+        :raises CoreError: when the pathloss model is unknown
+        """
+        value = self.session.options.get("emane_pathloss")
+        if not value:
+            return None
+        try:
+            model = PathlossModel(value)
+        except ValueError:
+            raise CoreError(f"unknown emane pathloss model: {value}")
+        options = self.session.options
+        exponent = options.get_float("emane_pathloss_exponent", DEFAULT_EXPONENT)
+        logger.info("emane pathloss engine model(%s)", model.value)
+        return PathlossEngine(self, model, exponent)
+
     def startup_nodes(self) -> None:
+        """
+        Start emane for all nems. Nems are configured in order, while xml
+        generation, daemon launches and waiting for devices are ran for each node
+        concurrently.
+
+        :return: nothing
+        """
         with self._emane_node_lock:
             logger.info("emane building xmls...")
+            self.startup_times.clear()
+            start = time.monotonic()
+            node_ifaces = {}
             for emane_net, iface in self.get_ifaces():
-                self.start_iface(emane_net, iface)
+                config = self.setup_iface(emane_net, iface)
+                node_ifaces.setdefault(iface.node, []).append(
+                    (emane_net, iface, config)
+                )
+            self.startup_times["setup"] = time.monotonic() - start
+            nem_ifaces = list(node_ifaces.values())
+            self.run_phase("xml", self.build_node_xmls, nem_ifaces)
+            self.run_phase("daemons", self.start_node_daemons, nem_ifaces)
+            self.run_phase("devices", self.install_node_ifaces, nem_ifaces)
+            total = time.monotonic() - start
+            times = " ".join(f"{k}({v:.3f}s)" for k, v in self.startup_times.items())
+            logger.info(
+                "emane started nodes(%s) total(%.3fs) %s", len(nem_ifaces), total, times
+            )
 
-    def start_iface(self, emane_net: EmaneNet, iface: TunTap) -> None:
+    def run_phase(
+        self,
+        name: str,
+        func: Callable[[List[NemIface]], None],
+        nem_ifaces: List[List[NemIface]],
+    ) -> None:
+        """
+        Run a startup phase for each node concurrently, recording the time taken.
+
+        :param name: name of phase
+        :param func: function to run with the nem interfaces of a node
+        :param nem_ifaces: nem interfaces for each node
+        :return: nothing
+        :raises Exception: first exception raised while running the phase
+        """
+        start = time.monotonic()
+        funcs = [(func, (x,), {}) for x in nem_ifaces]
+        _, exceptions = utils.threadpool(funcs, MAX_STARTUP_WORKERS)
+        self.startup_times[name] = time.monotonic() - start
+        if exceptions:
+            raise exceptions[0]
+
+    def build_node_xmls(self, nem_ifaces: List[NemIface]) -> None:
+        for emane_net, iface, config in nem_ifaces:
+            nem_id = self.get_nem_id(iface)
+            nem_port = self.get_nem_port(iface)
+            emanexml.build_platform_xml(nem_id, nem_port, emane_net, iface, config)
+
+    def start_node_daemons(self, nem_ifaces: List[NemIface]) -> None:
+        for _, iface, _ in nem_ifaces:
+            self.start_daemon(iface)
+
+    def install_node_ifaces(self, nem_ifaces: List[NemIface]) -> None:
+        """
+        Wait for the tap devices of a node to exist and install them. When using
+        netlink, devices are detected from link events within the node.
+
+        :param nem_ifaces: nem interfaces for a node
+        :return: nothing
+        :raises CoreError: when devices fail to exist
+        """
+        node = nem_ifaces[0][1].node
+        wait = True
+        if isinstance(node, CoreNode) and node.use_netlink():
+            names = [
+                x.name
+                for _, x, config in nem_ifaces
+                if not emanexml.is_external(config)
+            ]
+            with LinkWatcher(node.pid) as watcher:
+                missing = watcher.wait(names, DEVICE_TIMEOUT)
+            if missing:
+                missing = ", ".join(sorted(missing))
+                raise CoreError(f"node({node.name}) emane devices missing: {missing}")
+            wait = False
+        for _, iface, config in nem_ifaces:
+            self.install_iface(iface, config, wait)
+
+    def setup_iface(self, emane_net: EmaneNet, iface: TunTap) -> Dict[str, str]:
+        """
+        Allocate a nem and setup control channels for an interface.
+
+        :param emane_net: emane network for interface
+        :param iface: interface to setup
+        :return: emane configuration for interface
+        """
         nem_id = self.next_nem_id(iface)
-        nem_port = self.get_nem_port(iface)
         logger.info(
             "starting emane for node(%s) iface(%s) nem(%s)",
             iface.node.name,
@@ -330,9 +464,16 @@ class EmaneManager:
             nem_id,
         )
         config = self.get_iface_config(emane_net, iface)
+        if self.pathloss:
+            config = dict(config, propagationmodel="precomputed")
         self.setup_control_channels(nem_id, iface, config)
-        emanexml.build_platform_xml(nem_id, nem_port, emane_net, iface, config)
-        self.start_daemon(iface)
+        return config
+
+    def start_iface(self, emane_net: EmaneNet, iface: TunTap) -> None:
+        config = self.setup_iface(emane_net, iface)
+        nem_ifaces = [(emane_net, iface, config)]
+        self.build_node_xmls(nem_ifaces)
+        self.start_node_daemons(nem_ifaces)
         self.install_iface(iface, config)
 
     def get_ifaces(self) -> List[Tuple[EmaneNet, TunTap]]:
@@ -440,12 +581,48 @@ class EmaneManager:
         alt = int(round(alt))
         return nem_id, lon, lat, alt
 
+    def get_nem_positions(
+        self, ifaces: List[CoreInterface]
+    ) -> List[Tuple[int, float, float, int]]:
+        """
+        Retrieves nem positions for a group of interfaces, converting all
+        positions together.
+
+        :param ifaces: interfaces to get nem emane positions for
+        :return: nem position tuples for interfaces with a known nem
+        """
+        nem_ifaces = []
+        for iface in ifaces:
+            nem_id = self.get_nem_id(iface)
+            if nem_id is None:
+                logger.info("nem for %s is unknown", iface.localname)
+                continue
+            nem_ifaces.append((nem_id, iface))
+        if not nem_ifaces:
+            return []
+        xs, ys, zs = zip(*[x.node.getposition() for _, x in nem_ifaces])
+        lats, lons, alts = self.session.location.getgeo_many(xs, ys, zs)
+        positions = []
+        for (nem_id, iface), lon, lat, alt in zip(nem_ifaces, lons, lats, alts):
+            node = iface.node
+            lon, lat, alt = float(lon), float(lat), float(alt)
+            if node.position.alt is not None:
+                alt = node.position.alt
+            node.position.set_geo(lon, lat, alt)
+            # altitude must be an integer or warning is printed
+            positions.append((nem_id, lon, lat, int(round(alt))))
+        return positions
+
     def set_nem_position(self, iface: CoreInterface) -> None:
         """
         Publish a NEM location change event using the EMANE event service.
 
         :param iface: interface to set nem position for
         """
+        if self.pathloss:
+            self.pathloss.update([iface])
+            if not self.genlocationevents():
+                return
         position = self.get_nem_position(iface)
         if position:
             nemid, lon, lat, alt = position
@@ -461,12 +638,12 @@ class EmaneManager:
         """
         if not moved_ifaces:
             return
+        if self.pathloss:
+            self.pathloss.update(moved_ifaces)
+            if not self.genlocationevents():
+                return
         services = {}
-        for iface in moved_ifaces:
-            position = self.get_nem_position(iface)
-            if not position:
-                continue
-            nem_id, lon, lat, alt = position
+        for nem_id, lon, lat, alt in self.get_nem_positions(moved_ifaces):
             service = self.nem_service.get(nem_id)
             if not service:
                 continue
@@ -501,6 +678,9 @@ class EmaneManager:
                     emane_net.wireless_model.post_startup(iface)
                     if events_enabled:
                         iface.setposition()
+            if self.pathloss:
+                ifaces = [x for _, x in self.get_ifaces()]
+                self.pathloss.start(ifaces)
 
     def reset(self) -> None:
         """
@@ -513,6 +693,7 @@ class EmaneManager:
             self.ifaces_to_nems.clear()
             self.nems_to_ifaces.clear()
             self.services.clear()
+            self.pathloss = None
 
     def shutdown(self) -> None:
         """
@@ -624,13 +805,14 @@ class EmaneManager:
             args = f"{emanecmd} -f {log_file} {platform_xml}"
             node.host_cmd(args, cwd=self.session.directory)
 
-    def install_iface(self, iface: TunTap, config: Dict[str, str]) -> None:
-        external = config.get("external", "0")
-        if external == "0":
-            iface.set_ips()
+    def install_iface(
+        self, iface: TunTap, config: Dict[str, str], wait: bool = True
+    ) -> None:
+        if not emanexml.is_external(config):
+            iface.set_ips(wait)
         # at this point we register location handlers for generating
-        # EMANE location events
-        if self.genlocationevents():
+        # EMANE location events and pathloss
+        if self.genlocationevents() or self.pathloss:
             iface.poshook = self.set_nem_position
             iface.setposition()
 
@@ -755,6 +937,20 @@ class EmaneManager:
         self.publish_event(nem1, event)
         self.publish_event(nem2, event)
 
+    def publish_pathlosses(self, pathlosses: Pathlosses) -> None:
+        """
+        Publish pathloss events, one event is published for each receiving nem,
+        containing pathloss from all transmitting nems that have changed.
+
+        :param pathlosses: pathloss from transmitting nems for each receiving nem
+        :return: nothing
+        """
+        for nem_id, values in pathlosses.items():
+            event = PathlossEvent()
+            for tx_nem_id, pathloss in values:
+                event.append(tx_nem_id, forward=pathloss)
+            self.publish_event(nem_id, event)
+
     def publish_event(
         self,
         nem_id: int,
@@ -1,11 +1,14 @@
+import bisect
 import logging
-import sched
 import threading
 import time
-from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+from concurrent import futures
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
 
 from lxml import etree
 
+from core import utils
 from core.emane.nodes import EmaneNet
 from core.emulator.data import LinkData
 from core.emulator.enumerations import LinkTypes, MessageFlags
@@ -22,6 +25,8 @@ except ImportError:
         shell = None
         logger.debug("compatible emane python bindings not installed")
 
+np = utils.get_numpy()
+
 if TYPE_CHECKING:
     from core.emane.emanemanager import EmaneManager
 
@@ -31,53 +36,115 @@ EMANE_80211: str = "ieee80211abgmaclayer"
 EMANE_TDMA: str = "tdmaeventschedulerradiomodel"
 SINR_TABLE: str = "NeighborStatusTable"
 NEM_SELF: int = 65535
+# max number of emane clients polled at once
+MAX_WORKERS: int = 16
+
+LinkKey = Tuple[int, int]
 
 
 class LossTable:
+    """
+    Converts sinr values to loss, using the sinr and probability of reception
+    values from a pcr curve, sorted by sinr.
+    """
+
     def __init__(self, losses: Dict[float, float]) -> None:
         self.losses: Dict[float, float] = losses
         self.sinrs: List[float] = sorted(self.losses.keys())
-        self.loss_lookup: Dict[int, float] = {}
-        for index, value in enumerate(self.sinrs):
-            self.loss_lookup[index] = self.losses[value]
+        self.loss_values: List[float] = [100.0 - self.losses[x] for x in self.sinrs]
+        if np is not None:
+            self.sinr_array: Optional["np.ndarray"] = np.array(self.sinrs)
+            self.loss_array: Optional["np.ndarray"] = np.array(self.loss_values)
+        else:
+            self.sinr_array = None
+            self.loss_array = None
         self.mac_id: Optional[str] = None
 
     def get_loss(self, sinr: float) -> float:
         index = self._get_index(sinr)
-        loss = 100.0 - self.loss_lookup[index]
-        return loss
+        return self.loss_values[index]
+
+    def get_losses(self, sinrs: Iterable[float]) -> List[float]:
+        """
+        Convert a group of sinr values to losses, vectorized when numpy is
+        available.
+
+        :param sinrs: sinr values to convert
+        :return: loss for each sinr value
+        """
+        if self.sinr_array is None:
+            return [self.get_loss(x) for x in sinrs]
+        sinrs = np.fromiter(sinrs, dtype=float)
+        indexes = np.searchsorted(self.sinr_array, sinrs, side="left")
+        indexes = np.minimum(indexes, len(self.sinrs) - 1)
+        return self.loss_array[indexes].tolist()
 
     def _get_index(self, current_sinr: float) -> int:
-        for index, sinr in enumerate(self.sinrs):
-            if current_sinr <= sinr:
-                return index
-        return len(self.sinrs) - 1
+        # first sinr greater than or equal to the current sinr, or the last
+        index = bisect.bisect_left(self.sinrs, current_sinr)
+        return min(index, len(self.sinrs) - 1)
 
 
 class EmaneLink:
-    def __init__(self, from_nem: int, to_nem: int, sinr: float) -> None:
+    def __init__(
+        self, from_nem: int, to_nem: int, sinr: float, now: float = None
+    ) -> None:
         self.from_nem: int = from_nem
         self.to_nem: int = to_nem
         self.sinr: float = sinr
         self.last_seen: Optional[float] = None
         self.updated: bool = False
-        self.touch()
+        self.touch(now)
 
-    def update(self, sinr: float) -> None:
+    def update(self, sinr: float, now: float = None) -> None:
         self.updated = self.sinr != sinr
         self.sinr = sinr
-        self.touch()
+        self.touch(now)
 
-    def touch(self) -> None:
-        self.last_seen = time.monotonic()
+    def touch(self, now: float = None) -> None:
+        self.last_seen = time.monotonic() if now is None else now
 
-    def is_dead(self, timeout: int) -> bool:
-        return (time.monotonic() - self.last_seen) >= timeout
+    def is_dead(self, timeout: int, now: float = None) -> bool:
+        now = time.monotonic() if now is None else now
+        return (now - self.last_seen) >= timeout
 
     def __repr__(self) -> str:
         return f"EmaneLink({self.from_nem}, {self.to_nem}, {self.sinr})"
 
 
+def get_table_links(
+    from_nem: int, loss_table: LossTable, table: List[Tuple], loss_threshold: int
+) -> Dict[LinkKey, float]:
+    """
+    Retrieve links from the rows of a nem neighbor status table, with a loss
+    below a threshold.
+
+    :param from_nem: nem the table is from
+    :param loss_table: loss table for nem
+    :param table: neighbor status table rows
+    :param loss_threshold: loss percentage links must be below
+    :return: sinr for each link
+    """
+    to_nems = []
+    sinrs = []
+    for row in table:
+        to_nem = row[0][0]
+        age = row[-1][0]
+        # exclude invalid links
+        is_self = to_nem == NEM_SELF
+        has_valid_age = 0 <= age <= 1
+        if is_self or not has_valid_age:
+            continue
+        to_nems.append(to_nem)
+        sinrs.append(row[5][0])
+    losses = loss_table.get_losses(sinrs)
+    links = {}
+    for to_nem, sinr, loss in zip(to_nems, sinrs, losses):
+        if loss < loss_threshold:
+            links[(from_nem, to_nem)] = sinr
+    return links
+
+
 class EmaneClient:
     def __init__(self, address: str, port: int) -> None:
         self.address: str = address
@@ -109,34 +176,19 @@ class EmaneClient:
             loss_table.mac_id = mac_id
             self.nems[nem_id] = loss_table
 
-    def check_links(
-        self, links: Dict[Tuple[int, int], EmaneLink], loss_threshold: int
-    ) -> None:
+    def get_links(self, loss_threshold: int) -> Dict[LinkKey, float]:
+        """
+        Retrieve links for all monitored nems, with a loss below a threshold.
+
+        :param loss_threshold: loss percentage links must be below
+        :return: sinr for each link
+        """
+        links = {}
         for from_nem, loss_table in self.nems.items():
             tables = self.client.getStatisticTable(loss_table.mac_id, (SINR_TABLE,))
             table = tables[SINR_TABLE][1:][0]
-            for row in table:
-                row = row
-                to_nem = row[0][0]
-                sinr = row[5][0]
-                age = row[-1][0]
-
-                # exclude invalid links
-                is_self = to_nem == NEM_SELF
-                has_valid_age = 0 <= age <= 1
-                if is_self or not has_valid_age:
-                    continue
-
-                # check if valid link loss
-                link_key = (from_nem, to_nem)
-                loss = loss_table.get_loss(sinr)
-                if loss < loss_threshold:
-                    link = links.get(link_key)
-                    if link:
-                        link.update(sinr)
-                    else:
-                        link = EmaneLink(from_nem, to_nem, sinr)
-                        links[link_key] = link
+            links.update(get_table_links(from_nem, loss_table, table, loss_threshold))
+        return links
 
     def handle_tdma(self, config: Dict[str, Tuple]):
         pcr = config["pcrcurveuri"][0][0]
@@ -176,17 +228,34 @@ class EmaneClient:
         self.client.stop()
 
 
+@dataclass
+class LinkMonitorStats:
+    """
+    Provides timing and results for a link monitor polling round.
+    """
+
+    duration: float = 0.0
+    clients: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    links: int = 0
+
+
 class EmaneLinkMonitor:
     def __init__(self, emane_manager: "EmaneManager") -> None:
         self.emane_manager: "EmaneManager" = emane_manager
         self.clients: List[EmaneClient] = []
-        self.links: Dict[Tuple[int, int], EmaneLink] = {}
-        self.complete_links: Set[Tuple[int, int]] = set()
+        self.links: Dict[LinkKey, EmaneLink] = {}
+        self.complete_links: Set[LinkKey] = set()
         self.loss_threshold: Optional[int] = None
         self.link_interval: Optional[int] = None
         self.link_timeout: Optional[int] = None
-        self.scheduler: Optional[sched.scheduler] = None
+        self.executor: Optional[futures.ThreadPoolExecutor] = None
+        self.pending: Dict[EmaneClient, futures.Future] = {}
+        self.stats: LinkMonitorStats = LinkMonitorStats()
+        self.stopped: threading.Event = threading.Event()
         self.running: bool = False
+        self.thread: Optional[threading.Thread] = None
 
     def start(self) -> None:
         options = self.emane_manager.session.options
@@ -197,11 +266,12 @@ class EmaneLinkMonitor:
         if not self.clients:
             logger.info("no valid emane models to monitor links")
             return
-        self.scheduler = sched.scheduler()
-        self.scheduler.enter(0, 0, self.check_links)
+        workers = min(len(self.clients), MAX_WORKERS)
+        self.executor = futures.ThreadPoolExecutor(max_workers=workers)
+        self.stopped.clear()
         self.running = True
-        thread = threading.Thread(target=self.scheduler.run, daemon=True)
-        thread.start()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
 
     def initialize(self) -> None:
         addresses = self.get_addresses()
@@ -229,60 +299,116 @@ class EmaneLinkMonitor:
                     addresses.append((control, port))
         return addresses
 
-    def check_links(self) -> None:
-        # check for new links
-        previous_links = set(self.links.keys())
+    def run(self) -> None:
+        """
+        Check links every link interval, while running.
+
+        :return: nothing
+        """
+        while self.running:
+            self.check_links()
+            delay = max(self.link_interval - self.stats.duration, 0)
+            self.stopped.wait(delay)
+
+    def poll_clients(self) -> Tuple[Dict[LinkKey, float], LinkMonitorStats]:
+        """
+        Poll all clients for their current links concurrently, waiting up to the
+        link interval. Clients not responding in time are not polled again until
+        their pending poll completes, its results are used for the round it
+        completes within.
+
+        :return: sinr for each link found and stats for polling round
+        """
+        requests = {}
         for client in self.clients:
+            future = self.pending.get(client)
+            if future is None:
+                future = self.executor.submit(client.get_links, self.loss_threshold)
+                self.pending[client] = future
+            requests[future] = client
+        done, not_done = futures.wait(requests, timeout=self.link_interval)
+        stats = LinkMonitorStats(clients=len(requests), timeouts=len(not_done))
+        results = {}
+        for future in done:
+            client = requests[future]
+            self.pending.pop(client, None)
             try:
-                client.check_links(self.links, self.loss_threshold)
-            except shell.ControlPortException:
+                results.update(future.result())
+            except Exception:
+                stats.errors += 1
                 if self.running:
-                    logger.exception("link monitor error")
+                    logger.exception("link monitor error: %s", client.address)
+        return results, stats
 
-        # find new links
-        current_links = set(self.links.keys())
-        new_links = current_links - previous_links
+    def check_links(self) -> None:
+        start = time.monotonic()
+        results, stats = self.poll_clients()
+        # avoid announcing links for a monitor stopped while polling
+        if not self.running:
+            return
+        now = time.monotonic()
+        self.update_links(results, now)
+        stats.duration = time.monotonic() - start
+        stats.links = len(self.links)
+        self.stats = stats
+        logger.debug("emane link monitor round: %s", stats)
+        if stats.duration > self.link_interval:
+            logger.warning(
+                "emane link monitor round(%.3fs) exceeded interval(%ss)",
+                stats.duration,
+                self.link_interval,
+            )
 
-        # find updated and dead links
-        dead_links = []
+    def update_links(self, results: Dict[LinkKey, float], now: float) -> None:
+        """
+        Update links from polling results, and announce links that have been
+        added, updated or are dead, for links seen in both directions.
+
+        :param results: sinr for each link found
+        :param now: time results were retrieved
+        :return: nothing
+        """
+        # update current links, links not found are kept until dead
+        links = {}
         for link_id, link in self.links.items():
-            complete_id = self.get_complete_id(link_id)
-            if link.is_dead(self.link_timeout):
-                dead_links.append(link_id)
-            elif link.updated and complete_id in self.complete_links:
-                link.updated = False
-                self.send_link(MessageFlags.NONE, complete_id)
-
-        # announce dead links
-        for link_id in dead_links:
-            complete_id = self.get_complete_id(link_id)
-            if complete_id in self.complete_links:
-                self.complete_links.remove(complete_id)
-                self.send_link(MessageFlags.DELETE, complete_id)
-            del self.links[link_id]
-
-        # announce new links
-        for link_id in new_links:
-            complete_id = self.get_complete_id(link_id)
-            if complete_id in self.complete_links:
+            if link_id not in results and not link.is_dead(self.link_timeout, now):
+                links[link_id] = link
+        for link_id, sinr in results.items():
+            link = self.links.get(link_id)
+            if link:
+                link.update(sinr, now)
+            else:
+                link = EmaneLink(link_id[0], link_id[1], sinr, now)
+            links[link_id] = link
+
+        # find complete links that were added or updated
+        complete_links = set()
+        added = []
+        updated = []
+        for link_id, link in links.items():
+            reverse_id = link_id[1], link_id[0]
+            if link_id > reverse_id or reverse_id not in links:
                 continue
-            if self.is_complete_link(link_id):
-                self.complete_links.add(complete_id)
-                self.send_link(MessageFlags.ADD, complete_id)
-
-        if self.running:
-            self.scheduler.enter(self.link_interval, 0, self.check_links)
-
-    def get_complete_id(self, link_id: Tuple[int, int]) -> Tuple[int, int]:
-        value1, value2 = link_id
-        if value1 < value2:
-            return value1, value2
-        else:
-            return value2, value1
-
-    def is_complete_link(self, link_id: Tuple[int, int]) -> bool:
-        reverse_id = link_id[1], link_id[0]
-        return link_id in self.links and reverse_id in self.links
+            reverse_link = links[reverse_id]
+            complete_links.add(link_id)
+            if link_id not in self.complete_links:
+                added.append(link_id)
+            elif link.updated or reverse_link.updated:
+                updated.append(link_id)
+            link.updated = False
+            reverse_link.updated = False
+        dead = self.complete_links - complete_links
+        self.complete_links = complete_links
+
+        # announce dead links, labeled from the previous links
+        for link_id in dead:
+            self.send_link(MessageFlags.DELETE, link_id)
+        # replace links at once, as links are read from other threads
+        self.links = links
+        for link_id in updated:
+            self.send_link(MessageFlags.NONE, link_id)
+        for link_id in added:
+            self.send_link(MessageFlags.ADD, link_id)
 
     def get_link_label(self, link_id: Tuple[int, int]) -> str:
         source_id = tuple(sorted(link_id))
@@ -320,7 +446,21 @@ class EmaneLinkMonitor:
         self.emane_manager.session.broadcast_link(link_data)
 
     def stop(self) -> None:
+        """
+        Stop monitoring links, waiting for the current round to finish before
+        clearing state.
+
+        :return: nothing
+        """
         self.running = False
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        self.pending.clear()
         for client in self.clients:
             client.stop()
         self.clients.clear()
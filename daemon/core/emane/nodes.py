@@ -129,13 +129,16 @@ class TunTap(CoreInterface):
             else:
                 raise RuntimeError("node device failed to exist")
 
-    def set_ips(self) -> None:
+    def set_ips(self, wait: bool = True) -> None:
         """
         Set interface ip addresses.
 
+        :param wait: True to wait for the device to exist, False when it is
+            already known to exist
         :return: nothing
         """
-        self.waitfordevicenode()
+        if wait:
+            self.waitfordevicenode()
         for ip in self.ips():
             self.node.node_net_client.create_address(self.name, str(ip))
 
@@ -0,0 +1,273 @@
+"""
+Provides an emane pathloss engine, calculating the pathloss between all nems of
+an emane network from node positions, so only changed pathloss values are
+published as pathloss events, for use with the emane precomputed propagation
+model.
+"""
+
+import logging
+import threading
+import time
+from enum import Enum
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from core import utils
+from core.emane.nodes import EmaneNet
+from core.errors import CoreError
+from core.nodes.interface import CoreInterface
+
+logger = logging.getLogger(__name__)
+
+np = utils.get_numpy()
+
+if TYPE_CHECKING:
+    from core.emane.emanemanager import EmaneManager
+
+SPEED_OF_LIGHT: float = 299_792_458.0
+DEFAULT_FREQUENCY: float = 2.347e9
+DEFAULT_EXPONENT: float = 3.0
+# min distance in meters, avoids infinite pathloss between co-located nems
+MIN_DISTANCE: float = 1.0
+# min antenna height in meters used for two ray pathloss
+MIN_HEIGHT: float = 1.0
+# pathloss changes smaller than this, in dB, are not published
+CHANGE_THRESHOLD: float = 0.1
+# pathloss from transmitting nem, for each receiving nem
+Pathlosses = Dict[int, List[Tuple[int, float]]]
+
+
+class PathlossModel(Enum):
+    """
+    Models available to calculate pathloss.
+    """
+
+    FREE_SPACE = "freespace"
+    TWO_RAY = "2ray"
+    LOG_DISTANCE = "logdistance"
+
+
+def free_space(distances: "np.ndarray", frequency: float) -> "np.ndarray":
+    """
+    Calculate free space pathloss.
+
+    :param distances: distances in meters
+    :param frequency: frequency in hz
+    :return: pathloss in dB
+    """
+    return 20 * np.log10(4 * np.pi * distances * frequency / SPEED_OF_LIGHT)
+
+
+def two_ray(
+    distances: "np.ndarray", heights: "np.ndarray", frequency: float
+) -> "np.ndarray":
+    """
+    Calculate two ray ground reflection pathloss, using free space pathloss when
+    greater, as is the case before the crossover distance.
+
+    :param distances: distances in meters between all nems
+    :param heights: antenna height in meters for each nem
+    :param frequency: frequency in hz
+    :return: pathloss in dB
+    """
+    heights = 20 * np.log10(np.maximum(heights, MIN_HEIGHT))
+    pathloss = 40 * np.log10(distances) - heights[:, None] - heights[None, :]
+    return np.maximum(pathloss, free_space(distances, frequency))
+
+
+def log_distance(
+    distances: "np.ndarray", frequency: float, exponent: float
+) -> "np.ndarray":
+    """
+    Calculate log distance pathloss, using free space pathloss at the min
+    distance as the reference pathloss.
+
+    :param distances: distances in meters
+    :param frequency: frequency in hz
+    :param exponent: pathloss exponent
+    :return: pathloss in dB
+    """
+    reference = free_space(np.float64(MIN_DISTANCE), frequency)
+    return reference + 10 * exponent * np.log10(distances / MIN_DISTANCE)
+
+
+def calc_pathlosses(
+    model: PathlossModel,
+    positions: "np.ndarray",
+    frequency: float,
+    exponent: float = DEFAULT_EXPONENT,
+) -> "np.ndarray":
+    """
+    Calculate the pathloss between all positions.
+
+    :param model: model to calculate pathloss with
+    :param positions: x,y,z positions in meters, one row per nem
+    :param frequency: frequency in hz
+    :param exponent: pathloss exponent for log distance pathloss
+    :return: symmetric matrix of pathloss in dB between all positions
+    """
+    deltas = positions[:, None, :] - positions[None, :, :]
+    distances = np.sqrt(np.sum(deltas * deltas, axis=-1))
+    distances = np.maximum(distances, MIN_DISTANCE)
+    if model == PathlossModel.FREE_SPACE:
+        return free_space(distances, frequency)
+    elif model == PathlossModel.TWO_RAY:
+        return two_ray(distances, positions[:, 2], frequency)
+    else:
+        return log_distance(distances, frequency, exponent)
+
+
+def get_changes(
+    nem_ids: List[int], pathlosses: "np.ndarray", previous: "np.ndarray"
+) -> Tuple[Pathlosses, "np.ndarray"]:
+    """
+    Find pathlosses that have changed from what was previously published.
+
+    :param nem_ids: nem ids for each row and column
+    :param pathlosses: current pathlosses
+    :param previous: previously published pathlosses, nan when never published
+    :return: changed pathlosses from transmitting nems for each receiving nem,
+        and the pathlosses now published
+    """
+    # nan comparisons are false, so values never published are changed
+    changed = ~(np.abs(pathlosses - previous) < CHANGE_THRESHOLD)
+    np.fill_diagonal(changed, False)
+    published = np.where(changed, pathlosses, previous)
+    changes = {}
+    for column in np.flatnonzero(changed.any(axis=0)):
+        rows = np.flatnonzero(changed[:, column])
+        values = pathlosses[rows, column].tolist()
+        changes[nem_ids[column]] = [(nem_ids[x], y) for x, y in zip(rows, values)]
+    return changes, published
+
+
+class PathlossEngine:
+    """
+    Calculates pathloss for emane networks from node positions, tracking what
+    has been published for each network.
+    """
+
+    def __init__(
+        self,
+        emane_manager: "EmaneManager",
+        model: PathlossModel,
+        exponent: float = DEFAULT_EXPONENT,
+    ) -> None:
+        """
+        Create a PathlossEngine instance.
+
+        :param emane_manager: emane manager to publish pathloss with
+        :param model: model to calculate pathloss with
+        :param exponent: pathloss exponent for log distance pathloss
+        :raises CoreError: when numpy is not installed
+        """
+        if np is None:
+            raise CoreError("numpy is required for the emane pathloss engine")
+        self.emane_manager: "EmaneManager" = emane_manager
+        self.model: PathlossModel = model
+        self.exponent: float = exponent
+        self.lock: threading.Lock = threading.Lock()
+        self.net_locks: Dict[int, threading.Lock] = {}
+        self.frequencies: Dict[int, float] = {}
+        self.published: Dict[int, Tuple[List[int], "np.ndarray"]] = {}
+        self.started: bool = False
+
+    def start(self, ifaces: List[CoreInterface]) -> None:
+        """
+        Start calculating pathloss, once all nems are running, publishing all
+        pathloss for the emane networks of the provided interfaces. Updates prior
+        to starting are ignored.
+
+        :param ifaces: interfaces for all nems
+        :return: nothing
+        """
+        self.clear()
+        self.started = True
+        self.update(ifaces)
+
+    def clear(self) -> None:
+        """
+        Clear published pathloss, so all pathloss is published on the next update.
+
+        :return: nothing
+        """
+        with self.lock:
+            self.published.clear()
+
+    def get_net_lock(self, net_id: int) -> threading.Lock:
+        """
+        Retrieve the lock used to calculate and publish pathloss for a network.
+
+        :param net_id: id of emane network
+        :return: network lock
+        """
+        with self.lock:
+            return self.net_locks.setdefault(net_id, threading.Lock())
+
+    def get_frequency(self, emane_net: EmaneNet, iface: CoreInterface) -> float:
+        frequency = self.frequencies.get(emane_net.id)
+        if frequency is None:
+            config = self.emane_manager.get_iface_config(emane_net, iface)
+            frequency = float(config.get("frequency", DEFAULT_FREQUENCY))
+            self.frequencies[emane_net.id] = frequency
+        return frequency
+
+    def update(self, ifaces: List[CoreInterface]) -> None:
+        """
+        Calculate and publish changed pathlosses for the emane networks of the
+        provided interfaces.
+
+        :param ifaces: interfaces that have moved
+        :return: nothing
+        """
+        if not self.started:
+            return
+        emane_nets = {x.net.id: x.net for x in ifaces if isinstance(x.net, EmaneNet)}
+        for net_id in sorted(emane_nets):
+            start = time.monotonic()
+            # calculate and publish together, so what is published to emane
+            # always matches what is tracked as published
+            with self.get_net_lock(net_id):
+                changes = self.update_net(emane_nets[net_id])
+                self.emane_manager.publish_pathlosses(changes)
+            logger.debug(
+                "emane pathloss net(%s) receivers(%s) changes(%s) time(%.3fs)",
+                net_id,
+                len(changes),
+                sum(len(x) for x in changes.values()),
+                time.monotonic() - start,
+            )
+
+    def update_net(self, emane_net: EmaneNet) -> Pathlosses:
+        """
+        Calculate pathloss between all nems within an emane network, and
+        determine what has changed since last published.
+
+        :param emane_net: emane network to calculate pathloss for
+        :return: changed pathlosses from transmitting nems for each receiving nem
+        """
+        nem_ifaces = []
+        for iface in emane_net.get_ifaces():
+            nem_id = self.emane_manager.get_nem_id(iface)
+            if nem_id is not None:
+                nem_ifaces.append((nem_id, iface))
+        nem_ifaces.sort(key=lambda x: x[0])
+        if len(nem_ifaces) < 2:
+            return {}
+        nem_ids = [x[0] for x in nem_ifaces]
+        positions = []
+        for _, iface in nem_ifaces:
+            x, y, z = iface.node.position.get()
+            positions.append((x, y, z or 0.0))
+        location = self.emane_manager.session.location
+        positions = location.pixels2meters(np.array(positions, dtype=float))
+        frequency = self.get_frequency(emane_net, nem_ifaces[0][1])
+        pathlosses = calc_pathlosses(self.model, positions, frequency, self.exponent)
+        with self.lock:
+            published = self.published.get(emane_net.id)
+            if published and published[0] == nem_ids:
+                previous = published[1]
+            else:
+                previous = np.full(pathlosses.shape, np.nan)
+            changes, published = get_changes(nem_ids, pathlosses, previous)
+            self.published[emane_net.id] = (nem_ids, published)
+        return changes
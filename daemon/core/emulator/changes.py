@@ -0,0 +1,145 @@
+"""
+Provides a bounded log of node and link changes for a session, tracked by a
+monotonically increasing version, allowing clients to retrieve only what has
+changed since a previously seen version.
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Deque, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from core.emulator.data import LinkData
+from core.emulator.links import LinkKeyType
+
+CHANGES_SIZE: int = 10000
+
+
+class ChangeKind(Enum):
+    """
+    Kinds of session changes tracked.
+    """
+
+    NODE = 0
+    LINK = 1
+    WIRELESS_LINK = 2
+
+
+@dataclass
+class Change:
+    """
+    Provides a session change, data is only kept for wireless links, which are
+    not tracked by the link manager.
+    """
+
+    version: int
+    kind: ChangeKind
+    key: Hashable
+    data: Any = None
+
+
+class SessionChanges:
+    """
+    Tracks session changes in a bounded log.
+    """
+
+    def __init__(self, size: int = CHANGES_SIZE) -> None:
+        """
+        Create a SessionChanges instance.
+
+        :param size: max number of changes to keep
+        """
+        self.lock: threading.Lock = threading.Lock()
+        self.version: int = 0
+        # versions at or before this are no longer fully covered by the log
+        self.truncated: int = 0
+        self.log: Deque[Change] = deque(maxlen=size)
+
+    def record(self, kind: ChangeKind, key: Hashable, data: Any = None) -> None:
+        """
+        Record a change, incrementing the session version.
+
+        :param kind: kind of change
+        :param key: key of what has changed
+        :param data: data for change, if needed
+        :return: nothing
+        """
+        with self.lock:
+            self.version += 1
+            if len(self.log) == self.log.maxlen:
+                self.truncated = self.log[0].version
+            self.log.append(Change(self.version, kind, key, data))
+
+    def node_changed(self, node_id: int) -> None:
+        """
+        Record a node was added, updated or deleted.
+
+        :param node_id: id of changed node
+        :return: nothing
+        """
+        self.record(ChangeKind.NODE, node_id)
+
+    def nodes_changed(self, node_ids: Iterable[int]) -> None:
+        """
+        Record a group of nodes were updated, under a single lock.
+
+        :param node_ids: ids of changed nodes
+        :return: nothing
+        """
+        with self.lock:
+            for node_id in node_ids:
+                self.version += 1
+                if len(self.log) == self.log.maxlen:
+                    self.truncated = self.log[0].version
+                self.log.append(Change(self.version, ChangeKind.NODE, node_id))
+
+    def link_changed(self, key: LinkKeyType) -> None:
+        """
+        Record a link tracked by the link manager was added, updated or deleted.
+
+        :param key: key of changed link
+        :return: nothing
+        """
+        self.record(ChangeKind.LINK, key)
+
+    def wireless_link_changed(self, link_data: LinkData) -> None:
+        """
+        Record a wireless link was added, updated or deleted.
+
+        :param link_data: wireless link data
+        :return: nothing
+        """
+        node1_id, node2_id = sorted((link_data.node1_id, link_data.node2_id))
+        key = (link_data.network_id, node1_id, node2_id)
+        self.record(ChangeKind.WIRELESS_LINK, key, link_data)
+
+    def reset(self) -> None:
+        """
+        Clear all changes, clients must retrieve the full session afterwards.
+
+        :return: nothing
+        """
+        with self.lock:
+            self.version += 1
+            self.truncated = self.version
+            self.log.clear()
+
+    def since(self, version: int) -> Tuple[int, Optional[List[Change]]]:
+        """
+        Retrieve the latest change for everything changed after a given version.
+
+        :param version: version to get changes after
+        :return: current version and changes in the order they occurred, changes
+            are None when the log no longer covers the version
+        """
+        with self.lock:
+            current = self.version
+            if version < self.truncated or version > current:
+                return current, None
+            changes: Dict[Tuple[ChangeKind, Hashable], Change] = {}
+            for change in reversed(self.log):
+                if change.version <= version:
+                    break
+                changes.setdefault((change.kind, change.key), change)
+        return current, list(reversed(changes.values()))
@@ -0,0 +1,332 @@
+"""
+Support for deferring network configuration commands while a session is being
+configured, allowing them to be ran together using batch mode at well defined
+points, rather than one process per command.
+"""
+
+import logging
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+
+from core import utils
+from core.emulator.enumerations import EventTypes
+from core.errors import CoreCommandError, CoreError
+from core.executables import BASH, IP, TC
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from core.emulator.session import Session
+    from core.nodes.base import NodeBase
+
+DEFAULT_ORIGIN: str = "session"
+FAILED_REGEX: re.Pattern = re.compile(r"^Command failed (?P<path>.+):(?P<line>\d+)$")
+
+
+@dataclass
+class DeferredCommand:
+    """
+    Deferred command and the origin it was created for.
+    """
+
+    args: str
+    origin: str
+
+
+def parse_failures(output: str) -> Dict[int, str]:
+    """
+    Parse batch mode output for failed commands, using the "Command failed"
+    lines produced by ip and tc.
+
+    :param output: output to parse
+    :return: dict of failed line numbers to their error messages
+    """
+    failures = {}
+    messages = []
+    for line in output.splitlines():
+        match = FAILED_REGEX.match(line.strip())
+        if match:
+            failures[int(match.group("line"))] = " ".join(messages)
+            messages = []
+        elif line.strip():
+            messages.append(line.strip())
+    return failures
+
+
+class DeferredCommands:
+    """
+    Deferred commands to run within a given namespace. Commands are ran in order
+    of ip commands, tc commands, followed by all other commands.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[..., str],
+        directory: Path,
+        origin: Callable[[], str] = None,
+    ) -> None:
+        """
+        Create a DeferredCommands instance.
+
+        :param name: name of namespace commands are for
+        :param run: function used to run commands within the namespace
+        :param directory: directory to create batch files within
+        :param origin: function providing the origin for added commands
+        """
+        self.name: str = name
+        self.run: Callable[..., str] = run
+        self.directory: Path = directory
+        self.origin: Optional[Callable[[], str]] = origin
+        self.lock: threading.Lock = threading.Lock()
+        self.ip: List[DeferredCommand] = []
+        self.tc: List[DeferredCommand] = []
+        self.other: List[DeferredCommand] = []
+        self.callbacks: List[Callable[[], None]] = []
+
+    def add(self, args: str, origin: str = None) -> None:
+        """
+        Add a command to defer.
+
+        :param args: command to defer
+        :param origin: description of what the command was created for, defaults
+            to the origin provided by this instance
+        :return: nothing
+        """
+        if origin is None:
+            origin = self.origin() if self.origin else DEFAULT_ORIGIN
+        executable, _, batch_args = args.partition(" ")
+        with self.lock:
+            if executable == IP:
+                self.ip.append(DeferredCommand(batch_args, origin))
+            elif executable == TC:
+                self.tc.append(DeferredCommand(batch_args, origin))
+            else:
+                self.other.append(DeferredCommand(args, origin))
+
+    def add_callback(self, func: Callable[[], None]) -> None:
+        """
+        Add a function to run after all deferred commands have been ran.
+
+        :param func: function to run
+        :return: nothing
+        """
+        with self.lock:
+            self.callbacks.append(func)
+
+    def is_empty(self) -> bool:
+        return not (self.ip or self.tc or self.other or self.callbacks)
+
+    def _run_batch(
+        self, name: str, args: str, lines: List[str], commands: List[DeferredCommand]
+    ) -> List[str]:
+        """
+        Write lines to a batch file and run it, mapping failures back to the
+        commands that created them.
+
+        :param name: name to use for the batch file
+        :param args: command used to run the batch file, formatted with the path
+        :param lines: batch file lines
+        :param commands: commands that created the lines
+        :return: errors for failed commands
+        """
+        path = self.directory / f"deferred.{self.name}.{name}"
+        path.write_text("\n".join(lines) + "\n")
+        try:
+            self.run(args.format(path=path))
+            return []
+        except CoreCommandError as e:
+            failures = parse_failures(f"{e.output}\n{e.stderr}")
+            if not failures:
+                return [f"{self.name}: {e}"]
+            errors = []
+            for line_number, message in sorted(failures.items()):
+                command = commands[line_number - 1]
+                errors.append(
+                    f"{command.origin}: {name}({command.args}) failed: {message}"
+                )
+            return errors
+        finally:
+            path.unlink(missing_ok=True)
+
+    def flush(self) -> List[str]:
+        """
+        Run all deferred commands.
+
+        :return: errors for any failed commands
+        """
+        with self.lock:
+            ip, self.ip = self.ip, []
+            tc, self.tc = self.tc, []
+            other, self.other = self.other, []
+            callbacks, self.callbacks = self.callbacks, []
+        errors = []
+        if ip:
+            lines = [x.args for x in ip]
+            errors += self._run_batch(IP, f"{IP} -force -batch {{path}}", lines, ip)
+        if tc:
+            lines = [x.args for x in tc]
+            errors += self._run_batch(TC, f"{TC} -force -batch {{path}}", lines, tc)
+        if other:
+            lines = ["failed=0"]
+            for index, command in enumerate(other, start=1):
+                lines.append(
+                    f"{command.args} || "
+                    f'{{ echo "Command failed {BASH}:{index}" >&2; failed=1; }}'
+                )
+            lines.append("exit $failed")
+            errors += self._run_batch(BASH, f"{BASH} {{path}}", lines, other)
+        if not errors:
+            for callback in callbacks:
+                try:
+                    callback()
+                except CoreCommandError as e:
+                    errors.append(f"{self.name}: {e}")
+        return errors
+
+
+class DeferredCommandManager:
+    """
+    Manages deferring network commands for a session, while the session is in the
+    configuration state and deferring has been enabled.
+    """
+
+    def __init__(self, session: "Session") -> None:
+        """
+        Create a DeferredCommandManager instance.
+
+        :param session: session commands are being deferred for
+        """
+        self.session: "Session" = session
+        self.lock: threading.Lock = threading.Lock()
+        self.host: Optional[DeferredCommands] = None
+        self.nodes: Dict[int, DeferredCommands] = {}
+        self.local: threading.local = threading.local()
+        self.errors: List[str] = []
+
+    def enabled(self) -> bool:
+        """
+        Check if commands should currently be deferred.
+
+        :return: True if deferring commands, False otherwise
+        """
+        return (
+            not getattr(self.local, "suspended", False)
+            and self.session.options.get_int("deferred_commands") == 1
+            and self.session.state == EventTypes.CONFIGURATION_STATE
+            and not self.session.use_ovs()
+            and not self.session.distributed.servers
+        )
+
+    @contextmanager
+    def origin(self, origin: str) -> Iterator[None]:
+        """
+        Context for labeling commands deferred by the current thread, used to
+        report failures.
+
+        :param origin: origin label
+        :return: nothing
+        """
+        previous = getattr(self.local, "origin", DEFAULT_ORIGIN)
+        self.local.origin = origin
+        try:
+            yield
+        finally:
+            self.local.origin = previous
+
+    @contextmanager
+    def suspend(self) -> Iterator[None]:
+        """
+        Context for running commands immediately from the current thread, even
+        when commands are being deferred.
+
+        :return: nothing
+        """
+        previous = getattr(self.local, "suspended", False)
+        self.local.suspended = True
+        try:
+            yield
+        finally:
+            self.local.suspended = previous
+
+    def current_origin(self) -> str:
+        return getattr(self.local, "origin", DEFAULT_ORIGIN)
+
+    def get_host(self) -> Optional[DeferredCommands]:
+        """
+        Retrieve deferred commands for the host, when deferring commands.
+
+        :return: host deferred commands, None when not deferring
+        """
+        if not self.enabled():
+            return None
+        with self.lock:
+            if self.host is None:
+                self.host = DeferredCommands(
+                    "host", utils.cmd, self.session.directory, self.current_origin
+                )
+            return self.host
+
+    def get_node(self, node: "NodeBase") -> Optional[DeferredCommands]:
+        """
+        Retrieve deferred commands for a node, when deferring commands.
+
+        :param node: node to get deferred commands for
+        :return: node deferred commands, None when not deferring
+        """
+        if not self.enabled():
+            return None
+        with self.lock:
+            deferred = self.nodes.get(node.id)
+            if deferred is None:
+                deferred = DeferredCommands(
+                    node.name, node.cmd, self.session.directory, self.current_origin
+                )
+                self.nodes[node.id] = deferred
+            return deferred
+
+    def remove_node(self, node: "NodeBase") -> None:
+        """
+        Drop deferred commands for a node, without running them.
+
+        :param node: node to drop deferred commands for
+        :return: nothing
+        """
+        with self.lock:
+            self.nodes.pop(node.id, None)
+
+    def flush(self) -> None:
+        """
+        Run all deferred commands, host commands are ran first, followed by all
+        node commands in parallel. Failures are collected to be retrieved using
+        pop_errors.
+
+        :return: nothing
+        """
+        with self.lock:
+            host, self.host = self.host, None
+            nodes, self.nodes = self.nodes, {}
+        if host and not host.is_empty():
+            self.errors.extend(host.flush())
+        funcs = [(x.flush, (), {}) for x in nodes.values() if not x.is_empty()]
+        if funcs:
+            results, exceptions = utils.threadpool(funcs)
+            for result in results:
+                self.errors.extend(result)
+            self.errors.extend(str(x) for x in exceptions)
+        for error in self.errors:
+            logger.error("deferred command error: %s", error)
+
+    def pop_errors(self) -> List[Exception]:
+        """
+        Retrieve and clear errors collected from running deferred commands.
+
+        :return: errors for failed deferred commands
+        """
+        errors = [CoreError(x) for x in self.errors]
+        self.errors.clear()
+        return errors
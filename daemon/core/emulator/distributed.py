@@ -94,6 +94,17 @@ class DistributedServer:
         with self.lock:
             self.conn.put(str(src_path), str(dst_path))
 
+    def remote_get(self, src_path: Path, dst_path: Path) -> None:
+        """
+        Pull file from remote server.
+
+        :param src_path: remote file to pull
+        :param dst_path: local destination file location
+        :return: nothing
+        """
+        with self.lock:
+            self.conn.get(str(src_path), str(dst_path))
+
     def remote_put_temp(self, dst_path: Path, data: str) -> None:
         """
         Remote push file contents to a remote server, using a temp file as an
@@ -147,6 +147,8 @@ class LinkManager:
         """
         self._links: Dict[LinkKeyType, CoreLink] = {}
         self._node_links: Dict[int, Dict[LinkKeyType, CoreLink]] = {}
+        # incremented for every change to tracked links
+        self.version: int = 0
 
     def add(self, core_link: CoreLink) -> None:
         """
@@ -174,6 +176,7 @@ class LinkManager:
         node1_links[core_link.key()] = core_link
         node2_links = self._node_links.setdefault(node2.id, {})
         node2_links[core_link.key()] = core_link
+        self.version += 1
 
     def delete(
         self,
@@ -208,6 +211,7 @@ class LinkManager:
         node1_links.pop(key)
         node2_links = self._node_links[node2.id]
         node2_links.pop(key)
+        self.version += 1
         return self._links.pop(key)
 
     def reset(self) -> None:
@@ -218,6 +222,7 @@ class LinkManager:
         """
         self._links.clear()
         self._node_links.clear()
+        self.version += 1
 
     def get_link(
         self,
@@ -238,6 +243,15 @@ class LinkManager:
         key = create_key(node1, iface1, node2, iface2)
         return self._links.get(key)
 
+    def get_link_by_key(self, key: LinkKeyType) -> Optional[CoreLink]:
+        """
+        Retrieve a link for a given link key.
+
+        :param key: key of link to get
+        :return: core link if present, None otherwise
+        """
+        return self._links.get(key)
+
     def links(self) -> ValuesView[CoreLink]:
         """
         Retrieve all known links
@@ -20,6 +20,7 @@ from core import constants, utils
 from core.configservice.manager import ConfigServiceManager
 from core.emane.emanemanager import EmaneManager, EmaneState
 from core.emane.nodes import EmaneNet
+from core.emulator.changes import SessionChanges
 from core.emulator.data import (
     ConfigData,
     EventData,
@@ -30,10 +31,12 @@ from core.emulator.data import (
     LinkOptions,
     NodeData,
 )
+from core.emulator.deferred import DeferredCommandManager
 from core.emulator.distributed import DistributedController
 from core.emulator.enumerations import (
     EventTypes,
     ExceptionLevels,
+    LinkTypes,
     MessageFlags,
     NodeTypes,
 )
@@ -42,7 +45,7 @@ from core.emulator.sessionconfig import SessionConfig
 from core.errors import CoreError
 from core.location.event import EventLoop
 from core.location.geo import GeoLocation
-from core.location.mobility import BasicRangeModel, MobilityManager
+from core.location.mobility import BasicRangeModel, MobilityManager, WirelessModel
 from core.nodes.base import CoreNode, CoreNodeBase, NodeBase, NodeOptions, Position
 from core.nodes.docker import DockerNode
 from core.nodes.interface import DEFAULT_MTU, CoreInterface
@@ -127,6 +130,7 @@ class Session:
         self.nodes: Dict[int, NodeBase] = {}
         self.nodes_lock: threading.Lock = threading.Lock()
         self.link_manager: LinkManager = LinkManager()
+        self.changes: SessionChanges = SessionChanges()
 
         # states and hooks handlers
         self.state: EventTypes = EventTypes.DEFINITION_STATE
@@ -152,6 +156,9 @@ class Session:
         # distributed support and logic
         self.distributed: DistributedController = DistributedController(self)
 
+        # batching of network commands during configuration
+        self.deferred: DeferredCommandManager = DeferredCommandManager(self)
+
         # initialize session feature helpers
         self.location: GeoLocation = GeoLocation()
         self.mobility: MobilityManager = MobilityManager(self)
@@ -192,6 +199,18 @@ class Session:
     def use_ovs(self) -> bool:
         return self.options.get_int("ovs") == 1
 
+    def use_netlink(self) -> bool:
+        return self.options.get_int("netlink") == 1
+
+    def use_node_agent(self) -> bool:
+        return self.options.get_int("node_agent") == 1
+
+    def use_nftables_sets(self) -> bool:
+        return self.options.get_int("nftables_sets") == 1
+
+    def use_vectorized_mobility(self) -> bool:
+        return self.options.get_int("vectorized_mobility") == 1
+
     def linked(
         self, node1_id: int, node2_id: int, iface1_id: int, iface2_id: int, linked: bool
     ) -> None:
@@ -274,18 +293,20 @@ class Session:
         # custom links
         iface1 = None
         iface2 = None
-        if isinstance(node1, (WlanNode, WirelessNode)):
-            iface2 = self._add_wlan_link(node2, iface2_data, node1)
-        elif isinstance(node2, (WlanNode, WirelessNode)):
-            iface1 = self._add_wlan_link(node1, iface1_data, node2)
-        elif isinstance(node1, EmaneNet) and isinstance(node2, CoreNode):
-            iface2 = self._add_emane_link(node2, iface2_data, node1)
-        elif isinstance(node2, EmaneNet) and isinstance(node1, CoreNode):
-            iface1 = self._add_emane_link(node1, iface1_data, node2)
-        else:
-            iface1, iface2 = self._add_wired_link(
-                node1, node2, iface1_data, iface2_data, options
-            )
+        # label deferred commands with the link that created them
+        with self.deferred.origin(f"link node({node1.name}) node({node2.name})"):
+            if isinstance(node1, (WlanNode, WirelessNode)):
+                iface2 = self._add_wlan_link(node2, iface2_data, node1)
+            elif isinstance(node2, (WlanNode, WirelessNode)):
+                iface1 = self._add_wlan_link(node1, iface1_data, node2)
+            elif isinstance(node1, EmaneNet) and isinstance(node2, CoreNode):
+                iface2 = self._add_emane_link(node2, iface2_data, node1)
+            elif isinstance(node2, EmaneNet) and isinstance(node1, CoreNode):
+                iface1 = self._add_emane_link(node1, iface1_data, node2)
+            else:
+                iface1, iface2 = self._add_wired_link(
+                    node1, node2, iface1_data, iface2_data, options
+                )
         # configure tunnel nodes
         key = options.key
         if isinstance(node1, TunnelNode):
@@ -318,6 +339,7 @@ class Session:
         # track link
         core_link = CoreLink(node, iface, net, None)
         self.link_manager.add(core_link)
+        self.changes.link_changed(core_link.key())
         return iface
 
     def _add_emane_link(
@@ -336,6 +358,7 @@ class Session:
         # track link
         core_link = CoreLink(node, iface, net, None)
         self.link_manager.add(core_link)
+        self.changes.link_changed(core_link.key())
         return iface
 
     def _add_wired_link(
@@ -366,6 +389,7 @@ class Session:
         # track link
         core_link = CoreLink(node1, iface1, node2, iface2, ptp)
         self.link_manager.add(core_link)
+        self.changes.link_changed(core_link.key())
         # setup link for gre tunnels if needed
         if ptp.up:
             self.distributed.create_gre_tunnels(core_link)
@@ -411,6 +435,7 @@ class Session:
             iface1 = node1.delete_iface(iface1_id)
             iface2 = node2.delete_iface(iface2_id)
         core_link = self.link_manager.delete(node1, iface1, node2, iface2)
+        self.changes.link_changed(core_link.key())
         if core_link.ptp:
             self.delete_node(core_link.ptp.id)
         self.sdt.delete_link(node1_id, node2_id)
@@ -460,6 +485,7 @@ class Session:
         if iface2 and not options.unidirectional:
             iface2.options.update(options)
             iface2.set_config()
+        self.changes.link_changed(core_link.key())
 
     def next_node_id(self) -> int:
         """
@@ -509,7 +535,8 @@ class Session:
             if not dist_server:
                 raise CoreError(f"invalid distributed server: {server}")
         # create node
-        node = self.create_node(_class, start, _id, name, dist_server, options)
+        with self.deferred.origin(f"node({name or _id or _class.__name__})"):
+            node = self.create_node(_class, start, _id, name, dist_server, options)
         # set node position
         position = position or Position()
         if position.has_geo():
@@ -529,6 +556,7 @@ class Session:
 
     def set_node_pos(self, node: NodeBase, x: float, y: float) -> None:
         node.setposition(x, y, None)
+        self.changes.node_changed(node.id)
         self.sdt.edit_node(
             node, node.position.lon, node.position.lat, node.position.alt
         )
@@ -541,8 +569,94 @@ class Session:
             )
         node.setposition(x, y, None)
         node.position.set_geo(lon, lat, alt)
+        self.changes.node_changed(node.id)
         self.sdt.edit_node(node, lon, lat, alt)
 
+    def set_node_positions(
+        self, nodes: List[NodeBase], xs: List[float], ys: List[float]
+    ) -> None:
+        """
+        Move a group of nodes to x,y positions together, all positions are set
+        before any wireless or emane calculations are done, which are then done
+        once for the whole group.
+
+        :param nodes: nodes to move
+        :param xs: x positions for each node
+        :param ys: y positions for each node
+        :return: nothing
+        """
+        if not (len(nodes) == len(xs) == len(ys)):
+            raise CoreError("node positions must be provided for every node")
+        moved = []
+        for node, x, y in zip(nodes, xs, ys):
+            if node.position.set(x, y, None):
+                moved.append(node)
+        self.update_node_positions(moved)
+
+    def set_node_geos(
+        self,
+        nodes: List[NodeBase],
+        lons: List[float],
+        lats: List[float],
+        alts: List[float],
+    ) -> None:
+        """
+        Move a group of nodes to geospatial positions together, all positions are
+        validated and set before any wireless or emane calculations are done,
+        which are then done once for the whole group.
+
+        :param nodes: nodes to move
+        :param lons: longitudes for each node
+        :param lats: latitudes for each node
+        :param alts: altitudes for each node
+        :return: nothing
+        :raises CoreError: when any geospatial position is invalid
+        """
+        if not (len(nodes) == len(lons) == len(lats) == len(alts)):
+            raise CoreError("node geos must be provided for every node")
+        xs, ys, _ = self.location.getxyz_many(lats, lons, alts)
+        for x, y, lon, lat, alt in zip(xs, ys, lons, lats, alts):
+            if math.isinf(x) or math.isinf(y):
+                raise CoreError(
+                    f"invalid geo for current reference/scale: {lon},{lat},{alt}"
+                )
+        moved = []
+        for node, x, y, lon, lat, alt in zip(nodes, xs, ys, lons, lats, alts):
+            changed = node.position.set(float(x), float(y), None)
+            node.position.set_geo(lon, lat, alt)
+            if changed:
+                moved.append(node)
+        self.update_node_positions(moved)
+
+    def update_node_positions(self, nodes: List[NodeBase]) -> None:
+        """
+        Update sdt and run position hooks for nodes whose positions have been set
+        directly. Interfaces are grouped by what their hook is for, so wireless
+        models, wireless nodes and emane calculate once for all moved interfaces.
+
+        :param nodes: nodes that have moved
+        :return: nothing
+        """
+        groups = {}
+        self.sdt.edit_nodes(nodes)
+        for node in nodes:
+            self.changes.node_changed(node.id)
+            for iface in node.get_ifaces():
+                if not iface.poshook:
+                    continue
+                owner = getattr(iface.poshook, "__self__", None)
+                if isinstance(owner, (WirelessModel, WirelessNode, EmaneManager)):
+                    groups.setdefault(owner, []).append(iface)
+                else:
+                    iface.setposition()
+        for owner, ifaces in groups.items():
+            if isinstance(owner, WirelessModel):
+                owner.update(ifaces)
+            elif isinstance(owner, WirelessNode):
+                owner.calc_links(ifaces)
+            else:
+                owner.set_nem_positions(ifaces)
+
     def open_xml(self, file_path: Path, start: bool = False) -> None:
         """
         Import a session from the EmulationScript XML format.
@@ -606,7 +720,11 @@ class Session:
         """
         self.emane.shutdown()
         self.delete_nodes()
+        # run deferred commands, which may include removing deleted node links
+        self.deferred.flush()
+        self.deferred.pop_errors()
         self.link_manager.reset()
+        self.changes.reset()
         self.distributed.shutdown()
         self.hooks.clear()
         self.emane.reset()
@@ -681,10 +799,33 @@ class Session:
         :param source: source of broadcast, None by default
         :return: nothing
         """
+        self.changes.node_changed(node.id)
         node_data = NodeData(node=node, message_type=message_type, source=source)
         for handler in self.node_handlers:
             handler(node_data)
 
+    def broadcast_nodes(
+        self, nodes: List[NodeBase], source: str = None, update: bool = True
+    ) -> None:
+        """
+        Handle updated node data for a group of nodes, sdt is updated for the
+        whole group at once, other node handlers are provided data for each node.
+
+        :param nodes: nodes to broadcast
+        :param source: source of broadcast, None by default
+        :param update: True to record node changes and update sdt, False when
+            already done, as when moved using set_node_positions or set_node_geos
+        :return: nothing
+        """
+        if update:
+            self.changes.nodes_changed(x.id for x in nodes)
+            self.sdt.edit_nodes(nodes)
+        handlers = [x for x in self.node_handlers if x != self.sdt.handle_node_update]
+        for node in nodes:
+            node_data = NodeData(node=node, source=source)
+            for handler in handlers:
+                handler(node_data)
+
     def broadcast_file(self, file_data: FileData) -> None:
         """
         Handle file data that should be provided to file handlers.
@@ -712,6 +853,8 @@ class Session:
         :param link_data: link data to send out
         :return: nothing
         """
+        if link_data.type == LinkTypes.WIRELESS:
+            self.changes.wireless_link_changed(link_data)
         for handler in self.link_handlers:
             handler(link_data)
 
@@ -725,6 +868,9 @@ class Session:
         """
         if self.state == state:
             return
+        # run deferred network commands, before leaving the configuration state
+        if self.state == EventTypes.CONFIGURATION_STATE:
+            self.deferred.flush()
         self.state = state
         self.state_time = time.monotonic()
         logger.info("changing session(%s) to state %s", self.id, state.name)
@@ -962,7 +1108,9 @@ class Session:
                 node = self.nodes.pop(_id)
                 logger.info("deleted node(%s)", node.name)
         if node:
-            node.shutdown()
+            if not isinstance(node, (PtpNet, CtrlNet)):
+                self.changes.node_changed(_id)
+            self.shutdown_node(node)
             self.sdt.delete_node(_id)
         return node is not None
 
@@ -976,11 +1124,24 @@ class Session:
             while self.nodes:
                 _, node = self.nodes.popitem()
                 nodes_ids.append(node.id)
-                funcs.append((node.shutdown, [], {}))
+                funcs.append((self.shutdown_node, [node], {}))
             utils.threadpool(funcs)
         for node_id in nodes_ids:
             self.sdt.delete_node(node_id)
 
+    def shutdown_node(self, node: NodeBase) -> None:
+        """
+        Shutdown a node being removed, dropping its deferred commands and running
+        shutdown commands immediately, as the node will no longer exist to run
+        them when deferred commands are flushed.
+
+        :param node: node to shutdown
+        :return: nothing
+        """
+        self.deferred.remove_node(node)
+        with self.deferred.suspend():
+            node.shutdown()
+
     def exception(
         self, level: ExceptionLevels, source: str, text: str, node_id: int = None
     ) -> None:
@@ -1014,6 +1175,11 @@ class Session:
         if self.state == EventTypes.RUNTIME_STATE:
             logger.warning("ignoring instantiate, already in runtime state")
             return []
+        # run any remaining deferred network commands, before booting nodes
+        self.deferred.flush()
+        exceptions = self.deferred.pop_errors()
+        if exceptions:
+            return exceptions
         # create control net interfaces and network tunnels
         # which need to exist for emane to sync on location events
         # in distributed scenarios
@@ -1,6 +1,6 @@
 from typing import Dict, List, Optional
 
-from core.config import ConfigBool, ConfigInt, ConfigString, Configuration
+from core.config import ConfigBool, ConfigFloat, ConfigInt, ConfigString, Configuration
 from core.errors import CoreError
 from core.plugins.sdt import Sdt
 
@@ -22,6 +22,7 @@ class SessionConfig:
         ConfigBool(id="enablesdt", default="0", label="Enable SDT3D output"),
         ConfigString(id="sdturl", default=Sdt.DEFAULT_SDT_URL, label="SDT3D URL"),
         ConfigBool(id="ovs", default="0", label="Enable OVS"),
+        ConfigBool(id="netlink", default="0", label="Enable Netlink Client"),
         ConfigInt(id="platform_id_start", default="1", label="EMANE Platform ID Start"),
         ConfigInt(id="nem_id_start", default="1", label="EMANE NEM ID Start"),
         ConfigBool(id="link_enabled", default="1", label="EMANE Links?"),
@@ -32,7 +33,24 @@ class SessionConfig:
             id="link_interval", default="1", label="EMANE Link Check Interval (sec)"
         ),
         ConfigInt(id="link_timeout", default="4", label="EMANE Link Timeout (sec)"),
+        ConfigString(
+            id="emane_pathloss",
+            default="",
+            options=["", "freespace", "2ray", "logdistance"],
+            label="EMANE Pathloss Engine Model",
+        ),
+        ConfigFloat(
+            id="emane_pathloss_exponent",
+            default="3.0",
+            label="EMANE Pathloss Log Distance Exponent",
+        ),
         ConfigInt(id="mtu", default="0", label="MTU for All Devices"),
+        ConfigBool(id="node_agent", default="0", label="Enable Node Command Agent"),
+        ConfigBool(id="deferred_commands", default="0", label="Defer Network Commands"),
+        ConfigBool(id="nftables_sets", default="0", label="Use nftables Link Sets"),
+        ConfigBool(
+            id="vectorized_mobility", default="0", label="Vectorized Waypoint Mobility"
+        ),
     ]
 
     def __init__(self, config: Dict[str, str] = None) -> None:
@@ -112,3 +130,19 @@ class SessionConfig:
             return default
         else:
             return int(value)
+
+    def get_float(self, name: str, default: float = None) -> float:
+        """
+        Get configuration value as float.
+
+        :param name: configuration name
+        :param default: default value if not found
+        :return: float for configuration value
+        """
+        value = self._config.get(name)
+        if value is None and default is None:
+            raise CoreError(f"missing session options for {name}")
+        if value is None:
+            return default
+        else:
+            return float(value)
@@ -1,73 +1,15 @@
 """
-event.py: event loop implementation using a heap queue and threads.
+event.py: event loop implementation using a heap queue and a scheduler thread.
 """
 
 import heapq
+import logging
 import threading
 import time
 from functools import total_ordering
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
-
-class Timer(threading.Thread):
-    """
-    Based on threading.Timer but cancel() returns if the timer was
-    already running.
-    """
-
-    def __init__(
-        self,
-        interval: float,
-        func: Callable[..., None],
-        args: Tuple[Any] = None,
-        kwargs: Dict[Any, Any] = None,
-    ) -> None:
-        """
-        Create a Timer instance.
-
-        :param interval: time interval
-        :param func: function to call when timer finishes
-        :param args: function arguments
-        :param kwargs: function keyword arguments
-        """
-        super().__init__()
-        self.interval: float = interval
-        self.func: Callable[..., None] = func
-        self.finished: threading.Event = threading.Event()
-        self._running: threading.Lock = threading.Lock()
-        # validate arguments were provided
-        if args is None:
-            args = ()
-        self.args: Tuple[Any] = args
-        # validate keyword arguments were provided
-        if kwargs is None:
-            kwargs = {}
-        self.kwargs: Dict[Any, Any] = kwargs
-
-    def cancel(self) -> bool:
-        """
-        Stop the timer if it hasn't finished yet.  Return False if
-        the timer was already running.
-
-        :return: True if canceled, False otherwise
-        """
-        locked = self._running.acquire(False)
-        if locked:
-            self.finished.set()
-            self._running.release()
-        return locked
-
-    def run(self) -> None:
-        """
-        Run the timer.
-
-        :return: nothing
-        """
-        self.finished.wait(self.interval)
-        with self._running:
-            if not self.finished.is_set():
-                self.func(*self.args, **self.kwargs)
-            self.finished.set()
+logger = logging.getLogger(__name__)
 
 
 @total_ordering
@@ -101,10 +43,7 @@ class Event:
         self.canceled: bool = False
 
     def __lt__(self, other: "Event") -> bool:
-        result = self.time < other.time
-        if result:
-            result = self.eventnum < other.eventnum
-        return result
+        return (self.time, self.eventnum) < (other.time, other.eventnum)
 
     def run(self) -> None:
         """
@@ -127,7 +66,8 @@ class Event:
 
 class EventLoop:
     """
-    Provides an event loop for running events.
+    Provides an event loop for running events, using a single scheduler thread
+    that sleeps until the next event is due.
     """
 
     def __init__(self) -> None:
@@ -135,54 +75,36 @@ class EventLoop:
         Creates a EventLoop instance.
         """
         self.lock: threading.RLock = threading.RLock()
+        self.condition: threading.Condition = threading.Condition(self.lock)
         self.queue: List[Event] = []
         self.eventnum: int = 0
-        self.timer: Optional[Timer] = None
+        self.thread: Optional[threading.Thread] = None
         self.running: bool = False
         self.start: Optional[float] = None
 
     def _run_events(self) -> None:
         """
-        Run events.
+        Run events as they become due, until the event loop is stopped.
 
         :return: nothing
         """
-        schedule = False
         while True:
-            with self.lock:
-                if not self.running or not self.queue:
-                    break
-                now = time.monotonic()
-                if self.queue[0].time > now:
-                    schedule = True
+            with self.condition:
+                while self.running:
+                    if not self.queue:
+                        self.condition.wait()
+                        continue
+                    delay = self.queue[0].time - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self.condition.wait(delay)
+                if not self.running:
                     break
                 event = heapq.heappop(self.queue)
-            if event.time > now:
-                raise ValueError("invalid event time: %s > %s", event.time, now)
-            event.run()
-
-        with self.lock:
-            self.timer = None
-            if schedule:
-                self._schedule_event()
-
-    def _schedule_event(self) -> None:
-        """
-        Schedule event.
-
-        :return: nothing
-        """
-        with self.lock:
-            if not self.running:
-                raise ValueError("scheduling event while not running")
-            if not self.queue:
-                return
-            delay = self.queue[0].time - time.monotonic()
-            if self.timer:
-                raise ValueError("timer was already set")
-            self.timer = Timer(delay, self._run_events)
-            self.timer.daemon = True
-            self.timer.start()
+            try:
+                event.run()
+            except Exception:
+                logger.exception("error running event: %s", event.func)
 
     def run(self) -> None:
         """
@@ -197,7 +119,9 @@ class EventLoop:
             self.start = time.monotonic()
             for event in self.queue:
                 event.time += self.start
-            self._schedule_event()
+            heapq.heapify(self.queue)
+            self.thread = threading.Thread(target=self._run_events, daemon=True)
+            self.thread.start()
 
     def stop(self) -> None:
         """
@@ -205,16 +129,17 @@ class EventLoop:
 
         :return: nothing
         """
-        with self.lock:
+        with self.condition:
             if not self.running:
                 return
             self.queue = []
             self.eventnum = 0
-            if self.timer is not None:
-                self.timer.cancel()
-                self.timer = None
             self.running = False
             self.start = None
+            self.condition.notify_all()
+            thread, self.thread = self.thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
 
     def add_event(self, delaysec: float, func: Callable, *args: Any, **kwds: Any):
         """
@@ -226,24 +151,15 @@ class EventLoop:
         :param kwds: event keyword arguments
         :return: created event
         """
-        with self.lock:
+        with self.condition:
             eventnum = self.eventnum
             self.eventnum += 1
             evtime = float(delaysec)
             if self.running:
                 evtime += time.monotonic()
             event = Event(eventnum, evtime, func, *args, **kwds)
-
-            if self.queue:
-                prevhead = self.queue[0]
-            else:
-                prevhead = None
-
             heapq.heappush(self.queue, event)
-            head = self.queue[0]
-            if prevhead is not None and prevhead != head:
-                if self.timer is not None and self.timer.cancel():
-                    self.timer = None
-            if self.running and self.timer is None:
-                self._schedule_event()
+            # wake the scheduler when the next event to run has changed
+            if self.running and self.queue[0] is event:
+                self.condition.notify()
         return event
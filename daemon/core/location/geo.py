@@ -3,17 +3,22 @@ Provides conversions from x,y,z to lon,lat,alt.
 """
 
 import logging
-from typing import Tuple
+from typing import Optional, Sequence, Tuple, Union
 
 import pyproj
 from pyproj import Transformer
 
+from core import utils
 from core.emulator.enumerations import RegisterTlvs
 
 logger = logging.getLogger(__name__)
+
+np = utils.get_numpy()
+
 SCALE_FACTOR: float = 100.0
 CRS_WGS84: int = 4326
 CRS_PROJ: int = 3857
+Values = Union[Sequence[float], "np.ndarray"]
 
 
 class GeoLocation:
@@ -126,3 +131,65 @@ class GeoLocation:
         alt = self.refgeo[2] + self.pixels2meters(z)
         logger.debug("result lon,lat,alt(%s, %s, %s)", lon, lat, alt)
         return lat, lon, alt
+
+    def getxyz_many(
+        self, lats: Values, lons: Values, alts: Values
+    ) -> Tuple[Values, Values, Values]:
+        """
+        Convert a group of lon,lat,alt values to x,y,z, using a single transform
+        when numpy is available.
+
+        :param lats: latitude values
+        :param lons: longitude values
+        :param alts: altitude values
+        :return: x,y,z values, as arrays when numpy is available
+        """
+        if np is None:
+            points = [self.getxyz(*x) for x in zip(lats, lons, alts)]
+            xs, ys, zs = zip(*points) if points else ((), (), ())
+            return list(xs), list(ys), list(zs)
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        alts = np.asarray(alts, dtype=float)
+        px, py = self.to_pixels.transform(lons, lats)
+        px = px - self.refproj[0]
+        py = py - self.refproj[1]
+        pz = alts - self.refproj[2]
+        xs = self._meters2pixels_many(px) + self.refxyz[0]
+        ys = -(self._meters2pixels_many(py) + self.refxyz[1])
+        zs = self._meters2pixels_many(pz) + self.refxyz[2]
+        return xs, ys, zs
+
+    def getgeo_many(
+        self, xs: Values, ys: Values, zs: Optional[Sequence[Optional[float]]] = None
+    ) -> Tuple[Values, Values, Values]:
+        """
+        Convert a group of x,y,z values to lon,lat,alt, using a single transform
+        when numpy is available.
+
+        :param xs: x values
+        :param ys: y values
+        :param zs: z values, None for all or any value is treated as getgeo does
+        :return: lat,lon,alt values, as arrays when numpy is available
+        """
+        if zs is None:
+            zs = [None] * len(xs)
+        if np is None:
+            points = [self.getgeo(*x) for x in zip(xs, ys, zs)]
+            lats, lons, alts = zip(*points) if points else ((), (), ())
+            return list(lats), list(lons), list(alts)
+        xs = np.asarray(xs, dtype=float) - self.refxyz[0]
+        ys = -(np.asarray(ys, dtype=float) - self.refxyz[1])
+        # None values are converted to nan
+        zs = np.array(zs, dtype=float)
+        zs = np.where(np.isnan(zs), self.refxyz[2], zs - self.refxyz[2])
+        px = self.refproj[0] + self.pixels2meters(xs)
+        py = self.refproj[1] + self.pixels2meters(ys)
+        lons, lats = self.to_geo.transform(px, py)
+        alts = self.refgeo[2] + self.pixels2meters(zs)
+        return lats, lons, alts
+
+    def _meters2pixels_many(self, values: "np.ndarray") -> "np.ndarray":
+        if self.refscale == 0.0:
+            return np.zeros_like(values)
+        return self.meters2pixels(values)
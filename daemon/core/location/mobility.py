@@ -9,7 +9,7 @@ import threading
 import time
 from functools import total_ordering
 from pathlib import Path
-from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple, Union
 
 from core import utils
 from core.config import (
@@ -36,6 +36,8 @@ logger = logging.getLogger(__name__)
 if TYPE_CHECKING:
     from core.emulator.session import Session
 
+np = utils.get_numpy()
+
 LEARNING_DISABLED: int = 0
 LEARNING_ENABLED: int = 30000
 
@@ -299,6 +301,13 @@ class BasicRangeModel(WirelessModel):
         self.session: "Session" = session
         self.wlan: WlanNode = session.get_node(_id, WlanNode)
         self.iface_to_pos: Dict[CoreInterface, Tuple[float, float, float]] = {}
+        # uniform grid of interfaces, using cells the size of the range, so that
+        # interfaces in range of each other are within neighboring cells
+        self.grid: Dict[Tuple[int, int], Set[CoreInterface]] = {}
+        self.iface_to_cell: Dict[CoreInterface, Tuple[int, int]] = {}
+        # interfaces currently linked to each interface, to unlink pairs that
+        # have moved out of neighboring cells
+        self.iface_links: Dict[CoreInterface, Set[CoreInterface]] = {}
         self.iface_lock: threading.Lock = threading.Lock()
         self.range: int = 0
         self.bw: Optional[int] = None
@@ -333,6 +342,79 @@ class BasicRangeModel(WirelessModel):
         with self.iface_lock:
             return self.iface_to_pos[iface]
 
+    def get_cell(
+        self, position: Tuple[float, float, float]
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Retrieve the grid cell for a given position.
+
+        :param position: position to get cell for
+        :return: grid cell, None when the position is not set
+        """
+        x, y, _ = position
+        if x is None or y is None:
+            return None
+        size = max(self.range, 1)
+        return int(x // size), int(y // size)
+
+    def _set_iface_position(
+        self, iface: CoreInterface, position: Tuple[float, float, float]
+    ) -> None:
+        """
+        Set the position for an interface, moving it within the grid as needed.
+        Must be called while holding the interface lock.
+
+        :param iface: interface to set position for
+        :param position: interface position
+        :return: nothing
+        """
+        self.iface_to_pos[iface] = position
+        cell = self.get_cell(position)
+        previous = self.iface_to_cell.get(iface)
+        if previous == cell:
+            return
+        if previous is not None:
+            ifaces = self.grid[previous]
+            ifaces.discard(iface)
+            if not ifaces:
+                del self.grid[previous]
+        if cell is None:
+            self.iface_to_cell.pop(iface, None)
+        else:
+            self.iface_to_cell[iface] = cell
+            self.grid.setdefault(cell, set()).add(iface)
+
+    def _rebuild_grid(self) -> None:
+        """
+        Rebuild the grid for all interface positions, used when the range
+        has changed. Must be called while holding the interface lock.
+
+        :return: nothing
+        """
+        self.grid.clear()
+        self.iface_to_cell.clear()
+        for iface, position in self.iface_to_pos.items():
+            self._set_iface_position(iface, position)
+
+    def get_candidates(self, iface: CoreInterface) -> List[CoreInterface]:
+        """
+        Retrieve interfaces that may need to be linked or unlinked with a given
+        interface, those within neighboring grid cells and those currently
+        linked. Must be called while holding the interface lock.
+
+        :param iface: interface to get candidates for
+        :return: candidate interfaces
+        """
+        candidates = set(self.iface_links.get(iface, ()))
+        cell = self.iface_to_cell.get(iface)
+        if cell is not None:
+            x, y = cell
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    candidates.update(self.grid.get((x + dx, y + dy), ()))
+        candidates.discard(iface)
+        return sorted(candidates)
+
     def set_position(self, iface: CoreInterface) -> None:
         """
         A node has moved; given an interface, a new (x,y,z) position has
@@ -344,10 +426,10 @@ class BasicRangeModel(WirelessModel):
         """
         x, y, z = iface.node.position.get()
         with self.iface_lock:
-            self.iface_to_pos[iface] = (x, y, z)
+            self._set_iface_position(iface, (x, y, z))
             if x is None or y is None:
                 return
-            for iface2 in self.iface_to_pos:
+            for iface2 in self.get_candidates(iface):
                 self.calclink(iface, iface2)
 
     position_callback = set_position
@@ -363,15 +445,19 @@ class BasicRangeModel(WirelessModel):
         :return: nothing
         """
         with self.iface_lock:
-            while len(moved_ifaces):
-                iface = moved_ifaces.pop()
-                nx, ny, nz = iface.node.getposition()
+            moved = []
+            for iface in moved_ifaces:
                 if iface in self.iface_to_pos:
-                    self.iface_to_pos[iface] = (nx, ny, nz)
-                for iface2 in self.iface_to_pos:
-                    if iface2 in moved_ifaces:
+                    self._set_iface_position(iface, iface.node.getposition())
+                    moved.append(iface)
+            moved_ifaces.clear()
+            calculated = set()
+            for iface in moved:
+                for iface2 in self.get_candidates(iface):
+                    if iface2 in calculated:
                         continue
                     self.calclink(iface, iface2)
+                calculated.add(iface)
 
     def calclink(self, iface: CoreInterface, iface2: CoreInterface) -> None:
         """
@@ -398,11 +484,13 @@ class BasicRangeModel(WirelessModel):
             with self.wlan.linked_lock:
                 linked = self.wlan.is_linked(a, b)
             if d > self.range:
+                self._track_link(a, b, False)
                 if linked:
                     logger.debug("was linked, unlinking")
                     self.wlan.unlink(a, b)
                     self.sendlinkmsg(a, b, unlink=True)
             else:
+                self._track_link(a, b, True)
                 if not linked:
                     logger.debug("was not linked, linking")
                     self.wlan.link(a, b)
@@ -410,6 +498,26 @@ class BasicRangeModel(WirelessModel):
         except KeyError:
             logger.exception("error getting interfaces during calclink")
 
+    def _track_link(self, iface: CoreInterface, iface2: CoreInterface, linked: bool):
+        """
+        Track interfaces linked to one another.
+
+        :param iface: interface one
+        :param iface2: interface two
+        :param linked: True if linked, False otherwise
+        :return: nothing
+        """
+        if linked:
+            self.iface_links.setdefault(iface, set()).add(iface2)
+            self.iface_links.setdefault(iface2, set()).add(iface)
+        else:
+            for first, second in ((iface, iface2), (iface2, iface)):
+                links = self.iface_links.get(first)
+                if links is not None:
+                    links.discard(second)
+                    if not links:
+                        del self.iface_links[first]
+
     @staticmethod
     def calcdistance(
         p1: Tuple[float, float, float], p2: Tuple[float, float, float]
@@ -435,9 +543,13 @@ class BasicRangeModel(WirelessModel):
         :param config: values to update configuration
         :return: nothing
         """
+        current_range = self.range
         self.range = get_config_int(self.range, config, "range")
         if self.range is None:
             self.range = 0
+        if self.range != current_range:
+            with self.iface_lock:
+                self._rebuild_grid()
         logger.debug("wlan %s set range to %s", self.wlan.name, self.range)
         self.bw = get_config_int(self.bw, config, "bandwidth")
         self.delay = get_config_int(self.delay, config, "delay")
@@ -542,6 +654,53 @@ class WayPoint:
             return self.time < other.time
 
 
+class WayPointArrays:
+    """
+    Keeps current waypoint destinations and speeds for the nodes of a mobility
+    network within arrays, allowing all nodes to be moved together.
+    """
+
+    def __init__(self, ifaces: List[CoreInterface]) -> None:
+        """
+        Create a WayPointArrays instance.
+
+        :param ifaces: interfaces of nodes that can be moved
+        """
+        self.nodes: List[CoreNode] = []
+        self.ifaces: List[List[CoreInterface]] = []
+        self.indexes: Dict[int, int] = {}
+        for iface in ifaces:
+            node = iface.node
+            index = self.indexes.get(node.id)
+            if index is None:
+                index = len(self.nodes)
+                self.indexes[node.id] = index
+                self.nodes.append(node)
+                self.ifaces.append([])
+            self.ifaces[index].append(iface)
+        count = len(self.nodes)
+        self.dests: "np.ndarray" = np.zeros((count, 2))
+        self.dest_zs: List[Optional[float]] = [None] * count
+        self.speeds: "np.ndarray" = np.zeros(count)
+        self.active: "np.ndarray" = np.zeros(count, dtype=bool)
+
+    def set_point(self, point: WayPoint) -> None:
+        """
+        Set the current waypoint for a node.
+
+        :param point: waypoint to set
+        :return: nothing
+        """
+        index = self.indexes.get(point.node_id)
+        if index is None:
+            return
+        x, y, z = point.coords
+        self.dests[index] = (x, y)
+        self.dest_zs[index] = z
+        self.speeds[index] = point.speed
+        self.active[index] = True
+
+
 class WayPointMobility(WirelessModel):
     """
     Abstract class for mobility models that set node waypoints.
@@ -571,6 +730,8 @@ class WayPointMobility(WirelessModel):
         self.endtime: Optional[int] = None
         self.timezero: float = 0.0
         self.net: Union[WlanNode, EmaneNet] = get_mobility_node(self.session, self.id)
+        # waypoint arrays used when vectorized mobility is enabled
+        self.arrays: Optional[WayPointArrays] = None
         # these are really set in child class via confmatrix
         self.loop: bool = False
         self.refresh_ms: int = 50
@@ -620,11 +781,14 @@ class WayPointMobility(WirelessModel):
                     return
                 return self.run()
 
-        moved_ifaces = []
-        for iface in self.net.get_ifaces():
-            node = iface.node
-            if self.movenode(node, dt):
-                moved_ifaces.append(iface)
+        if self.arrays is not None:
+            moved_ifaces = self.movenodes(dt)
+        else:
+            moved_ifaces = []
+            for iface in self.net.get_ifaces():
+                node = iface.node
+                if self.movenode(node, dt):
+                    moved_ifaces.append(iface)
 
         # calculate all ranges after moving nodes; this saves calculations
         self.net.wireless_model.update(moved_ifaces)
@@ -640,6 +804,7 @@ class WayPointMobility(WirelessModel):
         """
         self.timezero = time.monotonic()
         self.lasttime = self.timezero - (0.001 * self.refresh_ms)
+        self.arrays = self.create_arrays()
         self.movenodesinitial()
         self.runround()
         self.session.mobility.sendevent(self)
@@ -691,6 +856,76 @@ class WayPointMobility(WirelessModel):
         self.setnodeposition(node, x1 + dx, y1 + dy, z1)
         return True
 
+    def create_arrays(self) -> Optional[WayPointArrays]:
+        """
+        Create waypoint arrays for the current nodes and waypoints, when
+        vectorized mobility is enabled.
+
+        :return: waypoint arrays, None when not enabled
+        """
+        if not self.session.use_vectorized_mobility():
+            return None
+        if np is None:
+            logger.warning("numpy not installed, using scalar waypoint mobility")
+            return None
+        arrays = WayPointArrays(self.net.get_ifaces())
+        for point in self.points.values():
+            arrays.set_point(point)
+        return arrays
+
+    def movenodes(self, dt: float) -> List[CoreInterface]:
+        """
+        Calculate next locations for all nodes with a current waypoint together,
+        following the same rules as movenode, and update their coordinates.
+
+        :param dt: move factor
+        :return: interfaces of nodes that have moved
+        """
+        arrays = self.arrays
+        indexes = np.flatnonzero(arrays.active)
+        if not indexes.size:
+            return []
+        nodes = [arrays.nodes[x] for x in indexes.tolist()]
+        positions = np.array([(x.position.x, x.position.y) for x in nodes])
+        x1, y1 = positions[:, 0], positions[:, 1]
+        x2, y2 = arrays.dests[indexes, 0], arrays.dests[indexes, 1]
+        speeds = arrays.speeds[indexes]
+        # instantaneous moves
+        instant = speeds == 0
+        # linear speed value and distance moved, preventing overshoot
+        alpha = np.arctan2(y2 - y1, x2 - x1)
+        dx = speeds * np.cos(alpha) * dt
+        dy = speeds * np.sin(alpha) * dt
+        dx = np.where(np.abs(dx) > np.abs(x2 - x1), x2 - x1, dx)
+        dy = np.where(np.abs(dy) > np.abs(y2 - y1), y2 - y1, dy)
+        arrived = ~instant & (dx == 0.0) & (dy == 0.0)
+        if arrived.any() and self.endtime < (self.lasttime - self.timezero):
+            # the last node to reach the last waypoint determines this
+            # script's endtime
+            self.endtime = self.lasttime - self.timezero
+        dx = np.where(x1 + dx < 0.0, -x1, dx)
+        dy = np.where(y1 + dy < 0.0, -y1, dy)
+        xs = np.where(instant, x2, x1 + dx).tolist()
+        ys = np.where(instant, y2, y1 + dy).tolist()
+        # remove waypoints that have been reached
+        done = instant | arrived
+        arrays.active[indexes[done]] = False
+        for i in np.flatnonzero(done).tolist():
+            del self.points[nodes[i].id]
+        moved_nodes = []
+        moved_ifaces = []
+        instant = instant.tolist()
+        indexes = indexes.tolist()
+        for i in np.flatnonzero(~arrived).tolist():
+            index = indexes[i]
+            node = nodes[i]
+            z = arrays.dest_zs[index] if instant[i] else node.position.z
+            node.position.set(xs[i], ys[i], z)
+            moved_nodes.append(node)
+            moved_ifaces.extend(arrays.ifaces[index])
+        self.session.broadcast_nodes(moved_nodes)
+        return moved_ifaces
+
     def movenodesinitial(self) -> None:
         """
         Move nodes to their initial positions. Then calculate the ranges.
@@ -755,6 +990,8 @@ class WayPointMobility(WirelessModel):
                 break
             wp = heapq.heappop(self.queue)
             self.points[wp.node_id] = wp
+            if self.arrays is not None:
+                self.arrays.set_point(wp)
 
     def copywaypoints(self) -> None:
         """
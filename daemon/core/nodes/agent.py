@@ -0,0 +1,247 @@
+"""
+Persistent command agent that runs within a node's namespaces, allowing node
+commands to be executed without creating a new vcmd process for every command.
+"""
+
+import argparse
+import json
+import os
+import shlex
+import socket
+import socketserver
+import struct
+import threading
+import time
+from pathlib import Path
+from subprocess import DEVNULL, PIPE, Popen
+from typing import Any, Dict, List, Optional
+
+from core.errors import CoreCommandError, CoreError
+from core.executables import BASH
+
+AGENT_TIMEOUT: float = 5.0
+FRAME_HEADER: struct.Struct = struct.Struct("!I")
+
+
+def send_frame(sock: socket.socket, data: Dict[str, Any]) -> None:
+    """
+    Send a length prefixed json frame.
+
+    :param sock: socket to send frame on
+    :param data: data to encode within frame
+    :return: nothing
+    """
+    payload = json.dumps(data).encode("utf-8")
+    sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """
+    Receive an exact amount of bytes from a socket.
+
+    :param sock: socket to read from
+    :param size: number of bytes to read
+    :return: bytes read, None when the socket was closed
+    """
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """
+    Receive a length prefixed json frame.
+
+    :param sock: socket to receive frame from
+    :return: decoded frame data, None when the socket was closed
+    """
+    header = _recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    (size,) = FRAME_HEADER.unpack(header)
+    payload = _recv_exact(sock, size)
+    if payload is None:
+        return None
+    return json.loads(payload.decode("utf-8"))
+
+
+def run_command(args: str, wait: bool = True, shell: bool = False) -> Dict[str, Any]:
+    """
+    Run a command, within the context of the agent, and create the result to
+    send back to the requester.
+
+    :param args: command to run
+    :param wait: True to wait for status, False otherwise
+    :param shell: True to run command within a shell, False otherwise
+    :return: result containing exit status, stdout and stderr
+    """
+    if shell:
+        cmd_args = [BASH, "-c", args]
+    else:
+        cmd_args = shlex.split(args)
+    try:
+        if wait:
+            p = Popen(cmd_args, stdout=PIPE, stderr=PIPE)
+            stdout, stderr = p.communicate()
+            stdout = stdout.decode("utf-8").strip()
+            stderr = stderr.decode("utf-8").strip()
+            status = p.wait()
+        else:
+            Popen(cmd_args, stdout=DEVNULL, stderr=DEVNULL)
+            stdout, stderr, status = "", "", 0
+    except OSError as e:
+        stdout, stderr, status = "", e.strerror, 1
+    return dict(status=status, stdout=stdout, stderr=stderr)
+
+
+class NodeAgentHandler(socketserver.BaseRequestHandler):
+    """
+    Handles framed command requests for a single client connection.
+    """
+
+    def handle(self) -> None:
+        while True:
+            request = recv_frame(self.request)
+            if request is None:
+                break
+            result = run_command(
+                request["args"], request.get("wait", True), request.get("shell", False)
+            )
+            send_frame(self.request, result)
+
+
+class NodeAgent(socketserver.ThreadingUnixStreamServer):
+    """
+    Unix socket server that runs commands on behalf of the host, expected to be
+    started within the namespaces of a node.
+    """
+
+    daemon_threads: bool = True
+
+    def __init__(self, path: Path) -> None:
+        """
+        Create a NodeAgent instance.
+
+        :param path: unix socket path to listen on
+        """
+        if path.exists():
+            path.unlink()
+        super().__init__(str(path), NodeAgentHandler)
+
+
+class NodeAgentClient:
+    """
+    Client for running commands using a node agent, connections are pooled to
+    allow commands to be run concurrently.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Create a NodeAgentClient instance.
+
+        :param path: unix socket path of the agent
+        """
+        self.path: Path = path
+        self.lock: threading.Lock = threading.Lock()
+        self.sockets: List[socket.socket] = []
+
+    def _create_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(self.path))
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def connect(self, timeout: float = AGENT_TIMEOUT) -> None:
+        """
+        Wait for the agent to be available and open an initial connection.
+
+        :param timeout: time in seconds to wait for the agent
+        :return: nothing
+        :raises CoreError: when the agent did not become available in time
+        """
+        delay = 0.01
+        start = time.monotonic()
+        while True:
+            try:
+                sock = self._create_socket()
+                break
+            except OSError:
+                if time.monotonic() - start > timeout:
+                    raise CoreError(f"node agent failed to start: {self.path}")
+                time.sleep(delay)
+                delay = min(delay * 2, 0.25)
+        with self.lock:
+            self.sockets.append(sock)
+
+    def cmd(self, args: str, wait: bool = True, shell: bool = False) -> str:
+        """
+        Run a command using the agent.
+
+        :param args: command to run
+        :param wait: True to wait for status, False otherwise
+        :param shell: True to use shell, False otherwise
+        :return: stdout of command
+        :raises CoreCommandError: when a non-zero exit status occurs
+        """
+        with self.lock:
+            sock = self.sockets.pop() if self.sockets else None
+        if sock is None:
+            try:
+                sock = self._create_socket()
+            except OSError as e:
+                raise CoreCommandError(1, args, "", e.strerror)
+        try:
+            send_frame(sock, dict(args=args, wait=wait, shell=shell))
+            result = recv_frame(sock)
+        except OSError as e:
+            sock.close()
+            raise CoreCommandError(1, args, "", e.strerror)
+        if result is None:
+            sock.close()
+            raise CoreCommandError(1, args, "", "node agent connection closed")
+        with self.lock:
+            self.sockets.append(sock)
+        status = result["status"]
+        if status != 0:
+            raise CoreCommandError(status, args, result["stdout"], result["stderr"])
+        return result["stdout"]
+
+    def close(self) -> None:
+        """
+        Close all open connections to the agent.
+
+        :return: nothing
+        """
+        with self.lock:
+            while self.sockets:
+                sock = self.sockets.pop()
+                sock.close()
+
+
+def main() -> None:
+    """
+    Main entry point for running an agent within a node.
+
+    :return: nothing
+    """
+    parser = argparse.ArgumentParser(description="CORE Node Command Agent")
+    parser.add_argument("path", type=Path, help="unix socket path to listen on")
+    args = parser.parse_args()
+    agent = NodeAgent(args.path)
+    try:
+        agent.serve_forever()
+    finally:
+        agent.server_close()
+        if args.path.exists():
+            os.unlink(args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import abc
 import logging
 import shlex
 import shutil
+import sys
 import threading
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -18,12 +19,14 @@ from core.configservice.dependencies import ConfigServiceDependencies
 from core.emulator.data import InterfaceData, LinkOptions
 from core.errors import CoreCommandError, CoreError
 from core.executables import BASH, MOUNT, TEST, VCMD, VNODED
+from core.nodes.agent import NodeAgentClient
 from core.nodes.interface import DEFAULT_MTU, CoreInterface
 from core.nodes.netclient import LinuxNetClient, get_net_client
 
 logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
+    from core.emulator.deferred import DeferredCommands
     from core.emulator.distributed import DistributedServer
     from core.emulator.session import Session
     from core.configservice.base import ConfigService
@@ -158,7 +161,10 @@ class NodeBase(abc.ABC):
         self.up: bool = False
         self.lock: RLock = RLock()
         self.net_client: LinuxNetClient = get_net_client(
-            self.session.use_ovs(), self.host_cmd
+            self.session.use_ovs(),
+            self.host_cmd,
+            self.use_netlink(),
+            deferred=self.get_host_deferred,
         )
         options = options if options else NodeOptions()
         self.canvas: Optional[int] = options.canvas
@@ -198,6 +204,35 @@ class NodeBase(abc.ABC):
         """
         raise NotImplementedError
 
+    def use_netlink(self) -> bool:
+        """
+        Check if netlink should be used for configuring networking, which is only
+        possible for nodes local to this host.
+
+        :return: True to use netlink, False otherwise
+        """
+        return self.server is None and self.session.use_netlink()
+
+    def get_host_deferred(self) -> Optional["DeferredCommands"]:
+        """
+        Retrieve deferred commands for the host this node runs on, when the session
+        is deferring commands.
+
+        :return: host deferred commands, None when not deferring
+        """
+        if self.server is not None:
+            return None
+        return self.session.deferred.get_host()
+
+    def get_deferred(self) -> Optional["DeferredCommands"]:
+        """
+        Retrieve deferred commands for commands ran using cmd, when the session is
+        deferring commands.
+
+        :return: deferred commands, None when not deferring
+        """
+        return self.get_host_deferred()
+
     def host_cmd(
         self,
         args: str,
@@ -434,6 +469,17 @@ class CoreNodeBase(NodeBase):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_file(self, src_path: Path, dst_path: Path) -> None:
+        """
+        Copy a node file to a local destination, the reverse of copy_file.
+
+        :param src_path: node file to copy
+        :param dst_path: local destination
+        :return: nothing
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def termcmdstring(self, sh: str) -> str:
         """
@@ -574,6 +620,7 @@ class CoreNode(CoreNodeBase):
         self.directory: Optional[Path] = options.directory
         self.ctrlchnlname: Path = self.session.directory / self.name
         self.pid: Optional[int] = None
+        self.agent: Optional[NodeAgentClient] = None
         self._mounts: List[Tuple[Path, Path]] = []
         self.node_net_client: LinuxNetClient = self.create_node_net_client(
             self.session.use_ovs()
@@ -605,7 +652,24 @@ class CoreNode(CoreNodeBase):
         :param use_ovs: True for OVS bridges, False for Linux bridges
         :return: node network client
         """
-        return get_net_client(use_ovs, self.cmd)
+        return get_net_client(
+            use_ovs,
+            self.cmd,
+            self.use_netlink(),
+            lambda: self.pid,
+            self.get_deferred,
+        )
+
+    def get_deferred(self) -> Optional["DeferredCommands"]:
+        """
+        Retrieve deferred commands for commands ran within this node, when the
+        session is deferring commands.
+
+        :return: node deferred commands, None when not deferring
+        """
+        if self.server is not None:
+            return None
+        return self.session.deferred.get_node(self)
 
     def alive(self) -> bool:
         """
@@ -644,6 +708,9 @@ class CoreNode(CoreNodeBase):
             output = self.host_cmd(vnoded, env=env)
             self.pid = int(output)
             logger.debug("node(%s) pid: %s", self.name, self.pid)
+            # start persistent command agent within node, when enabled
+            if self.server is None and self.session.use_node_agent():
+                self.start_agent()
             # bring up the loopback interface
             logger.debug("bringing up loopback interface")
             self.node_net_client.device_up("lo")
@@ -677,6 +744,12 @@ class CoreNode(CoreNodeBase):
                     except CoreCommandError:
                         pass
                     iface.shutdown()
+                # close agent connections, agent is killed along with the node
+                if self.agent:
+                    self.agent.close()
+                    self.agent = None
+                # close netlink sockets, which keep the namespace alive
+                self.node_net_client.close()
                 # kill node process if present
                 try:
                     self.host_cmd(f"kill -9 {self.pid}")
@@ -684,7 +757,7 @@ class CoreNode(CoreNodeBase):
                     logger.exception("error killing process")
                 # remove node directory if present
                 try:
-                    self.host_cmd(f"rm -rf {self.ctrlchnlname}")
+                    self.host_cmd(f"rm -rf {self.ctrlchnlname} {self.agent_path()}")
                 except CoreCommandError:
                     logger.exception("error removing node directory")
                 # clear interface data, close client, and mark self and not up
@@ -695,6 +768,30 @@ class CoreNode(CoreNodeBase):
             finally:
                 self.rmnodedir()
 
+    def agent_path(self) -> Path:
+        """
+        Path of the unix socket used by the node command agent.
+
+        :return: agent socket path
+        """
+        return Path(f"{self.ctrlchnlname}.agent")
+
+    def start_agent(self) -> None:
+        """
+        Start a persistent command agent within the node and connect to it, node
+        commands will be ran using the agent once started.
+
+        :return: nothing
+        :raises CoreError: when the agent fails to start
+        """
+        agent_path = self.agent_path()
+        args = self.create_cmd(f"{sys.executable} -m core.nodes.agent {agent_path}")
+        self.host_cmd(args, wait=False)
+        agent = NodeAgentClient(agent_path)
+        agent.connect()
+        self.agent = agent
+        logger.debug("node(%s) started command agent: %s", self.name, agent_path)
+
     def create_cmd(self, args: str, shell: bool = False) -> str:
         """
         Create command used to run commands within the context of a node.
@@ -718,12 +815,32 @@ class CoreNode(CoreNodeBase):
         :return: combined stdout and stderr
         :raises CoreCommandError: when a non-zero exit status occurs
         """
+        if self.agent:
+            return self.agent.cmd(args, wait=wait, shell=shell)
         args = self.create_cmd(args, shell)
         if self.server is None:
             return utils.cmd(args, wait=wait, shell=shell)
         else:
             return self.server.remote_cmd(args, wait=wait)
 
+    def cmd_stream(self, args: str, shell: bool = False) -> utils.CmdStream:
+        """
+        Start a command within a node, providing its output as it is produced.
+        The command is stopped when the stream is killed.
+
+        :param args: command to run
+        :param shell: True to use shell, False otherwise
+        :return: command output stream
+        :raises CoreError: when node is on a distributed server
+        :raises CoreCommandError: when the command fails to start
+        """
+        if self.server is not None:
+            raise CoreError(
+                f"node({self.name}) command streams are not supported "
+                f"on distributed servers"
+            )
+        return utils.CmdStream(self.create_cmd(args, shell))
+
     def path_exists(self, path: str) -> bool:
         """
         Determines if a file or directory path exists.
@@ -857,6 +974,35 @@ class CoreNode(CoreNodeBase):
         if mode is not None:
             self.host_cmd(f"chmod {mode:o} {host_path}")
 
+    def get_file(self, src_path: Path, dst_path: Path) -> None:
+        """
+        Copy a node file to a local destination, the reverse of copy_file.
+
+        :param src_path: node file to copy
+        :param dst_path: local destination
+        :return: nothing
+        """
+        logger.debug(
+            "node(%s) getting file src(%s) to dst(%s)", self.name, src_path, dst_path
+        )
+        host_path = self._find_parent_path(src_path)
+        if not host_path:
+            host_path = self.host_path(src_path)
+        if self.server is None:
+            shutil.copy2(host_path, dst_path)
+        else:
+            self.server.remote_get(host_path, dst_path)
+
+    def set_flow_id(self, iface: CoreInterface) -> None:
+        """
+        Set the flow id for an interface, using its ifindex within the node.
+
+        :param iface: interface to set flow id for
+        :return: nothing
+        """
+        iface.flow_id = self.node_net_client.get_ifindex(iface.name)
+        logger.debug("interface flow index: %s - %s", iface.name, iface.flow_id)
+
     def adopt_iface(self, iface: CoreInterface, name: str) -> None:
         """
         Adopt interface to the network namespace of the node and setting
@@ -881,20 +1027,24 @@ class CoreNode(CoreNodeBase):
         iface.name = name
         # turn checksums off
         self.node_net_client.checksums_off(iface.name)
-        # retrieve flow id for container
-        iface.flow_id = self.node_net_client.get_ifindex(iface.name)
-        logger.debug("interface flow index: %s - %s", iface.name, iface.flow_id)
-        # set mac address
-        if iface.mac:
-            self.node_net_client.device_mac(iface.name, str(iface.mac))
-            logger.debug("interface mac: %s - %s", iface.name, iface.mac)
-        # set all addresses
-        for ip in iface.ips():
-            # ipv4 check
-            broadcast = None
-            if netaddr.valid_ipv4(str(ip.ip)):
-                broadcast = "+"
-            self.node_net_client.create_address(iface.name, str(ip), broadcast)
+        # retrieve flow id for container, after interface exists when deferring
+        deferred = self.get_deferred()
+        if deferred:
+            deferred.add_callback(lambda: self.set_flow_id(iface))
+        else:
+            self.set_flow_id(iface)
+        with self.node_net_client.batch():
+            # set mac address
+            if iface.mac:
+                self.node_net_client.device_mac(iface.name, str(iface.mac))
+                logger.debug("interface mac: %s - %s", iface.name, iface.mac)
+            # set all addresses
+            for ip in iface.ips():
+                # ipv4 check
+                broadcast = None
+                if netaddr.valid_ipv4(str(ip.ip)):
+                    broadcast = "+"
+                self.node_net_client.create_address(iface.name, str(ip), broadcast)
         # configure iface options
         iface.set_config()
         # set iface up
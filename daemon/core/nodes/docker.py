@@ -4,7 +4,7 @@ import shlex
 from dataclasses import dataclass, field
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import TYPE_CHECKING, Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from core.emulator.distributed import DistributedServer
 from core.errors import CoreCommandError, CoreError
@@ -14,6 +14,7 @@ from core.nodes.base import CoreNode, CoreNodeOptions
 logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
+    from core.emulator.deferred import DeferredCommands
     from core.emulator.session import Session
 
 DOCKER: str = "docker"
@@ -101,6 +102,15 @@ class DockerNode(CoreNode):
             args = f"{BASH} -c {shlex.quote(args)}"
         return f"nsenter -t {self.pid} -m -u -i -p -n {args}"
 
+    def get_deferred(self) -> Optional["DeferredCommands"]:
+        """
+        Deferred commands are not supported for nodes with their own filesystem, as
+        batch files would not be visible within the node.
+
+        :return: None, commands are never deferred
+        """
+        return None
+
     def _unique_name(self, name: str) -> str:
         """
         Creates a session/node unique prefixed name for the provided input.
@@ -263,3 +273,23 @@ class DockerNode(CoreNode):
         self.host_cmd(f"{DOCKER} cp {src_path} {self.name}:{dst_path}")
         if mode is not None:
             self.cmd(f"chmod {mode:o} {dst_path}")
+
+    def get_file(self, src_path: Path, dst_path: Path) -> None:
+        """
+        Copy a node file to a local destination, the reverse of copy_file.
+
+        :param src_path: node file to copy
+        :param dst_path: local destination
+        :return: nothing
+        """
+        logger.info("node file get file(%s) destination(%s)", src_path, dst_path)
+        if self.server is None:
+            self.host_cmd(f"{DOCKER} cp {self.name}:{src_path} {dst_path}")
+        else:
+            temp = NamedTemporaryFile(delete=False)
+            temp.close()
+            temp_path = Path(temp.name)
+            self.host_cmd(f"{DOCKER} cp {self.name}:{src_path} {temp_path}")
+            self.server.remote_get(temp_path, dst_path)
+            self.host_cmd(f"rm -f {temp_path}")
+            temp_path.unlink()
@@ -19,6 +19,7 @@ from core.nodes.netclient import LinuxNetClient, get_net_client
 logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
+    from core.emulator.deferred import DeferredCommands
     from core.emulator.session import Session
     from core.emulator.distributed import DistributedServer
     from core.nodes.base import CoreNetworkBase, CoreNode, NodeBase
@@ -124,7 +125,10 @@ class CoreInterface:
         # id used to find flow data
         self.flow_id: Optional[int] = None
         self.server: Optional["DistributedServer"] = server
-        self.net_client: LinuxNetClient = get_net_client(use_ovs, self.host_cmd)
+        use_netlink = server is None and node is not None and node.use_netlink()
+        self.net_client: LinuxNetClient = get_net_client(
+            use_ovs, self.host_cmd, use_netlink, deferred=self.get_host_deferred
+        )
         self.control: bool = False
         # configuration data
         self.has_netem: bool = False
@@ -160,12 +164,13 @@ class CoreInterface:
 
         :return: nothing
         """
-        self.net_client.create_veth(self.localname, self.name)
-        if self.mtu > 0:
-            self.net_client.set_mtu(self.name, self.mtu)
-            self.net_client.set_mtu(self.localname, self.mtu)
-        self.net_client.device_up(self.name)
-        self.net_client.device_up(self.localname)
+        with self.net_client.batch():
+            self.net_client.create_veth(self.localname, self.name)
+            if self.mtu > 0:
+                self.net_client.set_mtu(self.name, self.mtu)
+                self.net_client.set_mtu(self.localname, self.mtu)
+            self.net_client.device_up(self.name)
+            self.net_client.device_up(self.localname)
         self.up = True
 
     def shutdown(self) -> None:
@@ -293,25 +298,49 @@ class CoreInterface:
         """
         return self.transport_type == TransportType.VIRTUAL
 
+    def get_host_deferred(self) -> Optional["DeferredCommands"]:
+        """
+        Retrieve deferred commands for the host, when the session of the node this
+        interface belongs to is deferring commands.
+
+        :return: host deferred commands, None when not deferring
+        """
+        if self.server is not None or self.node is None:
+            return None
+        return self.node.session.deferred.get_host()
+
     def set_config(self) -> None:
         # clear current settings
         if self.options.is_clear():
             if self.has_netem:
                 cmd = tc_clear_cmd(self.name)
-                if self.node:
-                    self.node.cmd(cmd)
-                else:
-                    self.host_cmd(cmd)
+                self.run_config(cmd)
                 self.has_netem = False
         # set updated settings
         else:
             cmd = tc_cmd(self.name, self.options, self.mtu)
-            if self.node:
-                self.node.cmd(cmd)
-            else:
-                self.host_cmd(cmd)
+            self.run_config(cmd)
             self.has_netem = True
 
+    def run_config(self, args: str) -> None:
+        """
+        Run an interface configuration command, within the node when this interface
+        belongs to one, deferring the command when the session is deferring commands.
+
+        :param args: command to run
+        :return: nothing
+        """
+        if self.node:
+            deferred = self.node.get_deferred()
+            run = self.node.cmd
+        else:
+            deferred = self.get_host_deferred()
+            run = self.host_cmd
+        if deferred:
+            deferred.add(args)
+        else:
+            run(args)
+
     def get_data(self) -> InterfaceData:
         """
         Retrieve the data representation of this interface.
@@ -5,7 +5,7 @@ import time
 from dataclasses import dataclass, field
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import TYPE_CHECKING, Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from core.emulator.data import InterfaceData, LinkOptions
 from core.emulator.distributed import DistributedServer
@@ -17,6 +17,7 @@ from core.nodes.interface import CoreInterface
 logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
+    from core.emulator.deferred import DeferredCommands
     from core.emulator.session import Session
 
 
@@ -74,6 +75,15 @@ class LxcNode(CoreNode):
             args = f"{BASH} -c {shlex.quote(args)}"
         return f"nsenter -t {self.pid} -m -u -i -p -n {args}"
 
+    def get_deferred(self) -> Optional["DeferredCommands"]:
+        """
+        Deferred commands are not supported for nodes with their own filesystem, as
+        batch files would not be visible within the node.
+
+        :return: None, commands are never deferred
+        """
+        return None
+
     def _get_info(self) -> Dict:
         args = f"lxc list {self.name} --format json"
         output = self.host_cmd(args)
@@ -212,6 +222,28 @@ class LxcNode(CoreNode):
         if mode is not None:
             self.cmd(f"chmod {mode:o} {dst_path}")
 
+    def get_file(self, src_path: Path, dst_path: Path) -> None:
+        """
+        Copy a node file to a local destination, the reverse of copy_file.
+
+        :param src_path: node file to copy
+        :param dst_path: local destination
+        :return: nothing
+        """
+        logger.info("node file get file(%s) destination(%s)", src_path, dst_path)
+        if not str(src_path).startswith("/"):
+            src_path = Path("/root/") / src_path
+        if self.server is None:
+            self.host_cmd(f"lxc file pull {self.name}/{src_path} {dst_path}")
+        else:
+            temp = NamedTemporaryFile(delete=False)
+            temp.close()
+            temp_path = Path(temp.name)
+            self.host_cmd(f"lxc file pull {self.name}/{src_path} {temp_path}")
+            self.server.remote_get(temp_path, dst_path)
+            self.host_cmd(f"rm -f {temp_path}")
+            temp_path.unlink()
+
     def create_iface(
         self, iface_data: InterfaceData = None, options: LinkOptions = None
     ) -> CoreInterface:
@@ -1,12 +1,36 @@
 """
 Clients for dealing with bridge/interface commands.
 """
-from typing import Callable
+import socket
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
 
 import netaddr
 
 from core import utils
 from core.executables import ETHTOOL, IP, OVS_VSCTL, SYSCTL, TC
+from core.nodes import netlink
+from core.nodes.netlink import NetlinkRequest, NetlinkSocket
+
+if TYPE_CHECKING:
+    from core.emulator.deferred import DeferredCommands
+
+_HOST_SOCKET: Optional[NetlinkSocket] = None
+_HOST_SOCKET_LOCK: threading.Lock = threading.Lock()
+
+
+def host_netlink_socket() -> NetlinkSocket:
+    """
+    Retrieve the netlink socket shared for configuring the host namespace.
+
+    :return: host netlink socket
+    """
+    global _HOST_SOCKET
+    with _HOST_SOCKET_LOCK:
+        if _HOST_SOCKET is None:
+            _HOST_SOCKET = NetlinkSocket()
+        return _HOST_SOCKET
 
 
 class LinuxNetClient:
@@ -14,13 +38,52 @@ class LinuxNetClient:
     Client for creating Linux bridges and ip interfaces for nodes.
     """
 
-    def __init__(self, run: Callable[..., str]) -> None:
+    def __init__(
+        self,
+        run: Callable[..., str],
+        deferred: Callable[[], Optional["DeferredCommands"]] = None,
+    ) -> None:
         """
         Create LinuxNetClient instance.
 
         :param run: function to run commands with
+        :param deferred: function providing deferred commands to add commands to,
+            when commands are being deferred
         """
         self.run: Callable[..., str] = run
+        self.deferred: Optional[Callable[[], Optional["DeferredCommands"]]] = deferred
+
+    def close(self) -> None:
+        """
+        Release any resources held by the client.
+
+        :return: nothing
+        """
+        pass
+
+    def run_deferrable(self, args: str) -> None:
+        """
+        Run a command whose output is not needed, or defer it to be ran later when
+        commands are being deferred.
+
+        :param args: command to run
+        :return: nothing
+        """
+        deferred = self.deferred() if self.deferred else None
+        if deferred:
+            deferred.add(args)
+        else:
+            self.run(args)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Context for grouping calls, allowing clients that support it to send the
+        resulting changes together when the context exits.
+
+        :return: nothing
+        """
+        yield
 
     def set_hostname(self, name: str) -> None:
         """
@@ -40,7 +103,7 @@ class LinuxNetClient:
         :param device: device to add route to
         :return: nothing
         """
-        self.run(f"{IP} route replace {route} dev {device}")
+        self.run_deferrable(f"{IP} route replace {route} dev {device}")
 
     def device_up(self, device: str) -> None:
         """
@@ -49,7 +112,7 @@ class LinuxNetClient:
         :param device: device to bring up
         :return: nothing
         """
-        self.run(f"{IP} link set {device} up")
+        self.run_deferrable(f"{IP} link set {device} up")
 
     def device_down(self, device: str) -> None:
         """
@@ -58,7 +121,7 @@ class LinuxNetClient:
         :param device: device to bring down
         :return: nothing
         """
-        self.run(f"{IP} link set {device} down")
+        self.run_deferrable(f"{IP} link set {device} down")
 
     def device_name(self, device: str, name: str) -> None:
         """
@@ -68,7 +131,7 @@ class LinuxNetClient:
         :param name: name to set
         :return: nothing
         """
-        self.run(f"{IP} link set {device} name {name}")
+        self.run_deferrable(f"{IP} link set {device} name {name}")
 
     def device_show(self, device: str) -> str:
         """
@@ -114,7 +177,7 @@ class LinuxNetClient:
         :param namespace: namespace to set device to
         :return: nothing
         """
-        self.run(f"{IP} link set {device} netns {namespace}")
+        self.run_deferrable(f"{IP} link set {device} netns {namespace}")
 
     def device_flush(self, device: str) -> None:
         """
@@ -123,7 +186,7 @@ class LinuxNetClient:
         :param device: device to flush
         :return: nothing
         """
-        self.run(f"{IP} address flush dev {device}")
+        self.run_deferrable(f"{IP} address flush dev {device}")
 
     def device_mac(self, device: str, mac: str) -> None:
         """
@@ -133,7 +196,7 @@ class LinuxNetClient:
         :param mac: mac to set
         :return: nothing
         """
-        self.run(f"{IP} link set dev {device} address {mac}")
+        self.run_deferrable(f"{IP} link set dev {device} address {mac}")
 
     def delete_device(self, device: str) -> None:
         """
@@ -142,7 +205,7 @@ class LinuxNetClient:
         :param device: device to delete
         :return: nothing
         """
-        self.run(f"{IP} link delete {device}")
+        self.run_deferrable(f"{IP} link delete {device}")
 
     def delete_tc(self, device: str) -> None:
         """
@@ -151,7 +214,7 @@ class LinuxNetClient:
         :param device: device to remove tc
         :return: nothing
         """
-        self.run(f"{TC} qdisc delete dev {device} root")
+        self.run_deferrable(f"{TC} qdisc delete dev {device} root")
 
     def checksums_off(self, iface_name: str) -> None:
         """
@@ -160,7 +223,7 @@ class LinuxNetClient:
         :param iface_name: interface to update
         :return: nothing
         """
-        self.run(f"{ETHTOOL} -K {iface_name} rx off tx off")
+        self.run_deferrable(f"{ETHTOOL} -K {iface_name} rx off tx off")
 
     def create_address(self, device: str, address: str, broadcast: str = None) -> None:
         """
@@ -172,14 +235,18 @@ class LinuxNetClient:
         :return: nothing
         """
         if broadcast is not None:
-            self.run(f"{IP} address add {address} broadcast {broadcast} dev {device}")
+            self.run_deferrable(
+                f"{IP} address add {address} broadcast {broadcast} dev {device}"
+            )
         else:
-            self.run(f"{IP} address add {address} dev {device}")
+            self.run_deferrable(f"{IP} address add {address} dev {device}")
         if netaddr.valid_ipv6(address.split("/")[0]):
             # IPv6 addresses are removed by default on interface down.
             # Make sure that the IPv6 address we add is not removed
             device = utils.sysctl_devname(device)
-            self.run(f"{SYSCTL} -w net.ipv6.conf.{device}.keep_addr_on_down=1")
+            self.run_deferrable(
+                f"{SYSCTL} -w net.ipv6.conf.{device}.keep_addr_on_down=1"
+            )
 
     def delete_address(self, device: str, address: str) -> None:
         """
@@ -189,7 +256,7 @@ class LinuxNetClient:
         :param address: address to remove
         :return: nothing
         """
-        self.run(f"{IP} address delete {address} dev {device}")
+        self.run_deferrable(f"{IP} address delete {address} dev {device}")
 
     def create_veth(self, name: str, peer: str) -> None:
         """
@@ -199,7 +266,7 @@ class LinuxNetClient:
         :param peer: peer name
         :return: nothing
         """
-        self.run(f"{IP} link add name {name} type veth peer name {peer}")
+        self.run_deferrable(f"{IP} link add name {name} type veth peer name {peer}")
 
     def create_gretap(
         self, device: str, address: str, local: str, ttl: int, key: int
@@ -221,7 +288,7 @@ class LinuxNetClient:
             cmd += f" ttl {ttl}"
         if key is not None:
             cmd += f" key {key}"
-        self.run(cmd)
+        self.run_deferrable(cmd)
 
     def create_bridge(self, name: str) -> None:
         """
@@ -230,11 +297,11 @@ class LinuxNetClient:
         :param name: bridge name
         :return: nothing
         """
-        self.run(f"{IP} link add name {name} type bridge")
-        self.run(f"{IP} link set {name} type bridge stp_state 0")
-        self.run(f"{IP} link set {name} type bridge forward_delay 0")
-        self.run(f"{IP} link set {name} type bridge mcast_snooping 0")
-        self.run(f"{IP} link set {name} type bridge group_fwd_mask 65528")
+        self.run_deferrable(f"{IP} link add name {name} type bridge")
+        self.run_deferrable(f"{IP} link set {name} type bridge stp_state 0")
+        self.run_deferrable(f"{IP} link set {name} type bridge forward_delay 0")
+        self.run_deferrable(f"{IP} link set {name} type bridge mcast_snooping 0")
+        self.run_deferrable(f"{IP} link set {name} type bridge group_fwd_mask 65528")
         self.device_up(name)
 
     def delete_bridge(self, name: str) -> None:
@@ -245,7 +312,7 @@ class LinuxNetClient:
         :return: nothing
         """
         self.device_down(name)
-        self.run(f"{IP} link delete {name} type bridge")
+        self.run_deferrable(f"{IP} link delete {name} type bridge")
 
     def set_iface_master(self, bridge_name: str, iface_name: str) -> None:
         """
@@ -255,7 +322,7 @@ class LinuxNetClient:
         :param iface_name: interface name
         :return: nothing
         """
-        self.run(f"{IP} link set dev {iface_name} master {bridge_name}")
+        self.run_deferrable(f"{IP} link set dev {iface_name} master {bridge_name}")
         self.device_up(iface_name)
 
     def delete_iface(self, bridge_name: str, iface_name: str) -> None:
@@ -266,7 +333,7 @@ class LinuxNetClient:
         :param iface_name: interface name
         :return: nothing
         """
-        self.run(f"{IP} link set dev {iface_name} nomaster")
+        self.run_deferrable(f"{IP} link set dev {iface_name} nomaster")
 
     def existing_bridges(self, _id: int) -> bool:
         """
@@ -297,7 +364,7 @@ class LinuxNetClient:
         :param value: ageing time value
         :return: nothing
         """
-        self.run(f"{IP} link set {name} type bridge ageing_time {value}")
+        self.run_deferrable(f"{IP} link set {name} type bridge ageing_time {value}")
 
     def set_mtu(self, name: str, value: int) -> None:
         """
@@ -307,7 +374,7 @@ class LinuxNetClient:
         :param value: mtu value to set
         :return: nothing
         """
-        self.run(f"{IP} link set {name} mtu {value}")
+        self.run_deferrable(f"{IP} link set {name} mtu {value}")
 
 
 class OvsNetClient(LinuxNetClient):
@@ -385,15 +452,347 @@ class OvsNetClient(LinuxNetClient):
         self.run(f"{OVS_VSCTL} set bridge {name} other_config:mac-aging-time={value}")
 
 
-def get_net_client(use_ovs: bool, run: Callable[..., str]) -> LinuxNetClient:
+class NetlinkNetClient(LinuxNetClient):
+    """
+    Client for creating Linux bridges and ip interfaces, using rtnetlink directly
+    instead of running ip commands. Operations without a netlink equivalent
+    continue to use the provided run function.
+    """
+
+    def __init__(
+        self,
+        run: Callable[..., str],
+        pid: Callable[[], Optional[int]] = None,
+        deferred: Callable[[], Optional["DeferredCommands"]] = None,
+    ) -> None:
+        """
+        Create NetlinkNetClient instance.
+
+        :param run: function to run commands with
+        :param pid: function providing the process id to use the network namespace
+            of, None to use the host namespace
+        :param deferred: function providing deferred commands to add commands to,
+            when commands are being deferred
+        """
+        super().__init__(run, deferred)
+        self.pid: Optional[Callable[[], Optional[int]]] = pid
+        self.lock: threading.Lock = threading.Lock()
+        self.sock: Optional[NetlinkSocket] = None
+        self.pending: Optional[List[NetlinkRequest]] = None
+
+    def get_socket(self) -> NetlinkSocket:
+        """
+        Retrieve the netlink socket for the namespace this client configures.
+
+        :return: netlink socket
+        """
+        pid = self.pid() if self.pid else None
+        if pid is None:
+            return host_netlink_socket()
+        with self.lock:
+            if self.sock is None or self.sock.pid != pid:
+                if self.sock is not None:
+                    self.sock.close()
+                self.sock = NetlinkSocket(pid)
+            return self.sock
+
+    def close(self) -> None:
+        """
+        Close the netlink socket for the namespace this client configures, as an
+        open socket keeps the namespace alive.
+
+        :return: nothing
+        """
+        with self.lock:
+            if self.sock is not None:
+                self.sock.close()
+                self.sock = None
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Context for grouping calls, requests made within the context are sent
+        together when the context exits.
+
+        :return: nothing
+        """
+        if self.pending is not None:
+            yield
+            return
+        self.pending = []
+        try:
+            yield
+            self.flush()
+        finally:
+            self.pending = None
+
+    def flush(self) -> None:
+        """
+        Send any requests pending within the current batch.
+
+        :return: nothing
+        """
+        if self.pending:
+            requests = self.pending[:]
+            self.pending.clear()
+            self.get_socket().send(requests)
+
+    def request(self, msg_type: int, flags: int, body: bytes, description: str) -> None:
+        request = NetlinkRequest(msg_type, flags, body, description)
+        if self.pending is not None:
+            self.pending.append(request)
+        else:
+            self.get_socket().send([request])
+
+    def get_link(self, device: str) -> Tuple[int, Dict[int, bytes]]:
+        """
+        Retrieve the index and attributes for a link.
+
+        :param device: device to get link for
+        :return: link index and attributes
+        """
+        self.flush()
+        body = netlink.ifinfomsg() + netlink.attr_str(netlink.IFLA_IFNAME, device)
+        request = NetlinkRequest(
+            netlink.RTM_GETLINK, 0, body, f"{IP} link show {device}"
+        )
+        _, payload = self.get_socket().dump(request)[0]
+        _, _, index, _, _ = netlink.IFINFOMSG.unpack_from(payload)
+        attrs = netlink.parse_attrs(payload[netlink.IFINFOMSG.size :])
+        return index, attrs
+
+    def set_link(self, device: str, description: str, *attrs: bytes) -> None:
+        body = netlink.ifinfomsg() + netlink.attr_str(netlink.IFLA_IFNAME, device)
+        self.request(netlink.RTM_SETLINK, 0, body + b"".join(attrs), description)
+
+    def set_link_flags(self, device: str, flags: int, description: str) -> None:
+        body = netlink.ifinfomsg(flags=flags, change=netlink.IFF_UP)
+        body += netlink.attr_str(netlink.IFLA_IFNAME, device)
+        self.request(netlink.RTM_SETLINK, 0, body, description)
+
+    def device_up(self, device: str) -> None:
+        self.set_link_flags(device, netlink.IFF_UP, f"{IP} link set {device} up")
+
+    def device_down(self, device: str) -> None:
+        self.set_link_flags(device, 0, f"{IP} link set {device} down")
+
+    def device_name(self, device: str, name: str) -> None:
+        index, _ = self.get_link(device)
+        body = netlink.ifinfomsg(index) + netlink.attr_str(netlink.IFLA_IFNAME, name)
+        description = f"{IP} link set {device} name {name}"
+        self.request(netlink.RTM_SETLINK, 0, body, description)
+
+    def get_mac(self, device: str) -> str:
+        _, attrs = self.get_link(device)
+        return ":".join(f"{x:02x}" for x in attrs.get(netlink.IFLA_ADDRESS, b""))
+
+    def get_ifindex(self, device: str) -> int:
+        index, _ = self.get_link(device)
+        return index
+
+    def device_ns(self, device: str, namespace: str) -> None:
+        description = f"{IP} link set {device} netns {namespace}"
+        if namespace.isdigit():
+            ns_attr = netlink.attr_u32(netlink.IFLA_NET_NS_PID, int(namespace))
+            self.set_link(device, description, ns_attr)
+        else:
+            with open(f"/var/run/netns/{namespace}") as f:
+                ns_attr = netlink.attr_u32(netlink.IFLA_NET_NS_FD, f.fileno())
+                self.set_link(device, description, ns_attr)
+                self.flush()
+
+    def device_flush(self, device: str) -> None:
+        index, _ = self.get_link(device)
+        body = netlink.IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+        request = NetlinkRequest(
+            netlink.RTM_GETADDR,
+            netlink.NLM_F_DUMP,
+            body,
+            f"{IP} address flush dev {device}",
+        )
+        requests = []
+        for _, payload in self.get_socket().dump(request):
+            family, prefix, flags, scope, addr_index = netlink.IFADDRMSG.unpack_from(
+                payload
+            )
+            if addr_index != index:
+                continue
+            attrs = netlink.parse_attrs(payload[netlink.IFADDRMSG.size :])
+            body = netlink.IFADDRMSG.pack(family, prefix, flags, scope, index)
+            for attr_type in (netlink.IFA_LOCAL, netlink.IFA_ADDRESS):
+                if attr_type in attrs:
+                    body += netlink.attr(attr_type, attrs[attr_type])
+            description = f"{IP} address flush dev {device}"
+            requests.append(NetlinkRequest(netlink.RTM_DELADDR, 0, body, description))
+        self.get_socket().send(requests)
+
+    def device_mac(self, device: str, mac: str) -> None:
+        mac_attr = netlink.attr(netlink.IFLA_ADDRESS, netaddr.EUI(mac).packed)
+        self.set_link(device, f"{IP} link set dev {device} address {mac}", mac_attr)
+
+    def delete_device(self, device: str) -> None:
+        body = netlink.ifinfomsg() + netlink.attr_str(netlink.IFLA_IFNAME, device)
+        self.request(netlink.RTM_DELLINK, 0, body, f"{IP} link delete {device}")
+
+    def address_request(
+        self, msg_type: int, flags: int, device: str, address: str, broadcast: str
+    ) -> NetlinkRequest:
+        index, _ = self.get_link(device)
+        ip = netaddr.IPNetwork(address)
+        if ip.version == 4:
+            family = socket.AF_INET
+        else:
+            family = socket.AF_INET6
+        scope = netlink.RT_SCOPE_UNIVERSE
+        if ip.ip.is_loopback():
+            scope = netlink.RT_SCOPE_HOST
+        body = netlink.IFADDRMSG.pack(family, ip.prefixlen, 0, scope, index)
+        body += netlink.attr(netlink.IFA_LOCAL, ip.ip.packed)
+        body += netlink.attr(netlink.IFA_ADDRESS, ip.ip.packed)
+        if broadcast == "+":
+            if ip.version == 4 and ip.prefixlen < 31:
+                body += netlink.attr(netlink.IFA_BROADCAST, ip.broadcast.packed)
+        elif broadcast is not None:
+            broadcast_ip = netaddr.IPAddress(broadcast)
+            body += netlink.attr(netlink.IFA_BROADCAST, broadcast_ip.packed)
+        description = f"{IP} address add {address} dev {device}"
+        return NetlinkRequest(msg_type, flags, body, description)
+
+    def create_address(self, device: str, address: str, broadcast: str = None) -> None:
+        flags = netlink.NLM_F_CREATE | netlink.NLM_F_EXCL
+        request = self.address_request(
+            netlink.RTM_NEWADDR, flags, device, address, broadcast
+        )
+        self.request(request.msg_type, request.flags, request.body, request.description)
+        if netaddr.valid_ipv6(address.split("/")[0]):
+            # IPv6 addresses are removed by default on interface down.
+            # Make sure that the IPv6 address we add is not removed
+            self.flush()
+            device = utils.sysctl_devname(device)
+            self.run(f"{SYSCTL} -w net.ipv6.conf.{device}.keep_addr_on_down=1")
+
+    def delete_address(self, device: str, address: str) -> None:
+        request = self.address_request(netlink.RTM_DELADDR, 0, device, address, None)
+        description = f"{IP} address delete {address} dev {device}"
+        self.request(request.msg_type, request.flags, request.body, description)
+
+    def create_veth(self, name: str, peer: str) -> None:
+        peer_info = netlink.ifinfomsg() + netlink.attr_str(netlink.IFLA_IFNAME, peer)
+        link_info = netlink.attr_nested(
+            netlink.IFLA_LINKINFO,
+            netlink.attr_str(netlink.IFLA_INFO_KIND, "veth"),
+            netlink.attr_nested(
+                netlink.IFLA_INFO_DATA, netlink.attr(netlink.VETH_INFO_PEER, peer_info)
+            ),
+        )
+        body = netlink.ifinfomsg() + netlink.attr_str(netlink.IFLA_IFNAME, name)
+        flags = netlink.NLM_F_CREATE | netlink.NLM_F_EXCL
+        description = f"{IP} link add name {name} type veth peer name {peer}"
+        self.request(netlink.RTM_NEWLINK, flags, body + link_info, description)
+
+    def bridge_request(
+        self, name: str, flags: int, description: str, *attrs: bytes
+    ) -> None:
+        link_info = netlink.attr_nested(
+            netlink.IFLA_LINKINFO,
+            netlink.attr_str(netlink.IFLA_INFO_KIND, "bridge"),
+            netlink.attr_nested(netlink.IFLA_INFO_DATA, *attrs),
+        )
+        body = netlink.ifinfomsg() + netlink.attr_str(netlink.IFLA_IFNAME, name)
+        self.request(netlink.RTM_NEWLINK, flags, body + link_info, description)
+
+    def create_bridge(self, name: str) -> None:
+        with self.batch():
+            self.bridge_request(
+                name,
+                netlink.NLM_F_CREATE | netlink.NLM_F_EXCL,
+                f"{IP} link add name {name} type bridge",
+                netlink.attr_u32(netlink.IFLA_BR_STP_STATE, 0),
+                netlink.attr_u32(netlink.IFLA_BR_FORWARD_DELAY, 0),
+                netlink.attr_u8(netlink.IFLA_BR_MCAST_SNOOPING, 0),
+                netlink.attr_u16(netlink.IFLA_BR_GROUP_FWD_MASK, 65528),
+            )
+            self.device_up(name)
+
+    def delete_bridge(self, name: str) -> None:
+        with self.batch():
+            self.device_down(name)
+            self.delete_device(name)
+
+    def set_iface_master(self, bridge_name: str, iface_name: str) -> None:
+        index, _ = self.get_link(bridge_name)
+        body = netlink.ifinfomsg(flags=netlink.IFF_UP, change=netlink.IFF_UP)
+        body += netlink.attr_str(netlink.IFLA_IFNAME, iface_name)
+        body += netlink.attr_u32(netlink.IFLA_MASTER, index)
+        description = f"{IP} link set dev {iface_name} master {bridge_name}"
+        self.request(netlink.RTM_SETLINK, 0, body, description)
+
+    def delete_iface(self, bridge_name: str, iface_name: str) -> None:
+        master_attr = netlink.attr_u32(netlink.IFLA_MASTER, 0)
+        description = f"{IP} link set dev {iface_name} nomaster"
+        self.set_link(iface_name, description, master_attr)
+
+    def set_mac_learning(self, name: str, value: int) -> None:
+        self.bridge_request(
+            name,
+            0,
+            f"{IP} link set {name} type bridge ageing_time {value}",
+            netlink.attr_u32(netlink.IFLA_BR_AGEING_TIME, value),
+        )
+
+    def set_mtu(self, name: str, value: int) -> None:
+        mtu_attr = netlink.attr_u32(netlink.IFLA_MTU, value)
+        self.set_link(name, f"{IP} link set {name} mtu {value}", mtu_attr)
+
+    def create_route(self, route: str, device: str) -> None:
+        index, _ = self.get_link(device)
+        if route == "default":
+            family, dst_len, dst_attr = socket.AF_INET, 0, b""
+        else:
+            ip = netaddr.IPNetwork(route)
+            family = socket.AF_INET if ip.version == 4 else socket.AF_INET6
+            dst_len = ip.prefixlen
+            dst_attr = netlink.attr(netlink.RTA_DST, ip.network.packed)
+        body = netlink.RTMSG.pack(
+            family,
+            dst_len,
+            0,
+            0,
+            netlink.RT_TABLE_MAIN,
+            netlink.RTPROT_BOOT,
+            netlink.RT_SCOPE_LINK,
+            netlink.RTN_UNICAST,
+            0,
+        )
+        body += dst_attr + netlink.attr_u32(netlink.RTA_OIF, index)
+        flags = netlink.NLM_F_CREATE | netlink.NLM_F_REPLACE
+        description = f"{IP} route replace {route} dev {device}"
+        self.request(netlink.RTM_NEWROUTE, flags, body, description)
+
+
+def get_net_client(
+    use_ovs: bool,
+    run: Callable[..., str],
+    use_netlink: bool = False,
+    pid: Callable[[], Optional[int]] = None,
+    deferred: Callable[[], Optional["DeferredCommands"]] = None,
+) -> LinuxNetClient:
     """
     Retrieve desired net client for running network commands.
 
     :param use_ovs: True for OVS bridges, False for Linux bridges
     :param run: function used to run net client commands
+    :param use_netlink: True to use netlink for Linux bridges and interfaces,
+        False to use ip commands
+    :param pid: function providing the process id whose network namespace the
+        netlink client will configure, None for the host namespace
+    :param deferred: function providing deferred commands, when commands are being
+        deferred
     :return: net client class
     """
     if use_ovs:
         return OvsNetClient(run)
+    elif use_netlink:
+        return NetlinkNetClient(run, pid, deferred)
     else:
-        return LinuxNetClient(run)
+        return LinuxNetClient(run, deferred)
@@ -0,0 +1,447 @@
+"""
+Minimal rtnetlink support, used to configure links, addresses and routes without
+running ip commands.
+"""
+
+import ctypes
+import errno
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.errors import CoreCommandError
+
+NETLINK_ROUTE: int = 0
+CLONE_NEWNET: int = 0x40000000
+# max bytes of messages sent at once, keeps acks within the receive buffer
+MAX_BATCH_SIZE: int = 16384
+RECV_SIZE: int = 65536
+# multicast group for link events
+RTMGRP_LINK: int = 0x1
+
+# message types
+NLMSG_ERROR: int = 2
+NLMSG_DONE: int = 3
+RTM_NEWLINK: int = 16
+RTM_DELLINK: int = 17
+RTM_GETLINK: int = 18
+RTM_SETLINK: int = 19
+RTM_NEWADDR: int = 20
+RTM_DELADDR: int = 21
+RTM_GETADDR: int = 22
+RTM_NEWROUTE: int = 24
+
+# message flags
+NLM_F_REQUEST: int = 0x1
+NLM_F_ACK: int = 0x4
+NLM_F_REPLACE: int = 0x100
+NLM_F_EXCL: int = 0x200
+NLM_F_CREATE: int = 0x400
+NLM_F_DUMP: int = 0x300
+
+# link attributes
+IFLA_ADDRESS: int = 1
+IFLA_IFNAME: int = 3
+IFLA_MTU: int = 4
+IFLA_MASTER: int = 10
+IFLA_LINKINFO: int = 18
+IFLA_NET_NS_PID: int = 19
+IFLA_NET_NS_FD: int = 28
+IFLA_INFO_KIND: int = 1
+IFLA_INFO_DATA: int = 2
+VETH_INFO_PEER: int = 1
+IFLA_BR_FORWARD_DELAY: int = 1
+IFLA_BR_AGEING_TIME: int = 4
+IFLA_BR_STP_STATE: int = 5
+IFLA_BR_GROUP_FWD_MASK: int = 9
+IFLA_BR_MCAST_SNOOPING: int = 23
+IFF_UP: int = 0x1
+
+# address attributes
+IFA_ADDRESS: int = 1
+IFA_LOCAL: int = 2
+IFA_BROADCAST: int = 4
+
+# route attributes and values
+RTA_DST: int = 1
+RTA_OIF: int = 4
+RT_TABLE_MAIN: int = 254
+RTPROT_BOOT: int = 3
+RT_SCOPE_UNIVERSE: int = 0
+RT_SCOPE_LINK: int = 253
+RT_SCOPE_HOST: int = 254
+RTN_UNICAST: int = 1
+
+NLMSG_HEADER: struct.Struct = struct.Struct("=IHHII")
+RTA_HEADER: struct.Struct = struct.Struct("=HH")
+IFINFOMSG: struct.Struct = struct.Struct("=BxHiII")
+IFADDRMSG: struct.Struct = struct.Struct("=BBBBI")
+RTMSG: struct.Struct = struct.Struct("=BBBBBBBBI")
+NLMSG_ERROR_CODE: struct.Struct = struct.Struct("=i")
+
+
+def align(length: int) -> int:
+    """
+    Align a length to the 4 byte boundary used by netlink.
+
+    :param length: length to align
+    :return: aligned length
+    """
+    return (length + 3) & ~3
+
+
+def attr(attr_type: int, data: bytes) -> bytes:
+    """
+    Encode a netlink attribute.
+
+    :param attr_type: attribute type
+    :param data: attribute data
+    :return: encoded attribute, including padding
+    """
+    length = RTA_HEADER.size + len(data)
+    padding = b"\0" * (align(length) - length)
+    return RTA_HEADER.pack(length, attr_type) + data + padding
+
+
+def attr_str(attr_type: int, value: str) -> bytes:
+    return attr(attr_type, value.encode("utf-8") + b"\0")
+
+
+def attr_u8(attr_type: int, value: int) -> bytes:
+    return attr(attr_type, struct.pack("=B", value))
+
+
+def attr_u16(attr_type: int, value: int) -> bytes:
+    return attr(attr_type, struct.pack("=H", value))
+
+
+def attr_u32(attr_type: int, value: int) -> bytes:
+    return attr(attr_type, struct.pack("=I", value))
+
+
+def attr_nested(attr_type: int, *attrs: bytes) -> bytes:
+    return attr(attr_type, b"".join(attrs))
+
+
+def parse_attrs(data: bytes) -> Dict[int, bytes]:
+    """
+    Parse netlink attributes.
+
+    :param data: attribute data to parse
+    :return: dict of attribute type to attribute data
+    """
+    attrs = {}
+    offset = 0
+    while offset + RTA_HEADER.size <= len(data):
+        length, attr_type = RTA_HEADER.unpack_from(data, offset)
+        if length < RTA_HEADER.size:
+            break
+        attrs[attr_type] = data[offset + RTA_HEADER.size : offset + length]
+        offset += align(length)
+    return attrs
+
+
+def ifinfomsg(index: int = 0, flags: int = 0, change: int = 0) -> bytes:
+    return IFINFOMSG.pack(socket.AF_UNSPEC, 0, index, flags, change)
+
+
+def setns(fd: int, nstype: int) -> None:
+    """
+    Move the calling thread into the namespace referred to by the given file
+    descriptor.
+
+    :param fd: namespace file descriptor
+    :param nstype: type of namespace
+    :return: nothing
+    :raises OSError: when failing to set the namespace
+    """
+    if hasattr(os, "setns"):
+        os.setns(fd, nstype)
+        return
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.setns(fd, nstype) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+
+
+def open_socket(pid: int = None, groups: int = 0) -> socket.socket:
+    """
+    Open a route netlink socket within a given network namespace.
+
+    :param pid: process id to use the network namespace of, None for the
+        current namespace
+    :param groups: multicast groups to subscribe to
+    :return: netlink socket
+    :raises CoreCommandError: when failing to open the socket
+    """
+
+    def create() -> socket.socket:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        sock.bind((0, groups))
+        return sock
+
+    if pid is None:
+        return create()
+    # a socket remains within the namespace it was created in, so create the
+    # socket using a temporary thread that joins the desired namespace
+    result = {}
+
+    def create_within() -> None:
+        try:
+            with open(f"/proc/{pid}/ns/net") as f:
+                setns(f.fileno(), CLONE_NEWNET)
+            result["sock"] = create()
+        except OSError as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=create_within, daemon=True)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        error = result["error"]
+        raise CoreCommandError(
+            error.errno or 1, f"netlink socket pid({pid})", "", str(error)
+        )
+    return result["sock"]
+
+
+def parse_messages(data: bytes) -> List[Tuple[int, int, bytes]]:
+    """
+    Parse netlink messages.
+
+    :param data: message data to parse
+    :return: list of message type, sequence number and payload
+    """
+    messages = []
+    offset = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        length, msg_type, _, seq, _ = NLMSG_HEADER.unpack_from(data, offset)
+        if length < NLMSG_HEADER.size:
+            break
+        payload = data[offset + NLMSG_HEADER.size : offset + length]
+        messages.append((msg_type, seq, payload))
+        offset += align(length)
+    return messages
+
+
+def get_link_name(payload: bytes) -> Optional[str]:
+    """
+    Retrieve the name of a link from a link message payload.
+
+    :param payload: link message payload
+    :return: link name, None when not present
+    """
+    attrs = parse_attrs(payload[IFINFOMSG.size :])
+    name = attrs.get(IFLA_IFNAME)
+    if name is None:
+        return None
+    return name.rstrip(b"\0").decode("utf-8")
+
+
+@dataclass
+class NetlinkRequest:
+    """
+    Netlink request to send, along with a description used for error reporting.
+    """
+
+    msg_type: int
+    flags: int
+    body: bytes
+    description: str
+
+
+class NetlinkSocket:
+    """
+    Route netlink socket for a given network namespace.
+    """
+
+    def __init__(self, pid: int = None) -> None:
+        """
+        Create a NetlinkSocket instance.
+
+        :param pid: process id to use the network namespace of, None for the
+            current namespace
+        """
+        self.pid: Optional[int] = pid
+        self.lock: threading.Lock = threading.Lock()
+        self.seq: int = 0
+        self.sock: socket.socket = self._create_socket()
+
+    def _create_socket(self) -> socket.socket:
+        return open_socket(self.pid)
+
+    def close(self) -> None:
+        """
+        Close the netlink socket.
+
+        :return: nothing
+        """
+        self.sock.close()
+
+    def _next_seq(self) -> int:
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        return self.seq
+
+    def _encode(self, request: NetlinkRequest, seq: int) -> bytes:
+        length = NLMSG_HEADER.size + len(request.body)
+        header = NLMSG_HEADER.pack(length, request.msg_type, request.flags, seq, 0)
+        return header + request.body
+
+    def _messages(self) -> List[Tuple[int, int, bytes]]:
+        return parse_messages(self.sock.recv(RECV_SIZE))
+
+    def send(self, requests: List[NetlinkRequest]) -> None:
+        """
+        Send requests, packing as many messages as possible within each send,
+        and wait for all acknowledgements.
+
+        :param requests: requests to send
+        :return: nothing
+        :raises CoreCommandError: when any request fails, reports the first failure
+        """
+        if not requests:
+            return
+        errors = []
+        with self.lock:
+            start = 0
+            while start < len(requests):
+                pending = {}
+                data = bytearray()
+                end = start
+                while end < len(requests):
+                    request = requests[end]
+                    request.flags |= NLM_F_REQUEST | NLM_F_ACK
+                    length = NLMSG_HEADER.size + len(request.body)
+                    if data and len(data) + length > MAX_BATCH_SIZE:
+                        break
+                    seq = self._next_seq()
+                    data.extend(self._encode(request, seq))
+                    pending[seq] = request
+                    end += 1
+                self.sock.sendall(data)
+                while pending:
+                    for msg_type, seq, payload in self._messages():
+                        request = pending.pop(seq, None)
+                        if request is None or msg_type != NLMSG_ERROR:
+                            continue
+                        (code,) = NLMSG_ERROR_CODE.unpack_from(payload)
+                        if code != 0:
+                            errors.append((request, -code))
+                start = end
+        if errors:
+            request, code = errors[0]
+            raise CoreCommandError(code, request.description, "", os.strerror(code))
+
+    def dump(self, request: NetlinkRequest) -> List[Tuple[int, bytes]]:
+        """
+        Send a request expecting one or more messages as a response.
+
+        :param request: request to send
+        :return: list of message type and payload for all response messages
+        :raises CoreCommandError: when the request fails
+        """
+        request.flags |= NLM_F_REQUEST
+        results = []
+        with self.lock:
+            seq = self._next_seq()
+            self.sock.sendall(self._encode(request, seq))
+            done = False
+            while not done:
+                for msg_type, msg_seq, payload in self._messages():
+                    if msg_seq != seq:
+                        continue
+                    if msg_type == NLMSG_ERROR:
+                        (code,) = NLMSG_ERROR_CODE.unpack_from(payload)
+                        if code != 0:
+                            code = -code
+                            raise CoreCommandError(
+                                code, request.description, "", os.strerror(code)
+                            )
+                        done = True
+                    elif msg_type == NLMSG_DONE:
+                        done = True
+                    else:
+                        results.append((msg_type, payload))
+                        if (request.flags & NLM_F_DUMP) != NLM_F_DUMP:
+                            done = True
+        return results
+
+
+class LinkWatcher:
+    """
+    Watches for links to exist within a network namespace, using link events
+    instead of polling.
+    """
+
+    def __init__(self, pid: int = None) -> None:
+        """
+        Create a LinkWatcher instance.
+
+        :param pid: process id to use the network namespace of, None for the
+            current namespace
+        """
+        self.pid: Optional[int] = pid
+        self.sock: socket.socket = open_socket(pid, RTMGRP_LINK)
+
+    def close(self) -> None:
+        """
+        Close the netlink socket.
+
+        :return: nothing
+        """
+        self.sock.close()
+
+    def __enter__(self) -> "LinkWatcher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _request_links(self) -> None:
+        body = ifinfomsg()
+        length = NLMSG_HEADER.size + len(body)
+        flags = NLM_F_REQUEST | NLM_F_DUMP
+        header = NLMSG_HEADER.pack(length, RTM_GETLINK, flags, 0, 0)
+        self.sock.sendall(header + body)
+
+    def wait(self, names: Iterable[str], timeout: float) -> Set[str]:
+        """
+        Wait for links to exist. Current links are requested after subscribing to
+        link events, so links created at any point are seen.
+
+        :param names: names of links to wait for
+        :param timeout: max time in seconds to wait
+        :return: names of links that did not exist within the timeout
+        :raises CoreCommandError: when failing to receive link messages
+        """
+        pending = set(names)
+        if not pending:
+            return pending
+        deadline = time.monotonic() + timeout
+        self._request_links()
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            readable, _, _ = select.select([self.sock], [], [], remaining)
+            if not readable:
+                break
+            try:
+                data = self.sock.recv(RECV_SIZE)
+            except OSError as e:
+                # events were dropped, request all current links again
+                if e.errno == errno.ENOBUFS:
+                    self._request_links()
+                    continue
+                raise CoreCommandError(
+                    e.errno or 1, f"netlink link events pid({self.pid})", "", str(e)
+                )
+            for msg_type, _, payload in parse_messages(data):
+                if msg_type == RTM_NEWLINK:
+                    pending.discard(get_link_name(payload))
+        return pending
@@ -4,9 +4,11 @@ Defines network nodes used within core.
 
 import logging
 import threading
+import time
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, List, Optional, Type
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Set, Tuple, Type
 
 import netaddr
 
@@ -29,47 +31,82 @@ if TYPE_CHECKING:
 LEARNING_DISABLED: int = 0
 
 
+@dataclass
+class NftablesCommit:
+    """
+    Timing for a committed nftables transaction.
+    """
+
+    name: str
+    lines: int
+    duration: float
+    timestamp: float
+    latency: float = 0.0
+    queue_depth: int = 0
+
+
 class NftablesQueue:
     """
-    Helper class for queuing up nftables commands into rate-limited
-    atomic commits. This improves performance and reliability when there are
-    many WLAN link updates.
+    Helper class for queuing up nftables commands into atomic commits. Networks
+    are updated in parallel by a bounded pool of workers, as each network uses
+    its own table, while updates for a given network are coalesced and never
+    processed concurrently. This improves performance and reliability when
+    there are many WLAN link updates.
     """
 
     # update rate is every 300ms
     rate: float = 0.3
-    atomic_file: str = "/tmp/pycore.nftables.atomic"
     chain: str = "forward"
+    # set of interface pairs used by networks using nftables sets
+    set_name: str = "links"
+    # number of recent commit timings to keep
+    max_commits: int = 1000
+    # number of workers processing network updates
+    workers: int = 4
 
     def __init__(self) -> None:
         """
-        Initialize the helper class, but don't start the update thread
+        Initialize the helper class, but don't start the update threads
         until a WLAN is instantiated.
         """
         self.running: bool = False
-        self.run_thread: Optional[threading.Thread] = None
-        # this lock protects cmds and updates lists
+        self.run_threads: List[threading.Thread] = []
+        # this lock protects starting and stopping update threads
         self.lock: threading.Lock = threading.Lock()
-        # list of pending nftables commands
-        self.cmds: List[str] = []
         # list of WLANs requiring update
         self.updates: utils.SetQueue = utils.SetQueue()
+        # this lock protects pending changes and active networks
+        self.pending_lock: threading.Lock = threading.Lock()
+        # networks requiring a full rebuild
+        self.rebuilds: Set["CoreNetwork"] = set()
+        # changed interface pairs for networks using nftables sets
+        self.pending: Dict["CoreNetwork", Set[Tuple[CoreInterface, CoreInterface]]] = {}
+        # time of the oldest uncommitted change for networks
+        self.requested: Dict["CoreNetwork", float] = {}
+        # networks currently being processed, and those updated meanwhile
+        self.active: Set["CoreNetwork"] = set()
+        self.requeue: Set["CoreNetwork"] = set()
+        # timing of recent commits
+        self.commits: Deque[NftablesCommit] = deque(maxlen=self.max_commits)
+        self.max_queue_depth: int = 0
 
     def start(self) -> None:
         """
-        Start thread to listen for updates for the provided network.
+        Start threads to listen for updates for networks.
 
         :return: nothing
         """
         with self.lock:
             if not self.running:
                 self.running = True
-                self.run_thread = threading.Thread(target=self.run, daemon=True)
-                self.run_thread.start()
+                for _ in range(self.workers):
+                    thread = threading.Thread(target=self.run, daemon=True)
+                    thread.start()
+                    self.run_threads.append(thread)
 
     def stop(self) -> None:
         """
-        Stop updates for network, when no networks remain, stop update thread.
+        Stop updates for network, when no networks remain, stop update threads.
 
         :return: nothing
         """
@@ -77,41 +114,158 @@ class NftablesQueue:
             if self.running:
                 self.running = False
                 self.updates.put(None)
-                self.run_thread.join()
-                self.run_thread = None
+                for thread in self.run_threads:
+                    thread.join()
+                self.run_threads.clear()
+                # keep updates for other networks, for when started again
+                self.updates.discard(None)
 
     def run(self) -> None:
         """
-        Thread target that looks for networks needing update, and
-        rate limits the amount of nftables activity. Only one userspace program
-        should use nftables at any given time, or results can be unpredictable.
+        Thread target that looks for networks needing update, processing a given
+        network within a single thread at a time.
 
         :return: nothing
         """
         while self.running:
             net = self.updates.get()
             if net is None:
+                # allow other workers to see the stop request
+                self.updates.put(None)
                 break
-            self.build_cmds(net)
-            self.commit(net)
+            with self.pending_lock:
+                if net in self.active:
+                    self.requeue.add(net)
+                    continue
+                self.active.add(net)
+            try:
+                self.process(net)
+            finally:
+                with self.pending_lock:
+                    self.active.discard(net)
+                    requeue = net in self.requeue
+                    self.requeue.discard(net)
+                if requeue:
+                    self.updates.put(net)
 
-    def commit(self, net: "CoreNetwork") -> None:
+    def process(self, net: "CoreNetwork") -> None:
+        """
+        Build and commit pending changes for the provided network, only
+        updating set elements for changed links when possible.
+
+        :param net: network to process changes for
+        :return: nothing
+        """
+        queue_depth = self.updates.qsize()
+        with self.pending_lock:
+            rebuild = net in self.rebuilds
+            self.rebuilds.discard(net)
+            pairs = self.pending.pop(net, set())
+            requested = self.requested.pop(net, None)
+            self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+        if rebuild or not net.has_nftables_chain:
+            cmds = self.build_cmds(net)
+        else:
+            cmds = self.build_element_cmds(net, pairs)
+        self.commit(net, cmds, requested, queue_depth)
+
+    def commit(
+        self,
+        net: "CoreNetwork",
+        cmds: List[str],
+        requested: float = None,
+        queue_depth: int = 0,
+    ) -> None:
         """
         Commit changes to nftables for the provided network.
 
         :param net: network to commit nftables changes
+        :param cmds: nftables commands to commit
+        :param requested: time the oldest change being committed was requested
+        :param queue_depth: number of networks waiting for update
         :return: nothing
         """
-        if not self.cmds:
+        if not cmds:
             return
-        # write out nft commands to file
-        for cmd in self.cmds:
-            net.host_cmd(f"echo {cmd} >> {self.atomic_file}", shell=True)
-        # read file as atomic change
-        net.host_cmd(f"{NFTABLES} -f {self.atomic_file}")
-        # remove file
-        net.host_cmd(f"rm -f {self.atomic_file}")
-        self.cmds.clear()
+        data = "\n".join(cmds) + "\n"
+        start = time.monotonic()
+        try:
+            if net.server is None:
+                # read commands from stdin as an atomic change
+                utils.cmd(f"{NFTABLES} -f -", data=data)
+            else:
+                # read commands from a session specific file as an atomic change
+                path = net.session.directory / f"nftables.{net.brname}"
+                net.server.remote_put_temp(path, data)
+                net.host_cmd(f"{NFTABLES} -f {path}")
+                net.host_cmd(f"rm -f {path}")
+        except CoreCommandError:
+            logger.exception("error committing nftables for %s", net.brname)
+            self.reset(net)
+        end = time.monotonic()
+        duration = end - start
+        latency = end - requested if requested is not None else duration
+        commit = NftablesCommit(
+            net.brname, len(cmds), duration, time.time(), latency, queue_depth
+        )
+        self.commits.append(commit)
+        logger.debug(
+            "nftables commit %s lines(%s) duration(%.3fs) latency(%.3fs)",
+            net.brname,
+            len(cmds),
+            duration,
+            latency,
+        )
+
+    def reset(self, net: "CoreNetwork") -> None:
+        """
+        Reset tracked nftables state for a network after a failed commit, as it
+        no longer matches nftables, and schedule a full rebuild after the update
+        rate, avoiding repeated failures in quick succession.
+
+        :param net: network to reset
+        :return: nothing
+        """
+        with net.linked_lock:
+            net.has_nftables_chain = False
+            net.nftables_elements.clear()
+        if self.running:
+            timer = threading.Timer(self.rate, self.update, (net,))
+            timer.daemon = True
+            timer.start()
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        Retrieve metrics for recent commits and the update queue.
+
+        :return: dict of metric names to values
+        """
+        commits = list(self.commits)
+        latencies = sorted(x.latency for x in commits)
+        metrics = {
+            "queue_depth": self.updates.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "commits": len(commits),
+            "latency_mean": 0.0,
+            "latency_p99": 0.0,
+            "latency_max": 0.0,
+        }
+        if latencies:
+            index = min(len(latencies) - 1, int(len(latencies) * 0.99))
+            metrics["latency_mean"] = sum(latencies) / len(latencies)
+            metrics["latency_p99"] = latencies[index]
+            metrics["latency_max"] = latencies[-1]
+        return metrics
+
+    def _requested(self, net: "CoreNetwork") -> None:
+        """
+        Track the time a change was requested, must be called while holding the
+        pending lock.
+
+        :param net: network change was requested for
+        :return: nothing
+        """
+        self.requested.setdefault(net, time.monotonic())
 
     def update(self, net: "CoreNetwork") -> None:
         """
@@ -120,6 +274,26 @@ class NftablesQueue:
         :param net: wlan network
         :return: nothing
         """
+        with self.pending_lock:
+            self.rebuilds.add(net)
+            self._requested(net)
+        self.updates.put(net)
+
+    def update_link(
+        self, net: "CoreNetwork", iface1: CoreInterface, iface2: CoreInterface
+    ) -> None:
+        """
+        Flag a link has changed for a network using nftables sets, so only the
+        set elements for the link will be updated.
+
+        :param net: network link changed for
+        :param iface1: interface one
+        :param iface2: interface two
+        :return: nothing
+        """
+        with self.pending_lock:
+            self.pending.setdefault(net, set()).add((iface1, iface2))
+            self._requested(net)
         self.updates.put(net)
 
     def delete_table(self, net: "CoreNetwork") -> None:
@@ -132,52 +306,134 @@ class NftablesQueue:
         with self.lock:
             net.host_cmd(f"{NFTABLES} delete table bridge {net.brname}")
 
-    def build_cmds(self, net: "CoreNetwork") -> None:
+    def build_cmds(self, net: "CoreNetwork") -> List[str]:
         """
         Inspect linked nodes for a network, and rebuild the nftables chain commands.
 
         :param net: network to build commands for
-        :return: nothing
+        :return: nftables commands
         """
+        cmds = []
         with net.linked_lock:
             if net.has_nftables_chain:
-                self.cmds.append(f"flush table bridge {net.brname}")
+                cmds.append(f"flush table bridge {net.brname}")
             else:
                 net.has_nftables_chain = True
                 policy = net.policy.value.lower()
-                self.cmds.append(f"add table bridge {net.brname}")
-                self.cmds.append(
+                # flush in case the table remains from a failed commit
+                cmds.append(f"add table bridge {net.brname}")
+                cmds.append(f"flush table bridge {net.brname}")
+                cmds.append(
                     f"add chain bridge {net.brname} {self.chain} {{type filter hook "
-                    f"forward priority -1\\; policy {policy}\\;}}"
+                    f"forward priority -1; policy {policy};}}"
                 )
             # add default rule to accept all traffic not for this bridge
-            self.cmds.append(
+            cmds.append(
                 f"add rule bridge {net.brname} {self.chain} "
                 f"ibriport != {net.brname} accept"
             )
             # rebuild the chain
+            if net.nftables_sets:
+                self.build_set_cmds(net, cmds)
+                return cmds
             for iface1, v in net.linked.items():
                 for iface2, linked in v.items():
-                    policy = None
-                    if net.policy == NetworkPolicy.DROP and linked:
-                        policy = "accept"
-                    elif net.policy == NetworkPolicy.ACCEPT and not linked:
-                        policy = "drop"
+                    policy = self.get_policy(net, linked)
                     if policy:
-                        self.cmds.append(
+                        cmds.append(
                             f"add rule bridge {net.brname} {self.chain} "
                             f"iif {iface1.localname} oif {iface2.localname} "
                             f"{policy}"
                         )
-                        self.cmds.append(
+                        cmds.append(
                             f"add rule bridge {net.brname} {self.chain} "
                             f"oif {iface1.localname} iif {iface2.localname} "
                             f"{policy}"
                         )
+        return cmds
 
+    @classmethod
+    def get_policy(cls, net: "CoreNetwork", linked: bool) -> Optional[str]:
+        """
+        Retrieve the rule policy needed for a link, if any.
 
-# a global object because all networks share the same queue
-# cannot have multiple threads invoking the nftables commnd
+        :param net: network link is for
+        :param linked: True if the interfaces are linked, False otherwise
+        :return: rule policy, None when the network policy applies
+        """
+        if net.policy == NetworkPolicy.DROP and linked:
+            return "accept"
+        elif net.policy == NetworkPolicy.ACCEPT and not linked:
+            return "drop"
+        return None
+
+    def get_element(self, iface1: CoreInterface, iface2: CoreInterface) -> str:
+        name1, name2 = iface1.localname, iface2.localname
+        return f'{{ "{name1}" . "{name2}", "{name2}" . "{name1}" }}'
+
+    def build_set_cmds(self, net: "CoreNetwork", cmds: List[str]) -> None:
+        """
+        Build commands for a single rule matching interface pairs within a set,
+        followed by elements for all links not using the network policy. Must be
+        called while holding the network linked lock.
+
+        :param net: network to build commands for
+        :param cmds: list to add commands to
+        :return: nothing
+        """
+        policy = self.get_policy(net, net.policy == NetworkPolicy.DROP)
+        cmds.append(
+            f"add set bridge {net.brname} {self.set_name} "
+            f"{{type iface_index . iface_index;}}"
+        )
+        cmds.append(f"flush set bridge {net.brname} {self.set_name}")
+        cmds.append(
+            f"add rule bridge {net.brname} {self.chain} "
+            f"iif . oif @{self.set_name} {policy}"
+        )
+        net.nftables_elements.clear()
+        for iface1, v in net.linked.items():
+            for iface2, linked in v.items():
+                if self.get_policy(net, linked):
+                    element = self.get_element(iface1, iface2)
+                    cmds.append(
+                        f"add element bridge {net.brname} {self.set_name} {element}"
+                    )
+                    net.nftables_elements.add((iface1, iface2))
+
+    def build_element_cmds(
+        self, net: "CoreNetwork", pairs: Set[Tuple[CoreInterface, CoreInterface]]
+    ) -> List[str]:
+        """
+        Build commands adding or deleting set elements for changed links.
+
+        :param net: network to build commands for
+        :param pairs: interface pairs that have changed
+        :return: nftables commands
+        """
+        cmds = []
+        with net.linked_lock:
+            for iface1, iface2 in pairs:
+                linked = net.linked.get(iface1, {}).get(iface2)
+                policy = None if linked is None else self.get_policy(net, linked)
+                installed = (iface1, iface2) in net.nftables_elements
+                element = self.get_element(iface1, iface2)
+                if policy and not installed:
+                    cmds.append(
+                        f"add element bridge {net.brname} {self.set_name} {element}"
+                    )
+                    net.nftables_elements.add((iface1, iface2))
+                elif not policy and installed:
+                    cmds.append(
+                        f"delete element bridge {net.brname} {self.set_name} "
+                        f"{element}"
+                    )
+                    net.nftables_elements.discard((iface1, iface2))
+        return cmds
+
+
+# a global object because all networks share the same queue, ensuring a given
+# network table is only updated by one worker at a time
 nft_queue: NftablesQueue = NftablesQueue()
 
 
@@ -218,6 +474,8 @@ class CoreNetwork(CoreNetworkBase):
         sessionid = self.session.short_session_id()
         self.brname: str = f"b.{self.id}.{sessionid}"
         self.has_nftables_chain: bool = False
+        self.nftables_sets: bool = False
+        self.nftables_elements: Set[Tuple[CoreInterface, CoreInterface]] = set()
 
     @classmethod
     def create_options(cls) -> NetworkOptions:
@@ -259,6 +517,8 @@ class CoreNetwork(CoreNetworkBase):
         if self.mtu > 0:
             self.net_client.set_mtu(self.brname, self.mtu)
         self.has_nftables_chain = False
+        self.nftables_sets = self.session.use_nftables_sets()
+        self.nftables_elements.clear()
         self.up = True
         nft_queue.start()
 
@@ -354,7 +614,7 @@ class CoreNetwork(CoreNetworkBase):
             if not self.is_linked(iface1, iface2):
                 return
             self.linked[iface1][iface2] = False
-        nft_queue.update(self)
+        self.update_nftables(iface1, iface2)
 
     def link(self, iface1: CoreInterface, iface2: CoreInterface) -> None:
         """
@@ -369,7 +629,21 @@ class CoreNetwork(CoreNetworkBase):
             if self.is_linked(iface1, iface2):
                 return
             self.linked[iface1][iface2] = True
-        nft_queue.update(self)
+        self.update_nftables(iface1, iface2)
+
+    def update_nftables(self, iface1: CoreInterface, iface2: CoreInterface) -> None:
+        """
+        Queue nftables changes for a changed link, updating only the link set
+        elements when using nftables sets, otherwise rebuilding the chain.
+
+        :param iface1: interface one
+        :param iface2: interface two
+        :return: nothing
+        """
+        if self.nftables_sets:
+            nft_queue.update_link(self, iface1, iface2)
+        else:
+            nft_queue.update(self)
 
 
 class GreTapBridge(CoreNetwork):
@@ -219,6 +219,9 @@ class Rj45Node(CoreNodeBase):
     def copy_file(self, src_path: Path, dst_path: Path, mode: int = None) -> None:
         raise CoreError("rj45 does not support copying files")
 
+    def get_file(self, src_path: Path, dst_path: Path) -> None:
+        raise CoreError("rj45 does not support getting files")
+
 
 class PhysicalNode(CoreNode):
     def __init__(
@@ -6,9 +6,12 @@ import copy
 import logging
 import math
 import secrets
+import threading
+import time
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Dict, List, Set, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
 
+from core import utils
 from core.config import ConfigBool, ConfigFloat, ConfigInt, Configuration
 from core.emulator.data import LinkData, LinkOptions
 from core.emulator.enumerations import LinkTypes, MessageFlags
@@ -22,6 +25,9 @@ if TYPE_CHECKING:
     from core.emulator.distributed import DistributedServer
 
 logger = logging.getLogger(__name__)
+
+np = utils.get_numpy()
+
 CONFIG_ENABLED: bool = True
 CONFIG_RANGE: float = 400.0
 CONFIG_LOSS_RANGE: float = 300.0
@@ -30,6 +36,7 @@ CONFIG_LOSS: float = 0.0
 CONFIG_DELAY: int = 5000
 CONFIG_BANDWIDTH: int = 54_000_000
 CONFIG_JITTER: int = 0
+CONFIG_LINK_TIMEOUT: int = 0
 KEY_ENABLED: str = "movement"
 KEY_RANGE: str = "max-range"
 KEY_BANDWIDTH: str = "bandwidth"
@@ -38,6 +45,11 @@ KEY_JITTER: str = "jitter"
 KEY_LOSS_RANGE: str = "loss-range"
 KEY_LOSS_FACTOR: str = "loss-factor"
 KEY_LOSS: str = "loss"
+KEY_LINK_TIMEOUT: str = "link-timeout"
+# name of the per bridge set of link devices that traffic is routed to
+ROUTES_SET: str = "routes"
+# minimum interval between checks for idle links
+IDLE_CHECK_INTERVAL: float = 1.0
 
 
 def calc_distance(
@@ -51,6 +63,28 @@ def calc_distance(
     return math.hypot(math.hypot(a, b), c)
 
 
+def calc_loss(
+    distance: float, max_range: float, loss_range: float, loss_factor: float
+) -> float:
+    """
+    Calculate loss percentage for a given distance, loss increases linearly from
+    the loss range to the max range.
+
+    :param distance: distance between nodes
+    :param max_range: max range for nodes to be linked
+    :param loss_range: distance loss begins at
+    :param loss_factor: factor to scale loss by
+    :return: loss percentage
+    """
+    loss_distance = max(distance - loss_range, 0.0)
+    max_distance = max(max_range - loss_range, 0.0)
+    if max_distance:
+        ratio = loss_distance / max_distance
+    else:
+        ratio = math.inf if loss_distance else 0.0
+    return min(ratio * 100.0 * loss_factor, 100.0)
+
+
 def get_key(node1_id: int, node2_id: int) -> Tuple[int, int]:
     return (node1_id, node2_id) if node1_id < node2_id else (node2_id, node1_id)
 
@@ -62,6 +96,8 @@ class WirelessLink:
     iface: CoreInterface
     linked: bool
     label: str = None
+    loss: float = None
+    idle_since: float = None
 
 
 class WirelessNode(CoreNetworkBase):
@@ -86,6 +122,11 @@ class WirelessNode(CoreNetworkBase):
             id=KEY_LOSS_FACTOR, default=str(CONFIG_LOSS_FACTOR), label="Loss Factor"
         ),
         ConfigFloat(id=KEY_LOSS, default=str(CONFIG_LOSS), label="Loss Initial"),
+        ConfigInt(
+            id=KEY_LINK_TIMEOUT,
+            default=str(CONFIG_LINK_TIMEOUT),
+            label="Remove Unlinked After (sec), 0 to disable",
+        ),
     ]
     devices: Set[str] = set()
 
@@ -121,6 +162,17 @@ class WirelessNode(CoreNetworkBase):
         self.loss_initial: float = CONFIG_LOSS
         self.loss_range: float = CONFIG_LOSS_RANGE
         self.loss_factor: float = CONFIG_LOSS_FACTOR
+        self.link_timeout: int = CONFIG_LINK_TIMEOUT
+        self.idle_checked: float = 0.0
+        # protects links, which are created as nodes first come into range
+        self.links_lock: threading.RLock = threading.RLock()
+        # array backed positions and link state, indexed by node position
+        # within node_ids, used for vectorized link calculations
+        self.node_ids: List[int] = []
+        self.node_index: Dict[int, int] = {}
+        self.positions: Optional["np.ndarray"] = None
+        self.linked_state: Optional["np.ndarray"] = None
+        self.loss_state: Optional["np.ndarray"] = None
 
     def startup(self) -> None:
         if self.up:
@@ -135,6 +187,11 @@ class WirelessNode(CoreNetworkBase):
         while self.links:
             _, link = self.links.popitem()
             link.iface.shutdown()
+        self.node_ids.clear()
+        self.node_index.clear()
+        self.positions = None
+        self.linked_state = None
+        self.loss_state = None
         self.up = False
 
     def attach(self, iface: CoreInterface) -> None:
@@ -156,6 +213,21 @@ class WirelessNode(CoreNetworkBase):
                 f"'add rule bridge {bridge_name} forward "
                 f"ibriport != {bridge_name} accept'"
             )
+            # route traffic between the node and links, added as links are created
+            self.host_cmd(
+                f"{NFTABLES} "
+                f"'add set bridge {bridge_name} {ROUTES_SET} {{type iface_index;}}'"
+            )
+            self.host_cmd(
+                f"{NFTABLES} "
+                f"'add rule bridge {bridge_name} forward "
+                f"iif {iface.localname} oif @{ROUTES_SET} accept'"
+            )
+            self.host_cmd(
+                f"{NFTABLES} "
+                f"'add rule bridge {bridge_name} forward "
+                f"iif @{ROUTES_SET} oif {iface.localname} accept'"
+            )
             # associate node iface with bridge
             iface.net_client.set_iface_master(bridge_name, iface.localname)
             # assign position callback, when enabled
@@ -165,82 +237,118 @@ class WirelessNode(CoreNetworkBase):
             self.bridges[iface.node.id] = (iface, bridge_name)
 
     def post_startup(self) -> None:
-        routes = {}
-        for node_id, (iface, bridge_name) in self.bridges.items():
-            for onode_id, (oiface, obridge_name) in self.bridges.items():
-                if node_id == onode_id:
-                    continue
-                if node_id < onode_id:
-                    node1, node2 = iface.node, oiface.node
-                    bridge1, bridge2 = bridge_name, obridge_name
-                else:
-                    node1, node2 = oiface.node, iface.node
-                    bridge1, bridge2 = obridge_name, bridge_name
-                key = (node1.id, node2.id)
-                if key in self.links:
+        self.init_state()
+        if self.position_enabled:
+            # calculate link data, creating links for nodes in range
+            self.calc_links([iface for iface, _ in self.bridges.values()])
+
+    def create_link(self, key: Tuple[int, int]) -> WirelessLink:
+        """
+        Create the link between two nodes, routing traffic between the link and
+        each node bridge. The link is not connected to the bridges until linked.
+
+        :param key: link key
+        :return: created link
+        :raises CoreError: when either node is not attached
+        """
+        node1_id, node2_id = key
+        if node1_id not in self.bridges or node2_id not in self.bridges:
+            raise CoreError(f"invalid node links node1({node1_id}) node2({node2_id})")
+        _, bridge1 = self.bridges[node1_id]
+        _, bridge2 = self.bridges[node2_id]
+        name1 = self.add_device()
+        name2 = self.add_device()
+        link_iface = CoreInterface(0, name1, name2, self.session.use_ovs())
+        link_iface.startup()
+        link = WirelessLink(bridge1, bridge2, link_iface, False)
+        link.idle_since = time.monotonic()
+        self.links[key] = link
+        self.host_cmd(
+            f"{NFTABLES} "
+            f"'add element bridge {bridge1} {ROUTES_SET} {{ {name1} }}; "
+            f"add element bridge {bridge2} {ROUTES_SET} {{ {name2} }}'"
+        )
+        return link
+
+    def delete_link(self, key: Tuple[int, int]) -> None:
+        """
+        Delete the link between two nodes.
+
+        :param key: link key
+        :return: nothing
+        """
+        link = self.links.pop(key)
+        iface = link.iface
+        self.host_cmd(
+            f"{NFTABLES} "
+            f"'delete element bridge {link.bridge1} {ROUTES_SET} {{ {iface.name} }}; "
+            f"delete element bridge {link.bridge2} {ROUTES_SET} "
+            f"{{ {iface.localname} }}'"
+        )
+        iface.shutdown()
+        self.delete_device(iface.name)
+        self.delete_device(iface.localname)
+        link.linked = False
+        link.loss = None
+        self.update_state(key, link)
+
+    def delete_idle_links(self) -> None:
+        """
+        Delete links that have remained unlinked longer than the link timeout,
+        checked at most once per check interval.
+
+        :return: nothing
+        """
+        if self.link_timeout <= 0:
+            return
+        now = time.monotonic()
+        if now - self.idle_checked < IDLE_CHECK_INTERVAL:
+            return
+        self.idle_checked = now
+        with self.links_lock:
+            for key, link in list(self.links.items()):
+                if link.linked or link.idle_since is None:
                     continue
-                # create node to node link
-                name1 = self.add_device()
-                name2 = self.add_device()
-                link_iface = CoreInterface(0, name1, name2, self.session.use_ovs())
-                link_iface.startup()
-                link = WirelessLink(bridge1, bridge2, link_iface, False)
-                self.links[key] = link
-                # track bridge routes
-                node1_routes = routes.setdefault(node1.id, set())
-                node1_routes.add(name1)
-                node2_routes = routes.setdefault(node2.id, set())
-                node2_routes.add(name2)
-                if self.position_enabled:
-                    link.linked = True
-                    # assign ifaces to respective bridges
-                    self.net_client.set_iface_master(bridge1, link_iface.name)
-                    self.net_client.set_iface_master(bridge2, link_iface.localname)
-                    # calculate link data
-                    self.calc_link(iface, oiface)
-        for node_id, ifaces in routes.items():
-            iface, bridge_name = self.bridges[node_id]
-            ifaces = ",".join(ifaces)
-            # out routes
-            self.host_cmd(
-                f"{NFTABLES} "
-                f'"add rule bridge {bridge_name} forward '
-                f"iif {iface.localname} oif {{{ifaces}}} "
-                f'accept"'
-            )
-            # in routes
-            self.host_cmd(
-                f"{NFTABLES} "
-                f'"add rule bridge {bridge_name} forward '
-                f"iif {{{ifaces}}} oif {iface.localname} "
-                f'accept"'
-            )
+                if now - link.idle_since >= self.link_timeout:
+                    logger.debug("deleting idle wireless link: %s", key)
+                    self.delete_link(key)
 
     def link_control(self, node1_id: int, node2_id: int, linked: bool) -> None:
         key = get_key(node1_id, node2_id)
-        link = self.links.get(key)
-        if not link:
-            raise CoreError(f"invalid node links node1({node1_id}) node2({node2_id})")
-        bridge1, bridge2 = link.bridge1, link.bridge2
-        iface = link.iface
-        if not link.linked and linked:
-            link.linked = True
-            self.net_client.set_iface_master(bridge1, iface.name)
-            self.net_client.set_iface_master(bridge2, iface.localname)
-            self.send_link(key[0], key[1], MessageFlags.ADD, link.label)
-        elif link.linked and not linked:
-            link.linked = False
-            self.net_client.delete_iface(bridge1, iface.name)
-            self.net_client.delete_iface(bridge2, iface.localname)
-            self.send_link(key[0], key[1], MessageFlags.DELETE, link.label)
+        with self.links_lock:
+            link = self.links.get(key)
+            if not link:
+                if not linked:
+                    if node1_id not in self.bridges or node2_id not in self.bridges:
+                        raise CoreError(
+                            f"invalid node links node1({node1_id}) node2({node2_id})"
+                        )
+                    return
+                link = self.create_link(key)
+            bridge1, bridge2 = link.bridge1, link.bridge2
+            iface = link.iface
+            if not link.linked and linked:
+                link.linked = True
+                link.idle_since = None
+                self.net_client.set_iface_master(bridge1, iface.name)
+                self.net_client.set_iface_master(bridge2, iface.localname)
+                self.send_link(key[0], key[1], MessageFlags.ADD, link.label)
+            elif link.linked and not linked:
+                link.linked = False
+                link.idle_since = time.monotonic()
+                self.net_client.delete_iface(bridge1, iface.name)
+                self.net_client.delete_iface(bridge2, iface.localname)
+                self.send_link(key[0], key[1], MessageFlags.DELETE, link.label)
+            self.update_state(key, link)
 
     def link_config(
         self, node1_id: int, node2_id: int, options1: LinkOptions, options2: LinkOptions
     ) -> None:
         key = get_key(node1_id, node2_id)
-        link = self.links.get(key)
-        if not link:
-            raise CoreError(f"invalid node links node1({node1_id}) node2({node2_id})")
+        with self.links_lock:
+            link = self.links.get(key)
+            if not link:
+                link = self.create_link(key)
         iface = link.iface
         has_netem = iface.has_netem
         iface.options.update(options1)
@@ -251,6 +359,9 @@ class WirelessNode(CoreNetworkBase):
         iface.has_netem = has_netem
         iface.set_config()
         iface.name, iface.localname = name, localname
+        # loss is tracked for position based configuration only
+        link.loss = None
+        self.update_state(key, link)
         if options1 == options2:
             link.label = f"{options1.loss:.2f}%/{options1.delay}us"
         else:
@@ -288,11 +399,129 @@ class WirelessNode(CoreNetworkBase):
         )
         self.session.broadcast_link(link_data)
 
+    def init_state(self) -> None:
+        """
+        Initialize array backed node positions and link state, used for
+        vectorized link calculations when numpy is available.
+
+        :return: nothing
+        """
+        self.node_ids = sorted(self.bridges)
+        self.node_index = {x: i for i, x in enumerate(self.node_ids)}
+        if np is None:
+            return
+        count = len(self.node_ids)
+        self.positions = np.full((count, 3), np.nan)
+        for index, node_id in enumerate(self.node_ids):
+            iface, _ = self.bridges[node_id]
+            self.positions[index] = self.get_point(iface)
+        self.linked_state = np.zeros((count, count), dtype=bool)
+        self.loss_state = np.full((count, count), np.nan)
+        for key, link in self.links.items():
+            self.update_state(key, link)
+
+    def update_state(self, key: Tuple[int, int], link: WirelessLink) -> None:
+        """
+        Update array backed state for a given link.
+
+        :param key: link key
+        :param link: link to update state for
+        :return: nothing
+        """
+        if self.linked_state is None:
+            return
+        index1 = self.node_index.get(key[0])
+        index2 = self.node_index.get(key[1])
+        if index1 is None or index2 is None:
+            return
+        loss = np.nan if link.loss is None else link.loss
+        self.linked_state[index1, index2] = link.linked
+        self.linked_state[index2, index1] = link.linked
+        self.loss_state[index1, index2] = loss
+        self.loss_state[index2, index1] = loss
+
+    @classmethod
+    def get_point(cls, iface: CoreInterface) -> Tuple[float, float, float]:
+        x, y, z = iface.node.position.get()
+        return tuple(math.nan if v is None else v for v in (x, y, z))
+
     def position_callback(self, iface: CoreInterface) -> None:
-        for oiface, bridge_name in self.bridges.values():
-            if iface == oiface:
-                continue
-            self.calc_link(iface, oiface)
+        self.calc_links([iface])
+
+    def calc_links(self, ifaces: List[CoreInterface]) -> None:
+        """
+        Calculate links between the given moved interfaces and all other
+        interfaces, only updating links whose state has changed.
+
+        :param ifaces: interfaces that have moved
+        :return: nothing
+        """
+        moved = {}
+        for iface in ifaces:
+            index = self.node_index.get(iface.node.id)
+            if index is not None:
+                moved[index] = iface
+        if not moved:
+            return
+        with self.links_lock:
+            self._calc_links(moved)
+        self.delete_idle_links()
+
+    def _calc_links(self, moved: Dict[int, CoreInterface]) -> None:
+        """
+        Calculate links for moved interfaces, must be called while holding the
+        links lock.
+
+        :param moved: moved interfaces by their node index
+        :return: nothing
+        """
+        if self.positions is None:
+            calculated = set()
+            for iface in moved.values():
+                for oiface, _ in self.bridges.values():
+                    if iface == oiface or oiface in calculated:
+                        continue
+                    self.calc_link(iface, oiface)
+                calculated.add(iface)
+            return
+        indexes = np.fromiter(moved, dtype=int, count=len(moved))
+        for index, iface in moved.items():
+            self.positions[index] = self.get_point(iface)
+        # distances from each moved node to all nodes, a missing z is ignored
+        delta = self.positions[indexes][:, None, :] - self.positions[None, :, :]
+        delta[..., 2] = np.nan_to_num(delta[..., 2])
+        distances = np.sqrt(np.sum(delta * delta, axis=2))
+        losses = self.calc_losses(distances)
+        in_range = distances < self.max_range
+        # calculate each pair once and ignore nodes without a position
+        rows = indexes[:, None]
+        columns = np.arange(len(self.node_ids))[None, :]
+        is_moved = np.zeros(len(self.node_ids), dtype=bool)
+        is_moved[indexes] = True
+        valid = (rows != columns) & (~is_moved[columns] | (rows < columns))
+        valid &= ~np.isnan(distances)
+        changed = in_range != self.linked_state[indexes]
+        changed |= in_range & (losses != self.loss_state[indexes])
+        for row, column in zip(*np.nonzero(valid & changed)):
+            node1_id = self.node_ids[indexes[row]]
+            node2_id = self.node_ids[column]
+            linked = bool(in_range[row, column])
+            self.set_link(node1_id, node2_id, linked, float(losses[row, column]))
+
+    def calc_losses(self, distances: "np.ndarray") -> "np.ndarray":
+        """
+        Vectorized version of calc_loss, also applying the initial loss.
+
+        :param distances: distances to calculate loss for
+        :return: loss percentages
+        """
+        loss_distances = np.maximum(distances - self.loss_range, 0.0)
+        max_distance = max(self.max_range - self.loss_range, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = loss_distances / max_distance
+        ratios = np.nan_to_num(ratios, nan=0.0, posinf=np.inf)
+        losses = np.minimum(ratios * 100.0 * self.loss_factor, 100.0)
+        return np.maximum(losses, self.loss_initial)
 
     def calc_link(self, iface1: CoreInterface, iface2: CoreInterface) -> None:
         key = get_key(iface1.node.id, iface2.node.id)
@@ -300,23 +529,39 @@ class WirelessNode(CoreNetworkBase):
         point1 = iface1.node.position.get()
         point2 = iface2.node.position.get()
         distance = calc_distance(point1, point2)
-        if distance >= self.max_range:
-            if link.linked:
-                self.link_control(iface1.node.id, iface2.node.id, False)
-        else:
-            if not link.linked:
-                self.link_control(iface1.node.id, iface2.node.id, True)
-            loss_distance = max(distance - self.loss_range, 0.0)
-            max_distance = max(self.max_range - self.loss_range, 0.0)
-            loss = min((loss_distance / max_distance) * 100.0 * self.loss_factor, 100.0)
-            loss = max(self.loss_initial, loss)
-            options = LinkOptions(
-                loss=loss,
-                delay=self.delay,
-                bandwidth=self.bandwidth,
-                jitter=self.jitter,
-            )
-            self.link_config(iface1.node.id, iface2.node.id, options, options)
+        linked = distance < self.max_range
+        loss = calc_loss(distance, self.max_range, self.loss_range, self.loss_factor)
+        loss = max(self.loss_initial, loss)
+        current_linked = link.linked if link else False
+        current_loss = link.loss if link else None
+        if linked == current_linked and (not linked or loss == current_loss):
+            return
+        self.set_link(iface1.node.id, iface2.node.id, linked, loss)
+
+    def set_link(self, node1_id: int, node2_id: int, linked: bool, loss: float):
+        """
+        Apply calculated link state between two nodes.
+
+        :param node1_id: first node in link
+        :param node2_id: second node in link
+        :param linked: True if nodes are in range, False otherwise
+        :param loss: calculated loss percentage
+        :return: nothing
+        """
+        self.link_control(node1_id, node2_id, linked)
+        if not linked:
+            return
+        options = LinkOptions(
+            loss=loss,
+            delay=self.delay,
+            bandwidth=self.bandwidth,
+            jitter=self.jitter,
+        )
+        self.link_config(node1_id, node2_id, options, options)
+        key = get_key(node1_id, node2_id)
+        link = self.links[key]
+        link.loss = loss
+        self.update_state(key, link)
 
     def adopt_iface(self, iface: CoreInterface, name: str) -> None:
         raise CoreError(f"{type(self)} does not support adopt interface")
@@ -331,6 +576,7 @@ class WirelessNode(CoreNetworkBase):
         config[KEY_BANDWIDTH].default = str(self.bandwidth)
         config[KEY_DELAY].default = str(self.delay)
         config[KEY_JITTER].default = str(self.jitter)
+        config[KEY_LINK_TIMEOUT].default = str(self.link_timeout)
         return config
 
     def set_config(self, config: Dict[str, str]) -> None:
@@ -343,3 +589,8 @@ class WirelessNode(CoreNetworkBase):
         self.bandwidth = int(config[KEY_BANDWIDTH])
         self.delay = int(config[KEY_DELAY])
         self.jitter = int(config[KEY_JITTER])
+        self.link_timeout = int(config.get(KEY_LINK_TIMEOUT, CONFIG_LINK_TIMEOUT))
+        # reapply link configuration on the next calculation
+        for key, link in self.links.items():
+            link.loss = None
+            self.update_state(key, link)
@@ -309,6 +309,39 @@ class Sdt:
                 return
             self.cmd(f"node {node.id} {pos}")
 
+    def edit_nodes(self, nodes: List[NodeBase]) -> None:
+        """
+        Handle updating a group of nodes in SDT, positions for nodes without a
+        geo position are converted together.
+
+        :param nodes: nodes to update
+        :return: nothing
+        """
+        if len(nodes) == 1:
+            node = nodes[0]
+            self.edit_node(
+                node, node.position.lon, node.position.lat, node.position.alt
+            )
+            return
+        if not nodes or not self.connect():
+            return
+        convert = []
+        for node in nodes:
+            logger.debug("sdt update node: %s - %s", node.id, node.name)
+            lon, lat, alt = node.position.get_geo()
+            if all([lat is not None, lon is not None, alt is not None]):
+                self.cmd(f"node {node.id} pos {lon:.6f},{lat:.6f},{alt:.6f}")
+                continue
+            x, y, _ = node.position.get()
+            if x is not None and y is not None:
+                convert.append(node)
+        if not convert:
+            return
+        xs, ys, zs = zip(*[x.position.get() for x in convert])
+        lats, lons, alts = self.session.location.getgeo_many(xs, ys, zs)
+        for node, lon, lat, alt in zip(convert, lons, lats, alts):
+            self.cmd(f"node {node.id} pos {lon:.6f},{lat:.6f},{alt:.6f}")
+
     def delete_node(self, node_id: int) -> None:
         """
         Handle deleting a node in SDT.
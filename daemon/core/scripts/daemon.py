@@ -12,6 +12,7 @@ from configparser import ConfigParser
 from pathlib import Path
 
 from core import constants
+from core.api.grpc.aioserver import AsyncCoreGrpcServer
 from core.api.grpc.server import CoreGrpcServer
 from core.constants import CORE_CONF_DIR, COREDPY_VERSION
 from core.emulator.coreemu import CoreEmu
@@ -38,7 +39,10 @@ def cored(cfg):
     """
     # initialize grpc api
     coreemu = CoreEmu(cfg)
-    grpc_server = CoreGrpcServer(coreemu)
+    if cfg.get("grpcasync", "0") == "1":
+        grpc_server = AsyncCoreGrpcServer(coreemu)
+    else:
+        grpc_server = CoreGrpcServer(coreemu)
     address_config = cfg["grpcaddress"]
     port_config = cfg["grpcport"]
     grpc_address = f"{address_config}:{port_config}"
@@ -86,6 +90,13 @@ def get_merged_config(filename):
         dest="grpcaddress",
         help=f"grpc address to listen on; default {default_address}",
     )
+    parser.add_argument(
+        "--grpc-async",
+        action="store_const",
+        const="1",
+        dest="grpcasync",
+        help="run streaming grpc rpcs using asyncio, default is false",
+    )
     parser.add_argument(
         "-l", "--logfile", help=f"core logging configuration; default {default_log}"
     )
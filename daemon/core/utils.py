@@ -4,6 +4,7 @@ Miscellaneous utility functions, wrappers around some subprocess procedures.
 
 import concurrent.futures
 import fcntl
+import functools
 import hashlib
 import importlib
 import inspect
@@ -12,6 +13,7 @@ import logging
 import logging.config
 import os
 import random
+import selectors
 import shlex
 import shutil
 import sys
@@ -19,7 +21,8 @@ import threading
 from collections import OrderedDict
 from pathlib import Path
 from queue import Queue
-from subprocess import PIPE, STDOUT, Popen
+from subprocess import PIPE, STDOUT, Popen, TimeoutExpired
+from types import ModuleType
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -49,6 +52,8 @@ T = TypeVar("T")
 
 DEVNULL = open(os.devnull, "wb")
 IFACE_CONFIG_FACTOR: int = 1000
+CMD_STREAM_SIZE: int = 64 * 1024
+CMD_STREAM_KILL_TIMEOUT: float = 1.0
 
 
 def execute_script(coreemu: "CoreEmu", file_path: Path, args: str) -> None:
@@ -214,6 +219,7 @@ def cmd(
     cwd: Path = None,
     wait: bool = True,
     shell: bool = False,
+    data: str = None,
 ) -> str:
     """
     Execute a command on the host and returns the combined stderr stdout output.
@@ -223,6 +229,7 @@ def cmd(
     :param cwd: directory to run command in
     :param wait: True to wait for status, False otherwise
     :param shell: True to use shell, False otherwise
+    :param data: data to write to the command stdin, requires waiting
     :return: combined stdout and stderr
     :raises CoreCommandError: when there is a non-zero exit status or the file to
         execute is not found
@@ -233,9 +240,19 @@ def cmd(
         args = shlex.split(args)
     try:
         output = PIPE if wait else DEVNULL
-        p = Popen(args, stdout=output, stderr=output, env=env, cwd=cwd, shell=shell)
+        stdin = PIPE if data is not None else None
+        p = Popen(
+            args,
+            stdin=stdin,
+            stdout=output,
+            stderr=output,
+            env=env,
+            cwd=cwd,
+            shell=shell,
+        )
         if wait:
-            stdout, stderr = p.communicate()
+            stdin_data = data.encode("utf-8") if data is not None else None
+            stdout, stderr = p.communicate(stdin_data)
             stdout = stdout.decode("utf-8").strip()
             stderr = stderr.decode("utf-8").strip()
             status = p.wait()
@@ -249,6 +266,151 @@ def cmd(
         raise CoreCommandError(1, input_args, "", e.strerror)
 
 
+class CmdStream:
+    """
+    Runs a command on the host, providing its stdout and stderr output as it is
+    produced, using non-blocking reads of the command pipes.
+    """
+
+    def __init__(self, args: str, env: Dict[str, str] = None, cwd: Path = None) -> None:
+        """
+        Create a CmdStream instance, starting the command.
+
+        :param args: command arguments
+        :param env: environment to run command with
+        :param cwd: directory to run command in
+        :raises CoreCommandError: when the file to execute is not found
+        """
+        logger.debug("command stream cwd(%s): %s", cwd, args)
+        self.args: str = args
+        try:
+            self.process: Popen = Popen(
+                shlex.split(args),
+                stdin=PIPE,
+                stdout=PIPE,
+                stderr=PIPE,
+                env=env,
+                cwd=cwd,
+            )
+        except OSError as e:
+            logger.error("cmd stream error: %s", e.strerror)
+            raise CoreCommandError(1, args, "", e.strerror)
+        # commands are not provided input, close stdin for them to see end of file
+        self.process.stdin.close()
+        self.stderr_fd: int = self.process.stderr.fileno()
+        self.selector: selectors.BaseSelector = selectors.DefaultSelector()
+        for pipe in (self.process.stdout, self.process.stderr):
+            os.set_blocking(pipe.fileno(), False)
+            self.selector.register(pipe, selectors.EVENT_READ)
+
+    def __enter__(self) -> "CmdStream":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @property
+    def done(self) -> bool:
+        """
+        Check if all output has been read.
+
+        :return: True when stdout and stderr have been closed, False otherwise
+        """
+        return not self.selector.get_map()
+
+    def fds(self) -> List[int]:
+        """
+        Retrieve the file descriptors for output that is still open.
+
+        :return: open output file descriptors
+        """
+        return list(self.selector.get_map())
+
+    def read_fd(self, fd: int) -> Optional[bytes]:
+        """
+        Read available output from a command pipe, closing it on end of file.
+
+        :param fd: file descriptor of pipe to read
+        :return: output read, empty when nothing is available, None on end of file
+        """
+        try:
+            data = os.read(fd, CMD_STREAM_SIZE)
+        except BlockingIOError:
+            return b""
+        except OSError as e:
+            logger.error("cmd stream read error: %s", e.strerror)
+            data = b""
+        if not data:
+            key = self.selector.unregister(fd)
+            key.fileobj.close()
+            return None
+        return data
+
+    def is_stderr(self, fd: int) -> bool:
+        """
+        Check if a file descriptor is for the command stderr.
+
+        :param fd: file descriptor to check
+        :return: True for stderr, False otherwise
+        """
+        return fd == self.stderr_fd
+
+    def read(self, timeout: float = None) -> List[Tuple[bool, bytes]]:
+        """
+        Wait for and read available output.
+
+        :param timeout: max time to wait for output, None to wait indefinitely
+        :return: list of output read, as tuples of is stderr and output, empty
+            when no output was available within the timeout
+        """
+        results = []
+        for key, _ in self.selector.select(timeout):
+            is_stderr = self.is_stderr(key.fd)
+            data = self.read_fd(key.fd)
+            if data:
+                results.append((is_stderr, data))
+        return results
+
+    def wait(self) -> int:
+        """
+        Wait for the command to exit.
+
+        :return: command exit status
+        """
+        return self.process.wait()
+
+    def stop(self, timeout: float = CMD_STREAM_KILL_TIMEOUT) -> None:
+        """
+        Stop the command if still running, terminating it and killing it when
+        not exited within a timeout. Output remaining is still readable, safe to
+        call from other threads.
+
+        :param timeout: time to wait for command to exit after terminating
+        :return: nothing
+        """
+        if self.process.poll() is not None:
+            return
+        logger.debug("terminating command stream: %s", self.args)
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def close(self) -> None:
+        """
+        Stop the command if still running and close its output pipes.
+
+        :return: nothing
+        """
+        self.stop()
+        for fd in self.fds():
+            key = self.selector.unregister(fd)
+            key.fileobj.close()
+        self.selector.close()
+
+
 def run_cmds(args: List[str], wait: bool = True, shell: bool = False) -> List[str]:
     """
     Execute a series of commands on the host and returns a list of the combined stderr
@@ -369,6 +531,20 @@ def load_config(file_path: Path, d: Dict[str, str]) -> None:
             logger.exception("error reading file to dict: %s", file_path)
 
 
+@functools.lru_cache(maxsize=None)
+def get_numpy() -> Optional[ModuleType]:
+    """
+    Retrieve numpy, used to vectorize calculations when available.
+
+    :return: numpy module, None when it cannot be imported
+    """
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        logger.debug("numpy not installed, using scalar calculations")
+        return None
+
+
 def load_module(import_statement: str, clazz: Generic[T]) -> List[T]:
     classes = []
     try:
@@ -605,3 +781,13 @@ class SetQueue(Queue):
     def _get(self):
         key, _ = self.queue.popitem(last=False)
         return key
+
+    def discard(self, item: Any) -> None:
+        """
+        Remove an item from the queue, if present.
+
+        :param item: item to remove
+        :return: nothing
+        """
+        with self.mutex:
+            self.queue.pop(item, None)
@@ -89,6 +89,36 @@ class TestEmane:
         status = ping(node1, node2, ip_prefix2, count=5)
         assert not status
 
+    def test_startup_netlink(self, session: Session, ip_prefixes: IpPrefixes):
+        """
+        Test emane startup phases, using netlink to detect nem devices.
+
+        :param session: session for test
+        :param ip_prefixes: generates ip addresses for nodes
+        """
+        # given
+        session.options.set("netlink", "1")
+        session.set_location(47.57917, -122.13232, 2.00000, 1.0)
+        options = EmaneNet.create_options()
+        options.emane_model = EmaneRfPipeModel.name
+        emane_net = session.add_node(EmaneNet, options=options)
+        nodes = []
+        for i in range(3):
+            node = session.add_node(CoreNode)
+            node.setposition(x=150 * (i + 1), y=150)
+            iface_data = ip_prefixes.create_iface(node)
+            session.add_link(node.id, emane_net.id, iface1_data=iface_data)
+            nodes.append(node)
+
+        # when
+        session.instantiate()
+
+        # then
+        phases = ["setup", "xml", "daemons", "devices"]
+        assert list(session.emane.startup_times) == phases
+        status = ping(nodes[0], nodes[2], ip_prefixes)
+        assert not status
+
     @pytest.mark.parametrize("model", _EMANE_MODELS)
     def test_models(
         self, session: Session, model: Type[EmaneModel], ip_prefixes: IpPrefixes
@@ -0,0 +1,63 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from core.errors import CoreCommandError
+from core.nodes.agent import NodeAgent, NodeAgentClient
+
+
+@pytest.fixture
+def agent_client(tmp_path: Path) -> NodeAgentClient:
+    path = tmp_path / "node.agent"
+    agent = NodeAgent(path)
+    thread = threading.Thread(target=agent.serve_forever, daemon=True)
+    thread.start()
+    client = NodeAgentClient(path)
+    client.connect()
+    yield client
+    client.close()
+    agent.shutdown()
+    agent.server_close()
+
+
+class TestNodeAgent:
+    def test_cmd(self, agent_client: NodeAgentClient):
+        # when
+        output = agent_client.cmd("echo hello")
+
+        # then
+        assert output == "hello"
+
+    def test_cmd_shell(self, agent_client: NodeAgentClient):
+        # when
+        output = agent_client.cmd("echo hello | tr a-z A-Z", shell=True)
+
+        # then
+        assert output == "HELLO"
+
+    def test_cmd_error(self, agent_client: NodeAgentClient):
+        # when
+        with pytest.raises(CoreCommandError) as e:
+            agent_client.cmd("exit 3", shell=True)
+
+        # then
+        assert e.value.returncode == 3
+
+    def test_cmd_concurrent(self, agent_client: NodeAgentClient):
+        # given
+        results = []
+
+        def run(value: int) -> None:
+            results.append(agent_client.cmd(f"echo {value}"))
+
+        threads = [threading.Thread(target=run, args=(x,)) for x in range(10)]
+
+        # when
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # then
+        assert sorted(results, key=int) == [str(x) for x in range(10)]
@@ -0,0 +1,52 @@
+import io
+import zlib
+from pathlib import Path
+
+import pytest
+
+from core.api.grpc.chunks import read_chunks, write_chunks
+from core.errors import CoreError
+
+
+class TestChunks:
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_round_trip(self, tmpdir, compress: bool):
+        # given
+        file_path = Path(tmpdir.join("file"))
+        contents = bytes(range(256)) * 1000
+        file_path.write_bytes(contents)
+        output = io.BytesIO()
+
+        # when
+        chunks = list(read_chunks(file_path, compress, size=1000))
+        written = write_chunks(chunks, output, compress, size=1000)
+
+        # then
+        assert len(chunks) > 1
+        assert written == len(contents)
+        assert output.getvalue() == contents
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_empty_file(self, tmpdir, compress: bool):
+        # given
+        file_path = Path(tmpdir.join("file"))
+        file_path.write_bytes(b"")
+        output = io.BytesIO()
+
+        # when
+        chunks = list(read_chunks(file_path, compress))
+        written = write_chunks(chunks, output, compress)
+
+        # then
+        assert len(chunks) == 1
+        assert written == 0
+
+    def test_invalid_compressed_data(self):
+        # given
+        data = zlib.compress(b"data" * 100)
+
+        # when
+        with pytest.raises(CoreError):
+            write_chunks([data[:-4]], io.BytesIO(), compress=True)
+        with pytest.raises(CoreError):
+            write_chunks([b"invalid"], io.BytesIO(), compress=True)
@@ -0,0 +1,108 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from core.emulator.deferred import DeferredCommands, parse_failures
+from core.errors import CoreCommandError
+
+
+class BatchRunner:
+    def __init__(self, error: CoreCommandError = None) -> None:
+        self.error: CoreCommandError = error
+        self.batches: List[List[str]] = []
+        self.args: List[str] = []
+
+    def __call__(self, args: str) -> str:
+        self.args.append(args)
+        path = Path(args.split()[-1])
+        self.batches.append(path.read_text().splitlines())
+        if self.error:
+            raise self.error
+        return ""
+
+
+class TestDeferred:
+    def test_parse_failures(self):
+        # given
+        output = (
+            'Cannot find device "veth1"\n'
+            "Command failed /tmp/batch:2\n"
+            "RTNETLINK answers: File exists\n"
+            "Command failed /tmp/batch:5\n"
+        )
+
+        # when
+        failures = parse_failures(output)
+
+        # then
+        assert failures == {
+            2: 'Cannot find device "veth1"',
+            5: "RTNETLINK answers: File exists",
+        }
+
+    def test_flush_batches(self, tmp_path: Path):
+        # given
+        run = BatchRunner()
+        deferred = DeferredCommands("host", run, tmp_path)
+        deferred.add("ip link add name a type veth peer name b")
+        deferred.add("tc qdisc replace dev a root handle 10: netem delay 10us")
+        deferred.add("ethtool -K a rx off tx off")
+        deferred.add("ip link set a up")
+
+        # when
+        errors = deferred.flush()
+
+        # then
+        assert not errors
+        assert len(run.args) == 3
+        assert run.args[0].startswith("ip -force -batch")
+        assert run.args[1].startswith("tc -force -batch")
+        assert run.args[2].startswith("bash")
+        assert run.batches[0] == [
+            "link add name a type veth peer name b",
+            "link set a up",
+        ]
+        assert deferred.is_empty()
+        assert not list(tmp_path.iterdir())
+
+    def test_flush_error_origin(self, tmp_path: Path):
+        # given
+        stderr = 'Cannot find device "c"\nCommand failed /tmp/batch:2'
+        run = BatchRunner(CoreCommandError(1, "ip", "", stderr))
+        deferred = DeferredCommands("host", run, tmp_path)
+        deferred.add("ip link set a up", "link one")
+        deferred.add("ip link set c up", "link two")
+
+        # when
+        errors = deferred.flush()
+
+        # then
+        assert len(errors) == 1
+        assert errors[0].startswith("link two")
+        assert 'Cannot find device "c"' in errors[0]
+
+    def test_callbacks_after_commands(self, tmp_path: Path):
+        # given
+        run = BatchRunner()
+        deferred = DeferredCommands("host", run, tmp_path)
+        results = []
+        deferred.add("ip link set a up")
+        deferred.add_callback(lambda: results.append(len(run.args)))
+
+        # when
+        deferred.flush()
+
+        # then
+        assert results == [1]
+
+    @pytest.mark.parametrize("origin", [None, "link"])
+    def test_add_origin(self, tmp_path: Path, origin: str):
+        # given
+        deferred = DeferredCommands("host", BatchRunner(), tmp_path, lambda: "node")
+
+        # when
+        deferred.add("ip link set a up", origin)
+
+        # then
+        assert deferred.ip[0].origin == (origin or "node")
@@ -0,0 +1,79 @@
+import threading
+import time
+
+from core.location.event import EventLoop
+
+
+class TestEventLoop:
+    def test_events_run_in_order(self):
+        # given
+        event_loop = EventLoop()
+        results = []
+        event_loop.add_event(0.02, results.append, 2)
+        event_loop.add_event(0.01, results.append, 1)
+        event_loop.add_event(0.01, results.append, 3)
+        done = threading.Event()
+        event_loop.add_event(0.03, done.set)
+
+        # when
+        event_loop.run()
+        done.wait(5)
+        event_loop.stop()
+
+        # then
+        assert results == [1, 3, 2]
+
+    def test_earlier_event_wakes_scheduler(self):
+        # given
+        event_loop = EventLoop()
+        event_loop.run()
+        event_loop.add_event(60, lambda: None)
+        done = threading.Event()
+
+        # when
+        start = time.monotonic()
+        event_loop.add_event(0.01, done.set)
+        result = done.wait(5)
+        elapsed = time.monotonic() - start
+        event_loop.stop()
+
+        # then
+        assert result
+        assert elapsed < 1
+
+    def test_single_scheduler_thread(self):
+        # given
+        event_loop = EventLoop()
+        event_loop.run()
+        threads = set()
+        done = threading.Event()
+
+        def record() -> None:
+            threads.add(threading.get_ident())
+
+        # when
+        for i in range(20):
+            event_loop.add_event(i * 0.001, record)
+        event_loop.add_event(0.05, done.set)
+        done.wait(5)
+        event_loop.stop()
+
+        # then
+        assert len(threads) == 1
+        assert event_loop.thread is None
+
+    def test_stop_cancels_pending_events(self):
+        # given
+        event_loop = EventLoop()
+        results = []
+        event_loop.run()
+        event_loop.add_event(0.05, results.append, 1)
+
+        # when
+        event_loop.stop()
+        time.sleep(0.1)
+
+        # then
+        assert not results
+        assert not event_loop.queue
+        assert not event_loop.running
@@ -0,0 +1,64 @@
+from typing import List, Optional, Tuple
+
+import pytest
+from mock import patch
+
+from core.location import geo
+from core.location.geo import GeoLocation
+
+_POINTS: List[Tuple[float, float, Optional[float]]] = [
+    (0.0, 0.0, None),
+    (150.0, 300.0, 0.0),
+    (1000.0, 750.0, 25.0),
+]
+
+
+def create_location() -> GeoLocation:
+    location = GeoLocation()
+    location.setrefgeo(47.57917, -122.13232, 2.0)
+    location.refscale = 150.0
+    return location
+
+
+class TestGeoLocation:
+    def test_getgeo_many(self):
+        # given
+        location = create_location()
+        expected = [location.getgeo(*x) for x in _POINTS]
+        xs, ys, zs = zip(*_POINTS)
+
+        # when
+        lats, lons, alts = location.getgeo_many(xs, ys, zs)
+
+        # then
+        assert list(zip(lats, lons, alts)) == pytest.approx(expected)
+
+    def test_getxyz_many(self):
+        # given
+        location = create_location()
+        geos = [location.getgeo(*x) for x in _POINTS]
+        expected = [location.getxyz(*x) for x in geos]
+        lats, lons, alts = zip(*geos)
+
+        # when
+        xs, ys, zs = location.getxyz_many(lats, lons, alts)
+
+        # then
+        assert list(zip(xs, ys, zs)) == pytest.approx(expected)
+
+    def test_many_without_numpy(self):
+        # given
+        location = create_location()
+        xs, ys, zs = zip(*_POINTS)
+        expected = location.getgeo_many(xs, ys, zs)
+
+        # when
+        with patch.object(geo, "np", None):
+            lats, lons, alts = location.getgeo_many(xs, ys, zs)
+            empty = location.getxyz_many([], [], [])
+
+        # then
+        assert lats == pytest.approx(list(expected[0]))
+        assert lons == pytest.approx(list(expected[1]))
+        assert alts == pytest.approx(list(expected[2]))
+        assert empty == ([], [], [])
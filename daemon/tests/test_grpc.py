@@ -34,12 +34,19 @@ from core.api.grpc.wrappers import (
 )
 from core.emane.models.ieee80211abg import EmaneIeee80211abgModel
 from core.emane.nodes import EmaneNet
-from core.emulator.data import EventData, IpPrefixes, NodeData
-from core.emulator.enumerations import EventTypes, ExceptionLevels, MessageFlags
-from core.errors import CoreError
+from core.emulator.changes import SessionChanges
+from core.emulator.data import EventData, IpPrefixes, LinkData, NodeData
+from core.emulator.enumerations import (
+    EventTypes,
+    ExceptionLevels,
+    LinkTypes,
+    MessageFlags,
+)
+from core.errors import CoreCommandError, CoreError
 from core.location.mobility import BasicRangeModel, Ns2ScriptedMobility
 from core.nodes.base import CoreNode
 from core.nodes.network import SwitchNode, WlanNode
+from core.utils import CmdStream
 from core.xml.corexml import CoreXmlWriter
 
 
@@ -217,6 +224,62 @@ class TestGrpc:
         assert len(session.nodes) == 1
         assert len(session.links) == 0
 
+    def test_get_session_changes(
+        self, grpc_server: CoreGrpcServer, ip_prefixes: IpPrefixes
+    ):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        node1 = session.add_node(CoreNode)
+        node2 = session.add_node(CoreNode)
+        switch = session.add_node(SwitchNode)
+        iface1_data = ip_prefixes.create_iface(node1)
+        iface1, iface2 = session.add_link(node1.id, switch.id, iface1_data)
+        with client.context_connect():
+            changes = client.get_session_changes(session.id)
+        version = changes.version
+
+        # when
+        session.set_node_pos(node1, 10, 20)
+        session.delete_link(node1.id, switch.id, iface1.id, iface2.id)
+        session.delete_node(node2.id)
+        with client.context_connect():
+            changes = client.get_session_changes(session.id, version)
+            unchanged = client.get_session_changes(session.id, changes.version)
+
+        # then
+        assert changes.session is None
+        assert changes.version > version
+        assert [x.id for x in changes.nodes] == [node1.id]
+        assert changes.nodes[0].position.x == 10
+        assert changes.deleted_node_ids == [node2.id]
+        assert len(changes.links) == 0
+        assert len(changes.deleted_links) == 1
+        assert changes.deleted_links[0].node1_id == node1.id
+        assert changes.deleted_links[0].iface1.id == iface1.id
+        assert unchanged.version == changes.version
+        assert len(unchanged.nodes) == 0
+        assert len(unchanged.deleted_node_ids) == 0
+
+    def test_get_session_changes_truncated(self, grpc_server: CoreGrpcServer):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        session.changes = SessionChanges(size=2)
+        node = session.add_node(CoreNode)
+        for x in range(3):
+            session.set_node_pos(node, x, x)
+
+        # when
+        with client.context_connect():
+            changes = client.get_session_changes(session.id, 1)
+
+        # then
+        assert changes.session is not None
+        assert changes.version == session.changes.version
+        assert len(changes.session.nodes) == 1
+        assert len(changes.nodes) == 0
+
     def test_get_sessions(self, grpc_server: CoreGrpcServer):
         # given
         client = CoreGrpcClient()
@@ -363,6 +426,97 @@ class TestGrpc:
         # then
         assert (expected_status, expected_output) == output
 
+    def test_node_command_stream(self, grpc_server: CoreGrpcServer):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        command = "sh -c 'echo out; echo err >&2; exit 3'"
+
+        # when
+        with patch.object(CoreNode, "create_cmd", side_effect=lambda x, y: x):
+            with client.context_connect():
+                outputs = list(client.node_command_stream(session.id, node.id, command))
+
+        # then
+        assert b"".join(x.stdout for x in outputs) == b"out\n"
+        assert b"".join(x.stderr for x in outputs) == b"err\n"
+        assert outputs[-1].exited is True
+        assert outputs[-1].return_code == 3
+
+    def test_node_command_stream_cancel(self, grpc_server: CoreGrpcServer):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        command = "sh -c 'echo started; exec sleep 30'"
+        streams = []
+
+        def cmd_stream(args: str, shell: bool = False) -> CmdStream:
+            stream = CmdStream(args)
+            streams.append(stream)
+            return stream
+
+        # when
+        with patch.object(node, "cmd_stream", side_effect=cmd_stream):
+            with client.context_connect():
+                for output in client.node_command_stream(session.id, node.id, command):
+                    assert output.stdout == b"started\n"
+                    break
+        for _ in range(50):
+            if streams[0].process.poll() is not None:
+                break
+            time.sleep(0.1)
+
+        # then
+        assert streams[0].process.poll() is not None
+
+    def test_nodes_command(self, grpc_server: CoreGrpcServer):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        node1 = session.add_node(CoreNode)
+        node2 = session.add_node(CoreNode)
+
+        def cmd(node: CoreNode, args: str, wait: bool, shell: bool) -> str:
+            if node.id == node2.id and args == "fail":
+                raise CoreCommandError(1, args, "", "failed")
+            return f"{node.name} {args}"
+
+        # when
+        with patch.object(CoreNode, "cmd", autospec=True, side_effect=cmd):
+            with client.context_connect():
+                results = client.nodes_command(
+                    session.id, [node1.id, node2.id], ["hello", "fail"], workers=2
+                )
+                results = {x.node_id: x.results for x in results}
+
+        # then
+        assert len(results) == 2
+        assert [x.command for x in results[node1.id]] == ["hello", "fail"]
+        assert results[node1.id][0].output == f"{node1.name} hello"
+        assert results[node1.id][1].return_code == 0
+        assert results[node2.id][1].return_code == 1
+        assert results[node2.id][1].output == "failed"
+        assert all(x.duration >= 0 for x in results[node2.id])
+
+    def test_nodes_command_negative_workers(self, grpc_server: CoreGrpcServer):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+
+        # when
+        with patch.object(CoreNode, "cmd", return_value="output"):
+            with client.context_connect():
+                results = list(
+                    client.nodes_command(session.id, [node.id], ["cmd"], workers=-1)
+                )
+
+        # then
+        assert len(results) == 1
+        assert results[0].results[0].output == "output"
+
     def test_get_node_terminal(self, grpc_server: CoreGrpcServer):
         # given
         client = CoreGrpcClient()
@@ -406,6 +560,116 @@ class TestGrpc:
         assert result is True
         assert session_id is not None
 
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_save_xml_stream(
+        self, grpc_server: CoreGrpcServer, tmpdir: TemporaryFile, compress: bool
+    ):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        session.add_node(CoreNode)
+        tmp = Path(tmpdir.join("text.xml"))
+
+        # when
+        with client.context_connect():
+            client.save_xml_stream(session.id, tmp, compress)
+
+        # then
+        assert tmp.read_text().startswith("<?xml")
+        assert "<device " in tmp.read_text()
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_open_xml_stream(
+        self, grpc_server: CoreGrpcServer, tmpdir: TemporaryFile, compress: bool
+    ):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        tmp = Path(tmpdir.join("text.xml"))
+        session.save_xml(tmp)
+
+        # when
+        with client.context_connect():
+            result, session_id = client.open_xml_stream(tmp, compress=compress)
+
+        # then
+        assert result is True
+        new_session = grpc_server.coreemu.sessions[session_id]
+        assert node.id in new_session.nodes
+        assert new_session.file_path == tmp
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_upload_node_file(
+        self, grpc_server: CoreGrpcServer, tmpdir: TemporaryFile, compress: bool
+    ):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        src_path = Path(tmpdir.join("upload"))
+        contents = b"0123456789" * 20000
+        src_path.write_bytes(contents)
+        uploaded = {}
+
+        def copy_file(src: Path, dst: Path, mode: int = None) -> None:
+            uploaded[dst] = (src.read_bytes(), mode)
+
+        # when
+        with patch.object(node, "copy_file", side_effect=copy_file):
+            with client.context_connect():
+                size = client.upload_node_file(
+                    session.id, node.id, src_path, "/tmp/upload", compress=compress
+                )
+
+        # then
+        assert size == len(contents)
+        assert uploaded[Path("/tmp/upload")] == (contents, 0o644)
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_download_node_file(
+        self, grpc_server: CoreGrpcServer, tmpdir: TemporaryFile, compress: bool
+    ):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        dst_path = Path(tmpdir.join("download"))
+        contents = b"0123456789" * 20000
+
+        def get_file(src: Path, dst: Path) -> None:
+            assert src == Path("/tmp/download")
+            dst.write_bytes(contents)
+
+        # when
+        with patch.object(node, "get_file", side_effect=get_file):
+            with client.context_connect():
+                size = client.download_node_file(
+                    session.id, node.id, "/tmp/download", dst_path, compress
+                )
+
+        # then
+        assert size == len(contents)
+        assert dst_path.read_bytes() == contents
+
+    def test_download_node_file_error(
+        self, grpc_server: CoreGrpcServer, tmpdir: TemporaryFile
+    ):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        dst_path = Path(tmpdir.join("download"))
+
+        # when
+        with patch.object(node, "get_file", side_effect=FileNotFoundError("missing")):
+            with pytest.raises(grpc.RpcError) as e:
+                with client.context_connect():
+                    client.download_node_file(session.id, node.id, "/tmp/x", dst_path)
+
+        # then
+        assert e.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+
     def test_add_link(self, grpc_server: CoreGrpcServer):
         # given
         client = CoreGrpcClient()
@@ -772,6 +1036,173 @@ class TestGrpc:
             # then
             queue.get(timeout=5)
 
+    def test_node_events_cached(self, grpc_server: CoreGrpcServer):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        wlan = session.add_node(WlanNode)
+        queue1 = Queue()
+        queue2 = Queue()
+
+        # when
+        with client.context_connect():
+            client.events(session.id, queue1.put, [wrappers.EventType.NODE])
+            client.events(session.id, queue2.put, [wrappers.EventType.NODE])
+            time.sleep(0.1)
+            session.broadcast_node(wlan)
+            event1 = queue1.get(timeout=5)
+            event2 = queue2.get(timeout=5)
+            wlan.position.set(50, 60)
+            client.set_wlan_config(session.id, wlan.id, {"range": "333"})
+            session.broadcast_node(wlan)
+            event3 = queue1.get(timeout=5)
+
+        # then
+        assert event1.node_event.node == event2.node_event.node
+        node = event3.node_event.node
+        assert node.position.x == 50
+        assert node.position.y == 60
+        assert node.wlan_config["range"].value == "333"
+
+    def test_batched_node_events(self, grpc_server: CoreGrpcServer):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        node1 = session.add_node(CoreNode)
+        node2 = session.add_node(CoreNode)
+        queue = Queue()
+
+        def handle_event(event: Event) -> None:
+            assert event.session_id == session.id
+            assert event.node_event is not None
+            queue.put(event)
+
+        # when
+        with client.context_connect():
+            client.events(session.id, handle_event, batch_window=100)
+            time.sleep(0.1)
+            for _ in range(10):
+                session.broadcast_node(node1)
+                session.broadcast_node(node2)
+            session.broadcast_node(node1, MessageFlags.DELETE)
+
+            # then
+            events = [queue.get(timeout=5) for _ in range(3)]
+            time.sleep(0.2)
+            assert queue.empty()
+        node_ids = [x.node_event.node.id for x in events]
+        assert node_ids == [node1.id, node2.id, node1.id]
+        assert events[2].node_event.message_type == wrappers.MessageType.DELETE
+
+    def test_batched_wireless_link_events(
+        self, grpc_server: CoreGrpcServer, ip_prefixes: IpPrefixes
+    ):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        wlan1 = session.add_node(WlanNode)
+        wlan2 = session.add_node(WlanNode)
+        node1 = session.add_node(CoreNode)
+        node2 = session.add_node(CoreNode)
+        for wlan in (wlan1, wlan2):
+            for node in (node1, node2):
+                iface_data = ip_prefixes.create_iface(node)
+                session.add_link(node.id, wlan.id, iface_data)
+        queue = Queue()
+
+        # when
+        with client.context_connect():
+            client.events(session.id, queue.put, batch_window=100)
+            time.sleep(0.1)
+            for _ in range(5):
+                for wlan in (wlan1, wlan2):
+                    link_data = LinkData(
+                        message_type=MessageFlags.NONE,
+                        type=LinkTypes.WIRELESS,
+                        node1_id=node1.id,
+                        node2_id=node2.id,
+                        network_id=wlan.id,
+                    )
+                    session.broadcast_link(link_data)
+            events = [queue.get(timeout=5) for _ in range(2)]
+            time.sleep(0.2)
+
+        # then
+        assert queue.empty()
+        network_ids = [x.link_event.link.network_id for x in events]
+        assert network_ids == [wlan1.id, wlan2.id]
+
+    def test_filtered_events(
+        self, grpc_server: CoreGrpcServer, ip_prefixes: IpPrefixes
+    ):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        switch1 = session.add_node(SwitchNode)
+        switch2 = session.add_node(SwitchNode)
+        node1 = session.add_node(CoreNode)
+        node2 = session.add_node(CoreNode)
+        session.add_link(node1.id, switch1.id, ip_prefixes.create_iface(node1))
+        session.add_link(node2.id, switch2.id, ip_prefixes.create_iface(node2))
+        queue = Queue()
+
+        # when
+        with client.context_connect():
+            client.events(session.id, queue.put, network_ids=[switch1.id])
+            time.sleep(0.1)
+            for core_link in session.link_manager.links():
+                session.broadcast_link(core_link.get_data(MessageFlags.NONE))
+            session.broadcast_node(node1)
+            session.broadcast_node(node2)
+            session.broadcast_node(switch2)
+            session.broadcast_node(switch1)
+            events = [queue.get(timeout=5) for _ in range(3)]
+            time.sleep(0.2)
+
+        # then
+        assert queue.empty()
+        assert events[0].link_event.link.node2_id == switch1.id
+        assert events[1].node_event.node.id == node1.id
+        assert events[2].node_event.node.id == switch1.id
+
+    def test_filtered_events_combined(
+        self, grpc_server: CoreGrpcServer, ip_prefixes: IpPrefixes
+    ):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        switch1 = session.add_node(SwitchNode)
+        switch2 = session.add_node(SwitchNode)
+        node1 = session.add_node(CoreNode)
+        node2 = session.add_node(CoreNode)
+        node3 = session.add_node(CoreNode)
+        session.add_link(node1.id, switch1.id, ip_prefixes.create_iface(node1))
+        session.add_link(node2.id, switch2.id, ip_prefixes.create_iface(node2))
+        session.add_link(node3.id, switch2.id, ip_prefixes.create_iface(node3))
+        queue = Queue()
+
+        # when
+        with client.context_connect():
+            client.events(
+                session.id, queue.put, node_ids=[node2.id], network_ids=[switch1.id]
+            )
+            time.sleep(0.1)
+            for core_link in session.link_manager.links():
+                session.broadcast_link(core_link.get_data(MessageFlags.NONE))
+            for node in [node1, node2, node3, switch1, switch2]:
+                session.broadcast_node(node)
+            events = [queue.get(timeout=5) for _ in range(5)]
+            time.sleep(0.2)
+
+        # then
+        assert queue.empty()
+        link_ids = [
+            (x.link_event.link.node1_id, x.link_event.link.node2_id) for x in events[:2]
+        ]
+        assert link_ids == [(node1.id, switch1.id), (node2.id, switch2.id)]
+        node_ids = [x.node_event.node.id for x in events[2:]]
+        assert node_ids == [node1.id, node2.id, switch1.id]
+
     def test_throughputs(self, request, grpc_server: CoreGrpcServer):
         if request.config.getoption("mock"):
             pytest.skip("mocking calls")
@@ -887,6 +1318,49 @@ class TestGrpc:
         assert node.position.x == x
         assert node.position.y == y
 
+    def test_move_nodes_batch(self, grpc_server: CoreGrpcServer):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        node1 = session.add_node(CoreNode)
+        node2 = session.add_node(CoreNode)
+        streamer = MoveNodesStreamer(session.id, source="test")
+        streamer.send_positions([node1.id, node2.id], [(10.0, 15.0), (20.0, 25.0)])
+        streamer.send_positions([node1.id], [(30.0, 35.0)])
+        streamer.stop()
+        node_data = []
+
+        # when
+        sdt = session.sdt
+        with patch.object(sdt, "edit_nodes") as edit_nodes:
+            with patch.object(sdt, "handle_node_update") as handle_node_update:
+                handlers = [handle_node_update, node_data.append]
+                with patch.object(session, "node_handlers", handlers):
+                    with client.context_connect():
+                        client.move_nodes(streamer)
+
+        # then
+        assert node1.position.get()[:2] == (30.0, 35.0)
+        assert node2.position.get()[:2] == (20.0, 25.0)
+        assert edit_nodes.call_count == 2
+        handle_node_update.assert_not_called()
+        assert [x.node for x in node_data] == [node1, node2, node1]
+        assert all(x.source == "test" for x in node_data)
+
+    def test_move_nodes_batch_exception(self, grpc_server: CoreGrpcServer):
+        # given
+        client = CoreGrpcClient()
+        session = grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        streamer = MoveNodesStreamer(session.id)
+        streamer.send_positions([node.id, node.id + 1], [(10.0, 15.0), (20.0, 25.0)])
+        streamer.stop()
+
+        # when
+        with pytest.raises(grpc.RpcError):
+            with client.context_connect():
+                client.move_nodes(streamer)
+
     def test_move_nodes_geo(self, grpc_server: CoreGrpcServer):
         # given
         client = CoreGrpcClient()
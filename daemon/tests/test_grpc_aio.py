@@ -0,0 +1,202 @@
+import threading
+import time
+from pathlib import Path
+from queue import Queue
+
+import pytest
+from mock import patch
+
+from core.api.grpc import core_pb2
+from core.api.grpc.aioserver import AsyncCoreGrpcServer
+from core.api.grpc.client import CoreGrpcClient, MoveNodesStreamer
+from core.api.grpc.wrappers import Event
+from core.emulator.data import EventData
+from core.emulator.enumerations import EventTypes
+from core.nodes.base import CoreNode
+
+ADDRESS = "localhost:50052"
+MAX_WORKERS = 4
+
+
+@pytest.fixture(scope="module")
+def module_aio_grpc(global_coreemu):
+    grpc_server = AsyncCoreGrpcServer(global_coreemu, max_workers=MAX_WORKERS)
+    thread = threading.Thread(target=grpc_server.listen, args=(ADDRESS,))
+    thread.daemon = True
+    thread.start()
+    time.sleep(0.5)
+    yield grpc_server
+    grpc_server.stop()
+
+
+@pytest.fixture
+def aio_grpc_server(module_aio_grpc):
+    yield module_aio_grpc
+    for session in module_aio_grpc.coreemu.sessions.values():
+        session.set_state(EventTypes.CONFIGURATION_STATE)
+    module_aio_grpc.coreemu.shutdown()
+
+
+class TestAsyncGrpc:
+    def test_session_events(self, aio_grpc_server: AsyncCoreGrpcServer):
+        # given
+        client = CoreGrpcClient(ADDRESS)
+        session = aio_grpc_server.coreemu.create_session()
+        queue = Queue()
+
+        def handle_event(event: Event) -> None:
+            assert event.session_id == session.id
+            assert event.session_event is not None
+            queue.put(event)
+
+        # when
+        with client.context_connect():
+            client.events(session.id, handle_event)
+            time.sleep(0.1)
+            event_data = EventData(
+                event_type=EventTypes.RUNTIME_STATE, time=str(time.monotonic())
+            )
+            session.broadcast_event(event_data)
+
+            # then
+            queue.get(timeout=5)
+
+    def test_batched_events(self, aio_grpc_server: AsyncCoreGrpcServer):
+        # given
+        client = CoreGrpcClient(ADDRESS)
+        session = aio_grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        queue = Queue()
+
+        def handle_event(event: Event) -> None:
+            assert event.node_event is not None
+            queue.put(event)
+
+        # when
+        with client.context_connect():
+            client.events(session.id, handle_event, batch_window=100)
+            time.sleep(0.1)
+            for _ in range(10):
+                session.broadcast_node(node)
+
+            # then
+            queue.get(timeout=5)
+            time.sleep(0.2)
+            assert queue.empty()
+
+    def test_streams_do_not_block_unary(self, aio_grpc_server: AsyncCoreGrpcServer):
+        # given
+        client = CoreGrpcClient(ADDRESS)
+        session = aio_grpc_server.coreemu.create_session()
+
+        # when
+        with client.context_connect():
+            for _ in range(MAX_WORKERS * 2):
+                client.events(session.id, lambda x: None)
+                client.cpu_usage(1, lambda x: None)
+            time.sleep(0.1)
+            sessions = client.get_sessions()
+
+        # then
+        assert session.id in [x.id for x in sessions]
+
+    def test_nodes_command(self, aio_grpc_server: AsyncCoreGrpcServer):
+        # given
+        client = CoreGrpcClient(ADDRESS)
+        session = aio_grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+
+        # when
+        with patch.object(CoreNode, "cmd", return_value="output"):
+            with client.context_connect():
+                results = list(client.nodes_command(session.id, [node.id], ["cmd"]))
+
+        # then
+        assert len(results) == 1
+        assert results[0].results[0].output == "output"
+
+    def test_nodes_command_cancel(self, aio_grpc_server: AsyncCoreGrpcServer):
+        # given
+        client = CoreGrpcClient(ADDRESS)
+        session = aio_grpc_server.coreemu.create_session()
+        nodes = [session.add_node(CoreNode) for _ in range(3)]
+        release = threading.Event()
+        ran = []
+
+        def cmd(node: CoreNode, args: str, wait: bool, shell: bool) -> str:
+            ran.append(node.id)
+            if node.id == nodes[1].id:
+                release.wait(5)
+            return args
+
+        request = core_pb2.NodesCommandRequest(
+            session_id=session.id,
+            node_ids=[x.id for x in nodes],
+            commands=["cmd"],
+            workers=1,
+        )
+
+        # when
+        with patch.object(CoreNode, "cmd", autospec=True, side_effect=cmd):
+            with client.context_connect():
+                stream = client.stub.NodesCommand(request)
+                response = next(stream)
+                stream.cancel()
+                time.sleep(0.2)
+                release.set()
+                time.sleep(0.2)
+
+        # then
+        assert response.node_id == nodes[0].id
+        assert ran == [nodes[0].id, nodes[1].id]
+
+    def test_open_xml_stream(self, aio_grpc_server: AsyncCoreGrpcServer, tmpdir):
+        # given
+        client = CoreGrpcClient(ADDRESS)
+        session = aio_grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        tmp = Path(tmpdir.join("text.xml"))
+        session.save_xml(tmp)
+
+        # when
+        with client.context_connect():
+            result, session_id = client.open_xml_stream(tmp, compress=True)
+
+        # then
+        assert result is True
+        assert node.id in aio_grpc_server.coreemu.sessions[session_id].nodes
+
+    def test_node_command_stream(self, aio_grpc_server: AsyncCoreGrpcServer):
+        # given
+        client = CoreGrpcClient(ADDRESS)
+        session = aio_grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        command = "sh -c 'echo out; echo err >&2; exit 3'"
+
+        # when
+        with patch.object(CoreNode, "create_cmd", side_effect=lambda x, y: x):
+            with client.context_connect():
+                outputs = list(client.node_command_stream(session.id, node.id, command))
+
+        # then
+        assert b"".join(x.stdout for x in outputs) == b"out\n"
+        assert b"".join(x.stderr for x in outputs) == b"err\n"
+        assert outputs[-1].return_code == 3
+
+    def test_move_nodes(self, aio_grpc_server: AsyncCoreGrpcServer):
+        # given
+        client = CoreGrpcClient(ADDRESS)
+        session = aio_grpc_server.coreemu.create_session()
+        node = session.add_node(CoreNode)
+        x, y = 10.0, 15.0
+        streamer = MoveNodesStreamer(session.id)
+        streamer.send_position(node.id, x, y)
+        streamer.stop()
+
+        # when
+        with client.context_connect():
+            client.move_nodes(streamer)
+
+        # then
+        assert node.position.x == x
+        assert node.position.y == y
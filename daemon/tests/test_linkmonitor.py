@@ -0,0 +1,201 @@
+"""
+Unit tests for the EMANE link monitor.
+"""
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from mock import MagicMock, patch
+
+from core.emane import linkmonitor
+from core.emane.linkmonitor import (
+    NEM_SELF,
+    EmaneLinkMonitor,
+    LossTable,
+    get_table_links,
+)
+from core.emulator.enumerations import MessageFlags
+
+_LOSSES: Dict[float, float] = {0.0: 0.0, 5.0: 50.0, 10.0: 90.0, 15.0: 100.0}
+
+
+def create_row(to_nem: int, sinr: float, age: int = 0) -> Tuple:
+    return (to_nem,), (), (), (), (), (sinr,), (age,)
+
+
+class FakeClient:
+    def __init__(self, links: Dict[Tuple[int, int], float]) -> None:
+        self.address: str = "127.0.0.1"
+        self.links: Dict[Tuple[int, int], float] = links
+        self.block: threading.Event = threading.Event()
+        self.block.set()
+        self.calls: int = 0
+
+    def get_links(self, loss_threshold: int) -> Dict[Tuple[int, int], float]:
+        self.calls += 1
+        self.block.wait()
+        if self.links is None:
+            raise ValueError("control port error")
+        return dict(self.links)
+
+    def stop(self) -> None:
+        self.block.set()
+
+
+def create_monitor(clients: List[FakeClient]) -> EmaneLinkMonitor:
+    emane_manager = MagicMock()
+    emane_manager.get_nem_link.side_effect = lambda nem1, nem2, flags: MagicMock(
+        nem1=nem1, nem2=nem2, message_type=flags
+    )
+    monitor = EmaneLinkMonitor(emane_manager)
+    monitor.clients = clients
+    monitor.loss_threshold = 30
+    monitor.link_interval = 1
+    monitor.link_timeout = 4
+    monitor.executor = linkmonitor.futures.ThreadPoolExecutor(max_workers=2)
+    monitor.running = True
+    return monitor
+
+
+def get_sent(monitor: EmaneLinkMonitor) -> List[Tuple[MessageFlags, int, int]]:
+    broadcast_link = monitor.emane_manager.session.broadcast_link
+    sent = []
+    for call in broadcast_link.call_args_list:
+        link = call.args[0]
+        sent.append((link.message_type, link.nem1, link.nem2))
+    broadcast_link.reset_mock()
+    return sent
+
+
+class TestLossTable:
+    def test_get_loss(self):
+        # given
+        loss_table = LossTable(_LOSSES)
+
+        # when
+        losses = [loss_table.get_loss(x) for x in [-5.0, 0.0, 3.0, 10.0, 20.0]]
+
+        # then
+        assert losses == [100.0, 100.0, 50.0, 10.0, 0.0]
+
+    def test_get_losses(self):
+        # given
+        loss_table = LossTable(_LOSSES)
+        sinrs = [-5.0, 0.0, 3.0, 10.0, 20.0]
+
+        # when
+        losses = loss_table.get_losses(sinrs)
+        with patch.object(linkmonitor, "np", None):
+            scalar_table = LossTable(_LOSSES)
+            scalar_losses = scalar_table.get_losses(sinrs)
+
+        # then
+        assert losses == [loss_table.get_loss(x) for x in sinrs]
+        assert scalar_table.sinr_array is None
+        assert scalar_losses == losses
+
+    def test_get_table_links(self):
+        # given
+        loss_table = LossTable(_LOSSES)
+        table = [
+            create_row(2, 12.0),
+            create_row(3, 1.0),
+            create_row(4, 12.0, age=5),
+            create_row(NEM_SELF, 12.0),
+        ]
+
+        # when
+        links = get_table_links(1, loss_table, table, 30)
+
+        # then
+        assert links == {(1, 2): 12.0}
+
+
+class TestEmaneLinkMonitor:
+    def test_update_links(self):
+        # given
+        monitor = create_monitor([])
+
+        # when
+        monitor.update_links({(1, 2): 10.0}, 0)
+        partial = get_sent(monitor)
+        monitor.update_links({(1, 2): 10.0, (2, 1): 11.0}, 1)
+        added = get_sent(monitor)
+        monitor.update_links({(1, 2): 10.0, (2, 1): 11.0}, 2)
+        unchanged = get_sent(monitor)
+        monitor.update_links({(1, 2): 12.0}, 3)
+        updated = get_sent(monitor)
+        monitor.update_links({(1, 2): 12.0}, 6)
+        dead = get_sent(monitor)
+
+        # then
+        assert partial == []
+        assert added == [(MessageFlags.ADD, 1, 2)]
+        assert unchanged == []
+        assert updated == [(MessageFlags.NONE, 1, 2)]
+        assert dead == [(MessageFlags.DELETE, 1, 2)]
+        assert list(monitor.links) == [(1, 2)]
+        assert monitor.complete_links == set()
+
+    def test_check_links(self):
+        # given
+        client1 = FakeClient({(1, 2): 10.0})
+        client2 = FakeClient({(2, 1): 11.0})
+        client3 = FakeClient(None)
+        monitor = create_monitor([client1, client2, client3])
+
+        # when
+        monitor.check_links()
+
+        # then
+        assert get_sent(monitor) == [(MessageFlags.ADD, 1, 2)]
+        assert monitor.stats.clients == 3
+        assert monitor.stats.errors == 1
+        assert monitor.stats.timeouts == 0
+        assert monitor.stats.links == 2
+        monitor.stop()
+
+    def test_check_links_timeout(self):
+        # given
+        client1 = FakeClient({(1, 2): 10.0})
+        client2 = FakeClient({(2, 1): 11.0})
+        client2.block.clear()
+        monitor = create_monitor([client1, client2])
+        monitor.link_interval = 0.1
+
+        # when
+        monitor.check_links()
+        timeout_stats = monitor.stats
+        monitor.check_links()
+        client2.block.set()
+        monitor.link_interval = 1
+        monitor.check_links()
+
+        # then
+        assert timeout_stats.timeouts == 1
+        assert monitor.stats.timeouts == 0
+        assert client1.calls == 3
+        assert client2.calls == 1
+        assert (2, 1) in monitor.links
+        assert monitor.complete_links == {(1, 2)}
+        monitor.stop()
+
+    def test_stop_during_round(self):
+        # given
+        client1 = FakeClient({(1, 2): 10.0})
+        client2 = FakeClient({(2, 1): 11.0})
+        client2.block.clear()
+        monitor = create_monitor([client1, client2])
+        monitor.link_interval = 0.2
+        monitor.thread = threading.Thread(target=monitor.run, daemon=True)
+        monitor.thread.start()
+
+        # when
+        time.sleep(0.05)
+        monitor.stop()
+
+        # then
+        assert monitor.thread is None
+        assert monitor.executor is None
+        assert get_sent(monitor) == []
+        assert monitor.links == {}
@@ -1,8 +1,21 @@
+import mock
 import pytest
 
-from core.location.mobility import WayPoint
+from core.emulator.data import IpPrefixes
+from core.emulator.session import Session
+from core.location.mobility import BasicRangeModel, WayPoint, WayPointMobility
+from core.nodes.base import CoreNode, Position
+from core.nodes.network import WlanNode
 
 POSITION = (0.0, 0.0, 0.0)
+# start x,y and waypoint x,y,z and speed for nodes moved by waypoint mobility
+WAYPOINTS = [
+    ((0, 0), (100.0, 0.0, None, 10.0)),
+    ((10, 10), (50.0, 50.0, 5.0, 0.0)),
+    ((20, 20), (20.0, 20.0, None, 10.0)),
+    ((5, 50), (-100.0, 50.0, None, 20.0)),
+    ((30, 30), (60.0, 70.0, None, 15.0)),
+]
 
 
 class TestMobility:
@@ -17,3 +30,153 @@ class TestMobility:
     )
     def test_waypoint_lessthan(self, wp1, wp2, expected):
         assert (wp1 < wp2) == expected
+
+    @pytest.mark.parametrize("vectorized", [False, True])
+    def test_waypoint_round(
+        self, session: Session, ip_prefixes: IpPrefixes, vectorized: bool
+    ):
+        # given
+        session.options.set("vectorized_mobility", "1" if vectorized else "0")
+        wlan = session.add_node(WlanNode)
+        nodes = []
+        for (x, y), _ in WAYPOINTS:
+            node = session.add_node(CoreNode, position=Position(x=x, y=y))
+            iface_data = ip_prefixes.create_iface(node)
+            session.add_link(node.id, wlan.id, iface1_data=iface_data)
+            nodes.append(node)
+        mobility = WayPointMobility(session, wlan.id)
+        for node, (_, (x, y, z, speed)) in zip(nodes, WAYPOINTS):
+            mobility.addwaypoint(0.0, node.id, x, y, z, speed)
+        mobility.endtime = 0
+        mobility.state = mobility.STATE_RUNNING
+        wlan.wireless_model = mock.MagicMock()
+        mobility.arrays = mobility.create_arrays()
+        mobility.timezero = 0.0
+        mobility.lasttime = 0.0
+        handler = mock.MagicMock()
+        version = session.changes.version
+
+        # when
+        with mock.patch.object(session, "event_loop"):
+            with mock.patch.object(session, "node_handlers", [handler]):
+                with mock.patch("time.monotonic", return_value=1.0):
+                    mobility.runround()
+        session.options.set("vectorized_mobility", "0")
+        _, changes = session.changes.since(version)
+
+        # then
+        assert (mobility.arrays is not None) == vectorized
+        moved_ifaces = wlan.wireless_model.update.call_args[0][0]
+        assert [x.node for x in moved_ifaces] == [
+            nodes[0],
+            nodes[1],
+            nodes[3],
+            nodes[4],
+        ]
+        broadcast_nodes = [x[0][0].node for x in handler.call_args_list]
+        assert broadcast_nodes == [nodes[0], nodes[1], nodes[3], nodes[4]]
+        assert [x.key for x in changes] == [x.id for x in broadcast_nodes]
+        assert nodes[0].position.get() == (10.0, 0.0, None)
+        assert nodes[1].position.get() == (50.0, 50.0, 5.0)
+        assert nodes[2].position.get() == (20.0, 20.0, None)
+        assert nodes[3].position.get() == (0.0, 50.0, None)
+        assert nodes[4].position.get() == pytest.approx((39.0, 42.0, None))
+        assert sorted(mobility.points) == [nodes[0].id, nodes[3].id, nodes[4].id]
+        assert mobility.endtime == 1.0
+
+
+class TestBasicRangeModel:
+    def test_links_within_range(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        wlan = session.add_node(WlanNode)
+        session.mobility.set_model(wlan, BasicRangeModel, {"range": "100"})
+        nodes = []
+        for x in [0, 50, 1000]:
+            node = session.add_node(CoreNode, position=Position(x=x, y=0))
+            iface_data = ip_prefixes.create_iface(node)
+            session.add_link(node.id, wlan.id, iface1_data=iface_data)
+            nodes.append(node)
+        iface1, iface2, iface3 = [x.get_iface(0) for x in nodes]
+
+        # when
+        session.instantiate()
+
+        # then
+        assert wlan.is_linked(min(iface1, iface2), max(iface1, iface2))
+        assert not wlan.is_linked(min(iface1, iface3), max(iface1, iface3))
+        assert wlan.wireless_model.get_candidates(iface3) == []
+
+    def test_unlinks_out_of_neighborhood(
+        self, session: Session, ip_prefixes: IpPrefixes
+    ):
+        # given
+        wlan = session.add_node(WlanNode)
+        session.mobility.set_model(wlan, BasicRangeModel, {"range": "100"})
+        nodes = []
+        for x in [0, 50]:
+            node = session.add_node(CoreNode, position=Position(x=x, y=0))
+            iface_data = ip_prefixes.create_iface(node)
+            session.add_link(node.id, wlan.id, iface1_data=iface_data)
+            nodes.append(node)
+        node1, node2 = nodes
+        iface1, iface2 = node1.get_iface(0), node2.get_iface(0)
+        session.instantiate()
+        assert wlan.is_linked(min(iface1, iface2), max(iface1, iface2))
+
+        # when
+        node2.setposition(5000, 5000)
+
+        # then
+        assert not wlan.is_linked(min(iface1, iface2), max(iface1, iface2))
+        assert iface1 not in wlan.wireless_model.iface_links
+
+    def test_update_moved(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        wlan = session.add_node(WlanNode)
+        session.mobility.set_model(wlan, BasicRangeModel, {"range": "100"})
+        nodes = []
+        for x in [0, 500, 1000]:
+            node = session.add_node(CoreNode, position=Position(x=x, y=0))
+            iface_data = ip_prefixes.create_iface(node)
+            session.add_link(node.id, wlan.id, iface1_data=iface_data)
+            nodes.append(node)
+        ifaces = [x.get_iface(0) for x in nodes]
+        session.instantiate()
+
+        # when
+        for node in nodes:
+            node.position.set(0, 0)
+        moved = list(ifaces)
+        wlan.wireless_model.update(moved)
+
+        # then
+        assert not moved
+        for iface in ifaces:
+            for iface2 in ifaces:
+                if iface < iface2:
+                    assert wlan.is_linked(iface, iface2)
+
+    def test_set_node_positions(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        wlan = session.add_node(WlanNode)
+        session.mobility.set_model(wlan, BasicRangeModel, {"range": "100"})
+        nodes = []
+        for x in [0, 500, 1000]:
+            node = session.add_node(CoreNode, position=Position(x=x, y=0))
+            iface_data = ip_prefixes.create_iface(node)
+            session.add_link(node.id, wlan.id, iface1_data=iface_data)
+            nodes.append(node)
+        ifaces = [x.get_iface(0) for x in nodes]
+        session.instantiate()
+        update = mock.Mock(wraps=wlan.wireless_model.update)
+        wlan.wireless_model.update = update
+
+        # when
+        session.set_node_positions(nodes, [0, 10, 20], [0, 0, 0])
+
+        # then
+        update.assert_called_once()
+        for iface in ifaces:
+            for iface2 in ifaces:
+                if iface < iface2:
+                    assert wlan.is_linked(iface, iface2)
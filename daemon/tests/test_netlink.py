@@ -0,0 +1,95 @@
+import mock
+
+from core.nodes import netlink
+from core.nodes.netclient import NetlinkNetClient, get_net_client
+
+
+class TestNetlink:
+    def test_attr_padding(self):
+        # when
+        data = netlink.attr_str(netlink.IFLA_IFNAME, "eth0")
+
+        # then
+        assert len(data) == 12
+        length, attr_type = netlink.RTA_HEADER.unpack_from(data)
+        assert length == 9
+        assert attr_type == netlink.IFLA_IFNAME
+
+    def test_parse_attrs(self):
+        # given
+        data = netlink.attr_str(netlink.IFLA_IFNAME, "eth0")
+        data += netlink.attr_u32(netlink.IFLA_MTU, 1500)
+
+        # when
+        attrs = netlink.parse_attrs(data)
+
+        # then
+        assert attrs[netlink.IFLA_IFNAME] == b"eth0\0"
+        assert attrs[netlink.IFLA_MTU] == (1500).to_bytes(4, "little")
+
+    def test_get_net_client(self):
+        # when
+        client = get_net_client(False, mock.MagicMock(), use_netlink=True)
+
+        # then
+        assert isinstance(client, NetlinkNetClient)
+
+    def test_batch_single_send(self):
+        # given
+        client = NetlinkNetClient(mock.MagicMock())
+        sock = mock.MagicMock()
+        client.get_socket = mock.MagicMock(return_value=sock)
+
+        # when
+        with client.batch():
+            client.create_veth("veth0", "beth0")
+            client.set_mtu("veth0", 1500)
+            client.device_up("veth0")
+            client.device_up("beth0")
+
+        # then
+        sock.send.assert_called_once()
+        requests = sock.send.call_args[0][0]
+        assert [x.msg_type for x in requests] == [
+            netlink.RTM_NEWLINK,
+            netlink.RTM_SETLINK,
+            netlink.RTM_SETLINK,
+            netlink.RTM_SETLINK,
+        ]
+
+    def test_no_batch_sends_each(self):
+        # given
+        client = NetlinkNetClient(mock.MagicMock())
+        sock = mock.MagicMock()
+        client.get_socket = mock.MagicMock(return_value=sock)
+
+        # when
+        client.device_up("veth0")
+        client.device_down("veth0")
+
+        # then
+        assert sock.send.call_count == 2
+
+    def test_close(self):
+        # given
+        client = NetlinkNetClient(mock.MagicMock(), pid=lambda: 1)
+        sock = mock.MagicMock(pid=1)
+        client.sock = sock
+
+        # when
+        client.close()
+
+        # then
+        sock.close.assert_called_once()
+        assert client.sock is None
+
+    def test_link_watcher(self):
+        # given
+        watcher = netlink.LinkWatcher()
+
+        # when
+        with watcher:
+            missing = watcher.wait(["lo", "missing0"], 0.1)
+
+        # then
+        assert missing == {"missing0"}
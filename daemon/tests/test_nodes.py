@@ -1,10 +1,15 @@
+import threading
+
+import mock
 import pytest
 
-from core.emulator.data import InterfaceData
+from core.emulator.data import InterfaceData, IpPrefixes
 from core.emulator.session import Session
-from core.errors import CoreError
+from core.errors import CoreCommandError, CoreError
+from core.executables import NFTABLES
+from core.nodes import network
 from core.nodes.base import CoreNode
-from core.nodes.network import HubNode, SwitchNode, WlanNode
+from core.nodes.network import HubNode, NftablesQueue, SwitchNode, WlanNode
 
 MODELS = ["router", "host", "PC", "mdr"]
 NET_TYPES = [SwitchNode, HubNode, WlanNode]
@@ -61,6 +66,39 @@ class TestNodes:
         with pytest.raises(CoreError):
             session.get_node(node.id, CoreNode)
 
+    def test_node_delete_drops_deferred(self, session: Session):
+        # given
+        node = session.add_node(CoreNode)
+        shutdown_deferred = []
+
+        def shutdown() -> None:
+            shutdown_deferred.append(session.deferred.get_node(node))
+
+        options = mock.patch.dict(session.options.all(), {"deferred_commands": "1"})
+        servers = mock.patch.dict(session.distributed.servers, clear=True)
+        with options, servers:
+            session.deferred.get_node(node).add("ip address flush dev eth0")
+
+            # when
+            with mock.patch.object(node, "shutdown", side_effect=shutdown):
+                session.delete_node(node.id)
+
+        # then
+        assert shutdown_deferred == [None]
+        assert node.id not in session.deferred.nodes
+
+    def test_node_shutdown_closes_net_client(self, session: Session):
+        # given
+        node = session.add_node(CoreNode)
+
+        # when
+        with mock.patch.object(node.node_net_client, "close") as close:
+            node.shutdown()
+
+        # then
+        close.assert_called_once()
+        assert not node.up
+
     def test_node_add_iface(self, session: Session):
         # given
         node = session.add_node(CoreNode)
@@ -172,3 +210,158 @@ class TestNodes:
         # then
         assert node
         assert node.up
+
+
+class TestNftablesQueue:
+    def test_commit_single_command(self, session: Session):
+        # given
+        wlan = session.add_node(WlanNode)
+        queue = NftablesQueue()
+        cmds = queue.build_cmds(wlan)
+        lines = len(cmds)
+
+        # when
+        with mock.patch("core.utils.cmd") as cmd:
+            queue.commit(wlan, cmds)
+
+        # then
+        cmd.assert_called_once()
+        args, kwargs = cmd.call_args
+        assert args[0] == f"{NFTABLES} -f -"
+        assert kwargs["data"].count("\n") == lines
+        assert "policy drop;" in kwargs["data"]
+        assert queue.commits[-1].name == wlan.brname
+        assert queue.commits[-1].lines == lines
+
+    def test_commit_failure_rebuilds(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        session.options.set("nftables_sets", "1")
+        queue = NftablesQueue()
+        queue.rate = 0.0
+        queue.running = True
+        with mock.patch.object(network, "nft_queue", queue):
+            wlan = session.add_node(WlanNode)
+            node1 = session.add_node(CoreNode)
+            node2 = session.add_node(CoreNode)
+            for node in [node1, node2]:
+                iface_data = ip_prefixes.create_iface(node)
+                session.add_link(node.id, wlan.id, iface1_data=iface_data)
+        session.options.set("nftables_sets", "0")
+        iface1, iface2 = node1.get_iface(0), node2.get_iface(0)
+        with mock.patch("core.utils.cmd"):
+            queue.process(wlan)
+        with mock.patch.object(network, "nft_queue", queue):
+            wlan.link(iface1, iface2)
+        while not queue.updates.empty():
+            queue.updates.get()
+
+        # when
+        error = CoreCommandError(1, "nft", "", "error")
+        with mock.patch("core.utils.cmd", side_effect=error):
+            queue.process(wlan)
+        requeued = queue.updates.get(timeout=5)
+        with mock.patch("core.utils.cmd") as cmd:
+            queue.process(wlan)
+
+        # then
+        assert requeued == wlan
+        data = cmd.call_args[1]["data"]
+        assert data.startswith(f"add table bridge {wlan.brname}")
+        assert f"flush table bridge {wlan.brname}" in data
+        assert wlan.has_nftables_chain
+        assert (iface1, iface2) in wlan.nftables_elements
+
+    def test_link_set_elements(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        session.options.set("nftables_sets", "1")
+        queue = NftablesQueue()
+        queue.start = mock.Mock()
+        with mock.patch.object(network, "nft_queue", queue):
+            wlan = session.add_node(WlanNode)
+            node1 = session.add_node(CoreNode)
+            node2 = session.add_node(CoreNode)
+            for node in [node1, node2]:
+                iface_data = ip_prefixes.create_iface(node)
+                session.add_link(node.id, wlan.id, iface1_data=iface_data)
+        iface1, iface2 = node1.get_iface(0), node2.get_iface(0)
+        with mock.patch("core.utils.cmd") as cmd:
+            queue.process(wlan)
+        assert f"iif . oif @{queue.set_name} accept" in cmd.call_args[1]["data"]
+
+        # when
+        with mock.patch.object(network, "nft_queue", queue):
+            wlan.link(iface1, iface2)
+        with mock.patch("core.utils.cmd") as cmd:
+            queue.process(wlan)
+
+        # then
+        data = cmd.call_args[1]["data"]
+        assert data.startswith(f"add element bridge {wlan.brname}")
+        assert data.count("\n") == 1
+        assert (iface1, iface2) in wlan.nftables_elements
+
+    def test_workers_process_networks_in_parallel(self):
+        # given
+        queue = NftablesQueue()
+        barrier = threading.Barrier(2, timeout=5)
+        processed = []
+        done = threading.Event()
+
+        def process(net: str) -> None:
+            barrier.wait()
+            processed.append(net)
+            if len(processed) == 2:
+                done.set()
+
+        queue.process = process
+
+        # when
+        queue.start()
+        queue.updates.put("net1")
+        queue.updates.put("net2")
+        done.wait(5)
+        queue.stop()
+
+        # then
+        assert sorted(processed) == ["net1", "net2"]
+        assert not queue.run_threads
+
+    def test_restart_keeps_updates(self):
+        # given
+        queue = NftablesQueue()
+        processed = []
+        done = threading.Event()
+
+        def process(net: str) -> None:
+            processed.append(net)
+            done.set()
+
+        queue.process = process
+        queue.start()
+        queue.stop()
+
+        # when
+        queue.updates.put("net1")
+        queue.start()
+        done.wait(5)
+        queue.stop()
+
+        # then
+        assert processed == ["net1"]
+        assert queue.updates.empty()
+
+    def test_metrics(self, session: Session):
+        # given
+        wlan = session.add_node(WlanNode)
+        queue = NftablesQueue()
+        queue.update(wlan)
+
+        # when
+        with mock.patch("core.utils.cmd"):
+            queue.process(wlan)
+        metrics = queue.get_metrics()
+
+        # then
+        assert metrics["commits"] == 1
+        assert metrics["latency_max"] >= queue.commits[-1].duration
+        assert not queue.requested
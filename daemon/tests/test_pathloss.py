@@ -0,0 +1,155 @@
+import math
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+from mock import MagicMock
+
+from core.emane.models.rfpipe import EmaneRfPipeModel
+from core.emane.nodes import EmaneNet
+from core.emane.pathloss import (
+    PathlossEngine,
+    PathlossModel,
+    calc_pathlosses,
+    get_changes,
+)
+from core.emulator.data import IpPrefixes
+from core.emulator.session import Session
+from core.errors import CoreError
+from core.nodes.base import CoreNode
+
+_FREQUENCY: float = 2.347e9
+
+
+def create_nodes(
+    session: Session, ip_prefixes: IpPrefixes, count: int
+) -> Tuple[EmaneNet, List[CoreNode]]:
+    options = EmaneNet.create_options()
+    options.emane_model = EmaneRfPipeModel.name
+    emane_net = session.add_node(EmaneNet, options=options)
+    nodes = []
+    for i in range(count):
+        node = session.add_node(CoreNode)
+        node.setposition(i * 100, 0)
+        iface_data = ip_prefixes.create_iface(node)
+        session.add_link(node.id, emane_net.id, iface1_data=iface_data)
+        nodes.append(node)
+    return emane_net, nodes
+
+
+def create_engine(session: Session, emane_net: EmaneNet) -> PathlossEngine:
+    nems = {iface: i + 1 for i, iface in enumerate(emane_net.get_ifaces())}
+    emane_manager = MagicMock(session=session)
+    emane_manager.get_nem_id.side_effect = lambda x: nems.get(x)
+    emane_manager.get_iface_config.return_value = {"frequency": str(_FREQUENCY)}
+    return PathlossEngine(emane_manager, PathlossModel.FREE_SPACE)
+
+
+class TestPathloss:
+    @pytest.mark.parametrize("model", list(PathlossModel))
+    def test_calc_pathlosses(self, model: PathlossModel):
+        # given
+        positions = np.array([[0.0, 0.0, 0.0], [1000.0, 0.0, 0.0], [0.0, 0.0, 0.0]])
+        free_space = 20 * math.log10(4 * math.pi * 1000 * _FREQUENCY / 299_792_458)
+
+        # when
+        pathlosses = calc_pathlosses(model, positions, _FREQUENCY)
+
+        # then
+        assert pathlosses.shape == (3, 3)
+        assert np.allclose(pathlosses, pathlosses.T)
+        assert pathlosses[0][2] == pathlosses[0][0]
+        if model == PathlossModel.FREE_SPACE:
+            assert pathlosses[0][1] == pytest.approx(free_space)
+        else:
+            assert pathlosses[0][1] > free_space
+
+    def test_get_changes(self):
+        # given
+        nem_ids = [1, 2, 3]
+        previous = np.full((3, 3), np.nan)
+        pathlosses = np.array([[0.0, 80.0, 90.0], [80.0, 0.0, 70.0], [90.0, 70.0, 0.0]])
+
+        # when
+        added, published = get_changes(nem_ids, pathlosses, previous)
+        pathlosses[0][2] = 90.05
+        pathlosses[2][0] = 90.05
+        pathlosses[1][2] = 75.0
+        pathlosses[2][1] = 75.0
+        updated, _ = get_changes(nem_ids, pathlosses, published)
+
+        # then
+        assert added == {
+            1: [(2, 80.0), (3, 90.0)],
+            2: [(1, 80.0), (3, 70.0)],
+            3: [(1, 90.0), (2, 70.0)],
+        }
+        assert updated == {2: [(3, 75.0)], 3: [(2, 75.0)]}
+
+    def test_engine_update(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        emane_net, nodes = create_nodes(session, ip_prefixes, 3)
+        engine = create_engine(session, emane_net)
+        publish_pathlosses = engine.emane_manager.publish_pathlosses
+        ifaces = emane_net.get_ifaces()
+
+        # when
+        engine.update(ifaces)
+        publish_pathlosses.assert_not_called()
+        engine.start(ifaces)
+        added = publish_pathlosses.call_args[0][0]
+        engine.update(ifaces)
+        unchanged = publish_pathlosses.call_args[0][0]
+        nodes[2].setposition(500, 0)
+        engine.update([nodes[2].get_iface(0)])
+        moved = publish_pathlosses.call_args[0][0]
+
+        # then
+        assert sorted(added) == [1, 2, 3]
+        assert all(len(x) == 2 for x in added.values())
+        assert unchanged == {}
+        assert sorted(moved) == [1, 2, 3]
+        assert [x for x, _ in moved[1]] == [3]
+        assert [x for x, _ in moved[3]] == [1, 2]
+
+    def test_engine_publish_locked(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        emane_net, _ = create_nodes(session, ip_prefixes, 2)
+        engine = create_engine(session, emane_net)
+        net_lock = engine.get_net_lock(emane_net.id)
+        locked = []
+        engine.emane_manager.publish_pathlosses.side_effect = lambda x: locked.append(
+            net_lock.locked()
+        )
+
+        # when
+        engine.start(emane_net.get_ifaces())
+
+        # then
+        assert locked == [True]
+        assert not net_lock.locked()
+
+    def test_create_pathloss(self, session: Session):
+        # given
+        session.options.set("emane_pathloss", PathlossModel.LOG_DISTANCE.value)
+        session.options.set("emane_pathloss_exponent", "2.5")
+
+        # when
+        engine = session.emane.create_pathloss()
+        session.options.set("emane_pathloss", "")
+        session.options.set("emane_pathloss_exponent", "3.0")
+        disabled = session.emane.create_pathloss()
+
+        # then
+        assert engine.model == PathlossModel.LOG_DISTANCE
+        assert engine.exponent == 2.5
+        assert disabled is None
+
+    def test_create_pathloss_unknown(self, session: Session):
+        # given
+        session.options.set("emane_pathloss", "unknown")
+
+        # when
+        with pytest.raises(CoreError):
+            session.emane.create_pathloss()
+        session.options.set("emane_pathloss", "")
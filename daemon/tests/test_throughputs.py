@@ -0,0 +1,70 @@
+from typing import List
+
+from mock import MagicMock
+
+from core.api.grpc.throughputs import ThroughputSampler
+from core.emulator.data import IpPrefixes
+from core.emulator.session import Session
+from core.nodes.base import CoreNode
+from core.nodes.network import SwitchNode
+
+
+def create_lines(values: List[tuple]) -> List[str]:
+    lines = []
+    for name, rx, tx in values:
+        counters = [rx, 0, 0, 0, 0, 0, 0, 0, tx, 0, 0, 0, 0, 0, 0, 0]
+        lines.append(f"{name:>10}: {' '.join(str(x) for x in counters)}\n")
+    return lines
+
+
+class TestThroughputSampler:
+    def test_throughputs(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        switch = session.add_node(SwitchNode)
+        node = session.add_node(CoreNode)
+        session.add_link(node.id, switch.id, ip_prefixes.create_iface(node))
+        iface = node.get_iface(0)
+        coreemu = MagicMock(sessions={session.id: session})
+        sampler = ThroughputSampler(coreemu)
+        other = ("beth100.0.1", 0, 0)
+
+        # when
+        sampler.sample(0, create_lines([(iface.localname, 0, 0), other]), 100.0)
+        sampler.sample(1, create_lines([(switch.brname, 100, 100), other]), 101.0)
+        sampler.sample(2, create_lines([(iface.localname, 1000, 500), other]), 102.0)
+        sampler.sample(3, create_lines([(switch.brname, 300, 300), other]), 103.0)
+        event = sampler.get_throughputs(session, 2, end=3)
+        previous_event = sampler.get_throughputs(session, 2, end=2.5)
+
+        # then
+        assert event.time == 103.0
+        assert previous_event.time == 102.0
+        assert len(event.iface_throughputs) == 1
+        iface_throughput = event.iface_throughputs[0]
+        assert iface_throughput.node_id == node.id
+        assert iface_throughput.iface_id == iface.id
+        assert iface_throughput.throughput == 1500 * 8.0 / 2
+        assert len(event.bridge_throughputs) == 1
+        bridge_throughput = event.bridge_throughputs[0]
+        assert bridge_throughput.node_id == switch.id
+        assert bridge_throughput.throughput == 400 * 8.0 / 2
+
+    def test_interfaces_updated(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        switch = session.add_node(SwitchNode)
+        coreemu = MagicMock(sessions={session.id: session})
+        sampler = ThroughputSampler(coreemu)
+        sampler.sample(0, [])
+        node = session.add_node(CoreNode)
+        session.add_link(node.id, switch.id, ip_prefixes.create_iface(node))
+        iface = node.get_iface(0)
+
+        # when
+        sampler.sample(1, create_lines([(iface.localname, 0, 0)]))
+        sampler.sample(2, create_lines([(iface.localname, 100, 0)]))
+        events = sampler.get_history(session, 1, 10, end=2)
+
+        # then
+        throughputs = [x.iface_throughputs for x in events if x.iface_throughputs]
+        assert len(events) == 10
+        assert len(throughputs) == 1
@@ -1,6 +1,8 @@
 import netaddr
+import pytest
 
 from core import utils
+from core.errors import CoreCommandError
 
 
 class TestUtils:
@@ -26,3 +28,40 @@ class TestUtils:
     def test_random_mac(self):
         value = utils.random_mac()
         assert netaddr.EUI(value) is not None
+
+    def test_cmd_stream(self):
+        # given
+        args = "sh -c 'echo out; echo err >&2; exit 2'"
+        stdout, stderr = b"", b""
+
+        # when
+        with utils.CmdStream(args) as stream:
+            while not stream.done:
+                for is_stderr, data in stream.read(1.0):
+                    if is_stderr:
+                        stderr += data
+                    else:
+                        stdout += data
+            status = stream.wait()
+
+        # then
+        assert stdout == b"out\n"
+        assert stderr == b"err\n"
+        assert status == 2
+
+    def test_cmd_stream_stop(self):
+        # given
+        stream = utils.CmdStream("sleep 30")
+
+        # when
+        outputs = stream.read(0.1)
+        stream.close()
+
+        # then
+        assert outputs == []
+        assert stream.process.poll() is not None
+        assert stream.done
+
+    def test_cmd_stream_invalid(self):
+        with pytest.raises(CoreCommandError):
+            utils.CmdStream("invalid-command-name")
@@ -0,0 +1,133 @@
+import mock
+import pytest
+
+from core.emulator.data import IpPrefixes
+from core.emulator.session import Session
+from core.nodes import wireless
+from core.nodes.base import CoreNode, Position
+from core.nodes.wireless import WirelessNode, get_key
+
+
+@pytest.fixture(params=[True, False], ids=["vectorized", "scalar"])
+def use_numpy(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(wireless, "np", None)
+    return request.param
+
+
+def create_wireless(
+    session: Session, ip_prefixes: IpPrefixes, positions
+) -> WirelessNode:
+    wireless_node = session.add_node(WirelessNode)
+    for x, y in positions:
+        node = session.add_node(CoreNode, position=Position(x=x, y=y))
+        iface_data = ip_prefixes.create_iface(node)
+        session.add_link(node.id, wireless_node.id, iface1_data=iface_data)
+    session.instantiate()
+    return wireless_node
+
+
+def get_link(wireless_node: WirelessNode, node1: CoreNode, node2: CoreNode):
+    return wireless_node.links[get_key(node1.id, node2.id)]
+
+
+class TestWireless:
+    def test_links_within_range(
+        self, session: Session, ip_prefixes: IpPrefixes, use_numpy: bool
+    ):
+        # given
+        positions = [(0, 0), (350, 0), (1000, 0)]
+
+        # when
+        wireless_node = create_wireless(session, ip_prefixes, positions)
+
+        # then
+        node1, node2, node3 = [session.get_node(x, CoreNode) for x in (2, 3, 4)]
+        link = get_link(wireless_node, node1, node2)
+        assert link.linked
+        assert link.loss == pytest.approx(50.0)
+        assert get_key(node1.id, node3.id) not in wireless_node.links
+        assert get_key(node2.id, node3.id) not in wireless_node.links
+        assert (wireless_node.positions is not None) == use_numpy
+
+    def test_unchanged_links_not_configured(
+        self, session: Session, ip_prefixes: IpPrefixes, use_numpy: bool
+    ):
+        # given
+        wireless_node = create_wireless(session, ip_prefixes, [(0, 0), (100, 0)])
+        node1 = session.get_node(2, CoreNode)
+        node2 = session.get_node(3, CoreNode)
+
+        # when
+        with mock.patch.object(wireless_node, "link_config") as link_config:
+            node1.setposition(50, 0)
+
+        # then
+        link_config.assert_not_called()
+        assert get_link(wireless_node, node1, node2).linked
+
+    def test_move_out_of_range(
+        self, session: Session, ip_prefixes: IpPrefixes, use_numpy: bool
+    ):
+        # given
+        wireless_node = create_wireless(session, ip_prefixes, [(0, 0), (100, 0)])
+        node1 = session.get_node(2, CoreNode)
+        node2 = session.get_node(3, CoreNode)
+
+        # when
+        node2.setposition(500, 0)
+
+        # then
+        link = get_link(wireless_node, node1, node2)
+        assert not link.linked
+        if use_numpy:
+            assert not wireless_node.linked_state.any()
+
+    def test_calc_links_moved_together(
+        self, session: Session, ip_prefixes: IpPrefixes, use_numpy: bool
+    ):
+        # given
+        positions = [(0, 0), (1000, 0), (2000, 0)]
+        wireless_node = create_wireless(session, ip_prefixes, positions)
+        nodes = [session.get_node(x, CoreNode) for x in (2, 3, 4)]
+
+        # when
+        for node in nodes:
+            node.position.set(0, 0)
+        wireless_node.calc_links([x.get_iface(0) for x in nodes])
+
+        # then
+        assert all(x.linked for x in wireless_node.links.values())
+        assert all(x.loss == 0.0 for x in wireless_node.links.values())
+
+    def test_idle_links_deleted(
+        self, session: Session, ip_prefixes: IpPrefixes, use_numpy: bool
+    ):
+        # given
+        wireless_node = create_wireless(session, ip_prefixes, [(0, 0), (100, 0)])
+        node1 = session.get_node(2, CoreNode)
+        node2 = session.get_node(3, CoreNode)
+        node2.setposition(500, 0)
+        wireless_node.link_timeout = 1
+        link = get_link(wireless_node, node1, node2)
+        link.idle_since -= wireless_node.link_timeout
+
+        # when
+        node2.setposition(600, 0)
+
+        # then
+        assert not wireless_node.links
+        assert link.iface.name not in WirelessNode.devices
+
+    def test_link_control_creates_link(self, session: Session, ip_prefixes: IpPrefixes):
+        # given
+        wireless_node = create_wireless(session, ip_prefixes, [(0, 0), (1000, 0)])
+        node1 = session.get_node(2, CoreNode)
+        node2 = session.get_node(3, CoreNode)
+        assert not wireless_node.links
+
+        # when
+        wireless_node.link_control(node1.id, node2.id, True)
+
+        # then
+        assert get_link(wireless_node, node1, node2).linked
@@ -0,0 +1,69 @@
+"""
+Measures basic range model mobility rounds per second for a given set of node
+counts, with all nodes moving randomly within an area each round.
+
+Requires root, example: sudo python3 basic_range.py -n 50 100 300 -r 50
+"""
+import argparse
+import random
+import time
+
+from core.emulator.coreemu import CoreEmu
+from core.emulator.data import IpPrefixes
+from core.emulator.enumerations import EventTypes
+from core.location.mobility import BasicRangeModel
+from core.nodes.base import CoreNode, Position
+from core.nodes.network import WlanNode
+
+RANGE: int = 275
+
+
+def run(nodes: int, rounds: int, area: int) -> None:
+    coreemu = CoreEmu()
+    session = coreemu.create_session()
+    session.set_state(EventTypes.CONFIGURATION_STATE)
+    ip_prefixes = IpPrefixes(ip4_prefix="10.0.0.0/16")
+    wlan = session.add_node(WlanNode)
+    session.mobility.set_model(wlan, BasicRangeModel, {"range": str(RANGE)})
+    core_nodes = []
+    for _ in range(nodes):
+        position = Position(x=random.uniform(0, area), y=random.uniform(0, area))
+        node = session.add_node(CoreNode, position=position)
+        iface_data = ip_prefixes.create_iface(node)
+        session.add_link(node.id, wlan.id, iface1_data=iface_data)
+        core_nodes.append(node)
+    try:
+        session.instantiate()
+        ifaces = [x.get_iface(0) for x in core_nodes]
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for node in core_nodes:
+                x = min(max(node.position.x + random.uniform(-10, 10), 0), area)
+                y = min(max(node.position.y + random.uniform(-10, 10), 0), area)
+                node.position.set(x, y)
+            wlan.wireless_model.update(list(ifaces))
+        total = time.perf_counter() - start
+        print(
+            f"nodes({nodes}) area({area}) rounds({rounds}) "
+            f"rounds/sec({rounds / total:.2f}) round({total / rounds * 1000:.2f}ms)"
+        )
+    finally:
+        coreemu.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="basic range model benchmark")
+    parser.add_argument(
+        "-n", "--nodes", type=int, nargs="+", default=[50, 100, 300], help="nodes"
+    )
+    parser.add_argument("-r", "--rounds", type=int, default=50, help="rounds to run")
+    parser.add_argument(
+        "-a", "--area", type=int, default=3000, help="width and height of area"
+    )
+    args = parser.parse_args()
+    for nodes in args.nodes:
+        run(nodes, args.rounds, args.area)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Compares session startup time when running network commands individually,
+against deferring them to be ran using ip/tc batch mode, for a chain of nodes.
+
+Requires root, example: sudo python3 deferred_commands.py -n 100
+"""
+import argparse
+import time
+
+from core.emulator.coreemu import CoreEmu
+from core.emulator.data import IpPrefixes
+from core.emulator.enumerations import EventTypes
+from core.nodes.base import CoreNode
+
+
+def run(nodes: int, deferred: bool) -> None:
+    coreemu = CoreEmu()
+    session = coreemu.create_session()
+    session.options.set("deferred_commands", "1" if deferred else "0")
+    ip_prefixes = IpPrefixes(ip4_prefix="10.0.0.0/8")
+    try:
+        start = time.perf_counter()
+        session.set_state(EventTypes.CONFIGURATION_STATE)
+        core_nodes = [session.add_node(CoreNode) for _ in range(nodes)]
+        for node1, node2 in zip(core_nodes, core_nodes[1:]):
+            iface1_data = ip_prefixes.create_iface(node1)
+            iface2_data = ip_prefixes.create_iface(node2)
+            session.add_link(node1.id, node2.id, iface1_data, iface2_data)
+        links = time.perf_counter() - start
+        session.set_state(EventTypes.INSTANTIATION_STATE)
+        exceptions = session.instantiate()
+        total = time.perf_counter() - start
+        mode = "deferred" if deferred else "immediate"
+        print(
+            f"{mode:>9}: nodes({nodes}) links created {links:.3f}s, "
+            f"instantiated {total:.3f}s, errors({len(exceptions)})"
+        )
+    finally:
+        coreemu.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="deferred commands benchmark")
+    parser.add_argument("-n", "--nodes", type=int, default=50, help="nodes to create")
+    args = parser.parse_args()
+    run(args.nodes, False)
+    run(args.nodes, True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Measures event loop scheduling jitter and the number of threads created while
+running periodic events at a given set of rates.
+
+Example: python3 event_loop.py -r 10 100 1000 -d 5
+"""
+import argparse
+import statistics
+import threading
+import time
+from typing import List
+
+from core.location.event import EventLoop
+
+
+class ThreadCounter:
+    """
+    Counts threads started while active, by wrapping threading.Thread.start.
+    """
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.start = threading.Thread.start
+
+    def __enter__(self) -> "ThreadCounter":
+        counter = self
+
+        def start(thread: threading.Thread) -> None:
+            counter.count += 1
+            counter.start(thread)
+
+        threading.Thread.start = start
+        return self
+
+    def __exit__(self, *args) -> None:
+        threading.Thread.start = self.start
+
+
+def run(rate: int, duration: float) -> None:
+    interval = 1.0 / rate
+    total = int(rate * duration)
+    jitter: List[float] = []
+    done = threading.Event()
+    event_loop = EventLoop()
+
+    def tick(expected: float, count: int) -> None:
+        now = time.monotonic()
+        jitter.append(now - expected)
+        if count == total:
+            done.set()
+            return
+        expected += interval
+        event_loop.add_event(expected - now, tick, expected, count + 1)
+
+    with ThreadCounter() as counter:
+        event_loop.run()
+        expected = time.monotonic() + interval
+        event_loop.add_event(interval, tick, expected, 1)
+        done.wait(duration * 2 + 5)
+        event_loop.stop()
+    jitter_ms = sorted(x * 1000 for x in jitter)
+    p99 = jitter_ms[min(len(jitter_ms) - 1, int(len(jitter_ms) * 0.99))]
+    print(
+        f"rate({rate}/s) events({len(jitter)}) threads({counter.count}) "
+        f"jitter mean({statistics.mean(jitter_ms):.3f}ms) "
+        f"p99({p99:.3f}ms) max({jitter_ms[-1]:.3f}ms)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="event loop benchmark")
+    parser.add_argument(
+        "-r", "--rates", type=int, nargs="+", default=[10, 100, 1000], help="rates"
+    )
+    parser.add_argument(
+        "-d", "--duration", type=float, default=5.0, help="seconds per rate"
+    )
+    args = parser.parse_args()
+    for rate in args.rates:
+        run(rate, args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Compares converting x,y,z positions to lon,lat,alt one point at a time, as done
+by GeoLocation.getgeo, against converting all points together using
+GeoLocation.getgeo_many, along with the reverse conversions.
+
+Example: python3 geo_transforms.py -p 1000 10000 -r 5
+"""
+import argparse
+import random
+import time
+
+from core.location.geo import GeoLocation
+
+
+def run(location: GeoLocation, points: int, repeat: int) -> None:
+    xs = [random.uniform(0, 1000) for _ in range(points)]
+    ys = [random.uniform(0, 1000) for _ in range(points)]
+    zs = [0.0] * points
+    lats, lons, alts = location.getgeo_many(xs, ys, zs)
+    tests = [
+        ("getgeo", lambda: [location.getgeo(*x) for x in zip(xs, ys, zs)]),
+        ("getgeo_many", lambda: location.getgeo_many(xs, ys, zs)),
+        ("getxyz", lambda: [location.getxyz(*x) for x in zip(lats, lons, alts)]),
+        ("getxyz_many", lambda: location.getxyz_many(lats, lons, alts)),
+    ]
+    for name, func in tests:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        total = (time.perf_counter() - start) / repeat
+        print(
+            f"points({points}) {name:11} time({total * 1000:.2f}ms) "
+            f"points/sec({points / total:.0f})"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="geo transforms benchmark")
+    parser.add_argument(
+        "-p", "--points", type=int, nargs="+", default=[1000, 10000], help="points"
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="runs to average")
+    args = parser.parse_args()
+    location = GeoLocation()
+    location.setrefgeo(47.57917, -122.13232, 2.0)
+    location.refscale = 150.0
+    for points in args.points:
+        run(location, points, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
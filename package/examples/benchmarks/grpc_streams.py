@@ -0,0 +1,74 @@
+"""
+Opens a number of concurrent streaming rpcs against a running core-daemon and
+measures the latency of unary rpcs while the streams are active, to compare the
+default gRPC server against the asyncio server (core-daemon --grpc-async).
+
+Example: python3 grpc_streams.py -s 0 100 500 1000 -c 50
+"""
+import argparse
+import statistics
+import time
+from typing import List
+
+import grpc
+
+from core.api.grpc import core_pb2
+from core.api.grpc.client import CoreGrpcClient
+
+
+def run(address: str, streams: int, count: int, timeout: float) -> None:
+    client = CoreGrpcClient(address)
+    stream_client = CoreGrpcClient(address)
+    client.connect()
+    stream_client.connect()
+    session_id = client.create_session().id
+    for index in range(streams):
+        if index % 2:
+            stream_client.events(session_id, lambda x: None)
+        else:
+            stream_client.cpu_usage(1, lambda x: None)
+    time.sleep(1)
+    latency: List[float] = []
+    failures = 0
+    for _ in range(count):
+        start = time.monotonic()
+        try:
+            client.stub.GetSessions(core_pb2.GetSessionsRequest(), timeout=timeout)
+            latency.append(time.monotonic() - start)
+        except grpc.RpcError:
+            failures += 1
+    # closing the stream channel cancels all open streams
+    stream_client.close()
+    client.delete_session(session_id)
+    client.close()
+    if latency:
+        latency.sort()
+        mean = statistics.mean(latency) * 1000
+        p99 = latency[max(int(len(latency) * 0.99) - 1, 0)] * 1000
+    else:
+        mean = p99 = float("nan")
+    print(
+        f"streams({streams:5}) get sessions mean({mean:8.3f}ms) "
+        f"p99({p99:8.3f}ms) failures({failures}/{count})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="grpc streams benchmark")
+    parser.add_argument(
+        "-a", "--address", default="localhost:50051", help="core-daemon address"
+    )
+    parser.add_argument(
+        "-s", "--streams", type=int, nargs="+", default=[0, 100, 500, 1000]
+    )
+    parser.add_argument("-c", "--count", type=int, default=50, help="unary rpcs")
+    parser.add_argument(
+        "-t", "--timeout", type=float, default=5.0, help="unary rpc timeout"
+    )
+    args = parser.parse_args()
+    for streams in args.streams:
+        run(args.address, streams, args.count, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compares moving all nodes within a basic range wlan one node at a time, as done
+for individual MoveNodes requests, against moving them together as done for
+packed MoveNodes requests.
+
+Requires root, example: sudo python3 move_nodes.py -n 100 500 1000 -r 20
+"""
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+from core.emulator.coreemu import CoreEmu
+from core.emulator.data import IpPrefixes
+from core.emulator.enumerations import EventTypes
+from core.emulator.session import Session
+from core.location.mobility import BasicRangeModel
+from core.nodes.base import CoreNode, Position
+from core.nodes.network import WlanNode
+
+RANGE: int = 275
+
+
+def next_positions(nodes: List[CoreNode], area: int) -> Tuple[List[float], List[float]]:
+    xs, ys = [], []
+    for node in nodes:
+        xs.append(min(max(node.position.x + random.uniform(-10, 10), 0), area))
+        ys.append(min(max(node.position.y + random.uniform(-10, 10), 0), area))
+    return xs, ys
+
+
+def move_individual(session: Session, nodes: List[CoreNode], area: int) -> None:
+    xs, ys = next_positions(nodes, area)
+    for node, x, y in zip(nodes, xs, ys):
+        session.set_node_pos(node, x, y)
+
+
+def move_batch(session: Session, nodes: List[CoreNode], area: int) -> None:
+    xs, ys = next_positions(nodes, area)
+    session.set_node_positions(nodes, xs, ys)
+
+
+def run(coreemu: CoreEmu, nodes: int, rounds: int, area: int) -> None:
+    session = coreemu.create_session()
+    session.set_state(EventTypes.CONFIGURATION_STATE)
+    ip_prefixes = IpPrefixes(ip4_prefix="10.0.0.0/16")
+    wlan = session.add_node(WlanNode)
+    session.mobility.set_model(wlan, BasicRangeModel, {"range": str(RANGE)})
+    core_nodes = []
+    for _ in range(nodes):
+        position = Position(x=random.uniform(0, area), y=random.uniform(0, area))
+        node = session.add_node(CoreNode, position=position)
+        iface_data = ip_prefixes.create_iface(node)
+        session.add_link(node.id, wlan.id, iface1_data=iface_data)
+        core_nodes.append(node)
+    try:
+        session.instantiate()
+        for name, func in [("individual", move_individual), ("batch", move_batch)]:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                func(session, core_nodes, area)
+            total = time.perf_counter() - start
+            print(
+                f"nodes({nodes}) {name:10} "
+                f"rounds/sec({rounds / total:.2f}) round({total / rounds * 1000:.2f}ms)"
+            )
+    finally:
+        coreemu.delete_session(session.id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="move nodes benchmark")
+    parser.add_argument(
+        "-n", "--nodes", type=int, nargs="+", default=[100, 500, 1000], help="nodes"
+    )
+    parser.add_argument("-r", "--rounds", type=int, default=20, help="rounds to run")
+    parser.add_argument(
+        "-a", "--area", type=int, default=5000, help="width and height of area"
+    )
+    args = parser.parse_args()
+    coreemu = CoreEmu()
+    try:
+        for nodes in args.nodes:
+            run(coreemu, nodes, args.rounds, args.area)
+    finally:
+        coreemu.shutdown()
+
+
+if __name__ == "__main__":
+    main()
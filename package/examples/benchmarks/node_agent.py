@@ -0,0 +1,61 @@
+"""
+Compares node command execution using vcmd per command against the persistent
+node command agent, timing session startup and repeated node commands.
+
+Requires root, example: sudo python3 node_agent.py -n 50 -c 200
+"""
+import argparse
+import time
+
+from core.emulator.coreemu import CoreEmu
+from core.emulator.data import IpPrefixes
+from core.emulator.enumerations import EventTypes
+from core.nodes.base import CoreNode
+from core.nodes.network import SwitchNode
+
+
+def run(nodes: int, commands: int, agent: bool) -> None:
+    coreemu = CoreEmu()
+    session = coreemu.create_session()
+    session.options.set("node_agent", "1" if agent else "0")
+    session.set_state(EventTypes.CONFIGURATION_STATE)
+    ip_prefixes = IpPrefixes(ip4_prefix="10.0.0.0/16")
+    switch = session.add_node(SwitchNode)
+    core_nodes = []
+    for _ in range(nodes):
+        node = session.add_node(CoreNode)
+        iface_data = ip_prefixes.create_iface(node)
+        session.add_link(node.id, switch.id, iface1_data=iface_data)
+        core_nodes.append(node)
+    try:
+        start = time.perf_counter()
+        session.instantiate()
+        startup = time.perf_counter() - start
+        node = core_nodes[0]
+        start = time.perf_counter()
+        for _ in range(commands):
+            node.cmd("ip -o link show")
+        total = time.perf_counter() - start
+        mode = "agent" if agent else "vcmd"
+        print(
+            f"{mode:>5}: startup({nodes} nodes) {startup:.3f}s, "
+            f"commands({commands}) {total:.3f}s, "
+            f"per command {total / commands * 1000:.3f}ms"
+        )
+    finally:
+        coreemu.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="node command agent benchmark")
+    parser.add_argument("-n", "--nodes", type=int, default=20, help="nodes to create")
+    parser.add_argument(
+        "-c", "--commands", type=int, default=100, help="commands to run"
+    )
+    args = parser.parse_args()
+    run(args.nodes, args.commands, False)
+    run(args.nodes, args.commands, True)
+
+
+if __name__ == "__main__":
+    main()
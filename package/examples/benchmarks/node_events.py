@@ -0,0 +1,79 @@
+"""
+Measures node event conversion throughput for event streams, creating node
+protobufs for every event and subscriber against using the shared node protobuf
+cache, within a session containing EMANE configurations.
+
+Example: python3 node_events.py -n 100 -e 50 -s 1 5 10
+"""
+import argparse
+import time
+
+from core.api.grpc import grpcutils
+from core.api.grpc.events import NodeProtoCache
+from core.emane.models.rfpipe import EmaneRfPipeModel
+from core.emulator.coreemu import CoreEmu
+from core.emulator.data import NodeData
+from core.emulator.enumerations import MessageFlags
+from core.nodes.base import CoreNode
+
+
+def convert(session, node_data: NodeData) -> None:
+    # node event conversion prior to caching
+    emane_configs = grpcutils.get_emane_model_configs_dict(session)
+    node_emane_configs = emane_configs.get(node_data.node.id, [])
+    grpcutils.get_node_proto(session, node_data.node, node_emane_configs)
+
+
+def run(
+    coreemu: CoreEmu, nodes: int, emane: int, subscribers: int, rounds: int
+) -> None:
+    session = coreemu.create_session()
+    core_nodes = [session.add_node(CoreNode) for _ in range(nodes)]
+    for node in core_nodes[:emane]:
+        session.emane.set_config(node.id, EmaneRfPipeModel.name, {})
+    node_datas = [NodeData(node=x, message_type=MessageFlags.NONE) for x in core_nodes]
+    try:
+        start = time.monotonic()
+        for _ in range(rounds):
+            for node_data in node_datas:
+                for _ in range(subscribers):
+                    convert(session, node_data)
+        uncached = time.monotonic() - start
+        node_cache = NodeProtoCache(session)
+        start = time.monotonic()
+        for index in range(rounds):
+            for node in core_nodes:
+                node.position.set(index, index)
+                node_data = NodeData(node=node, message_type=MessageFlags.NONE)
+                for _ in range(subscribers):
+                    node_cache.get_node_event(node_data)
+        cached = time.monotonic() - start
+    finally:
+        coreemu.delete_session(session.id)
+    total = nodes * rounds
+    print(
+        f"subscribers({subscribers:3}) "
+        f"uncached({total / uncached:10.1f} events/s) "
+        f"cached({total / cached:10.1f} events/s)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="node events benchmark")
+    parser.add_argument("-n", "--nodes", type=int, default=100, help="nodes")
+    parser.add_argument(
+        "-e", "--emane", type=int, default=50, help="nodes with emane configs"
+    )
+    parser.add_argument("-s", "--subscribers", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("-r", "--rounds", type=int, default=10, help="rounds")
+    args = parser.parse_args()
+    coreemu = CoreEmu()
+    try:
+        for subscribers in args.subscribers:
+            run(coreemu, args.nodes, args.emane, subscribers, args.rounds)
+    finally:
+        coreemu.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compares polling a session by converting the full session, as done for
+GetSession, against converting only changes since the last poll, as done for
+GetSessionChanges, with a number of nodes moving between polls.
+
+Example: python3 session_changes.py -n 100 500 1000 -m 10 -p 50
+"""
+import argparse
+import random
+import time
+
+from core.api.grpc import grpcutils
+from core.api.grpc.events import NodeProtoCache
+from core.emulator.coreemu import CoreEmu
+from core.emulator.data import IpPrefixes
+from core.nodes.base import CoreNode
+from core.nodes.network import SwitchNode
+
+
+def run(coreemu: CoreEmu, nodes: int, moves: int, polls: int) -> None:
+    session = coreemu.create_session()
+    ip_prefixes = IpPrefixes(ip4_prefix="10.0.0.0/16")
+    switch = session.add_node(SwitchNode)
+    core_nodes = []
+    for _ in range(nodes):
+        node = session.add_node(CoreNode)
+        iface_data = ip_prefixes.create_iface(node)
+        session.add_link(node.id, switch.id, iface1_data=iface_data)
+        core_nodes.append(node)
+    node_cache = NodeProtoCache(session)
+    try:
+        version = session.changes.version
+        for name in ["full", "changes"]:
+            start = time.perf_counter()
+            for _ in range(polls):
+                for node in random.sample(core_nodes, moves):
+                    x, y = random.uniform(0, 1000), random.uniform(0, 1000)
+                    session.set_node_pos(node, x, y)
+                if name == "full":
+                    grpcutils.convert_session(session)
+                else:
+                    version, changes = session.changes.since(version)
+                    grpcutils.convert_session_changes(
+                        session, version, changes, node_cache.get_node_proto
+                    )
+            total = time.perf_counter() - start
+            print(
+                f"nodes({nodes}) moves({moves}) {name:7} "
+                f"polls/sec({polls / total:.2f}) poll({total / polls * 1000:.2f}ms)"
+            )
+    finally:
+        coreemu.delete_session(session.id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="session changes benchmark")
+    parser.add_argument(
+        "-n", "--nodes", type=int, nargs="+", default=[100, 500, 1000], help="nodes"
+    )
+    parser.add_argument(
+        "-m", "--moves", type=int, default=10, help="nodes moved between polls"
+    )
+    parser.add_argument("-p", "--polls", type=int, default=50, help="polls to run")
+    args = parser.parse_args()
+    coreemu = CoreEmu()
+    try:
+        for nodes in args.nodes:
+            run(coreemu, nodes, min(args.moves, nodes), args.polls)
+    finally:
+        coreemu.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compares a round of waypoint mobility moving nodes one at a time, against
+moving all nodes together using arrays, as enabled by the vectorized_mobility
+session option. Only moving nodes is measured, link calculations are excluded.
+
+Requires root, example: sudo python3 waypoint_mobility.py -n 1000 5000 -r 20
+"""
+import argparse
+import random
+import time
+
+from core.emulator.coreemu import CoreEmu
+from core.emulator.data import IpPrefixes
+from core.location.mobility import WayPointMobility
+from core.nodes.base import CoreNode, Position
+from core.nodes.network import WlanNode
+
+REFRESH: float = 0.05
+
+
+def run(coreemu: CoreEmu, nodes: int, rounds: int, area: int) -> None:
+    session = coreemu.create_session()
+    ip_prefixes = IpPrefixes(ip4_prefix="10.0.0.0/8")
+    wlan = session.add_node(WlanNode)
+    core_nodes = []
+    for _ in range(nodes):
+        position = Position(x=random.uniform(0, area), y=random.uniform(0, area))
+        node = session.add_node(CoreNode, position=position)
+        iface_data = ip_prefixes.create_iface(node)
+        session.add_link(node.id, wlan.id, iface1_data=iface_data)
+        core_nodes.append(node)
+    starts = [node.position.get() for node in core_nodes]
+    try:
+        for name, vectorized in [("scalar", "0"), ("vectorized", "1")]:
+            session.options.set("vectorized_mobility", vectorized)
+            for node, (x, y, z) in zip(core_nodes, starts):
+                node.position.set(x, y, z)
+            mobility = WayPointMobility(session, wlan.id)
+            mobility.endtime = 0
+            mobility.timezero = mobility.lasttime = time.monotonic()
+            for node in core_nodes:
+                x, y = random.uniform(0, area), random.uniform(0, area)
+                mobility.addwaypoint(0.0, node.id, x, y, None, 5.0)
+            mobility.updatepoints(0.0)
+            mobility.arrays = mobility.create_arrays()
+            ifaces = wlan.get_ifaces()
+            start = time.perf_counter()
+            for _ in range(rounds):
+                if mobility.arrays is not None:
+                    mobility.movenodes(REFRESH)
+                else:
+                    for iface in ifaces:
+                        mobility.movenode(iface.node, REFRESH)
+            total = (time.perf_counter() - start) / rounds
+            print(
+                f"nodes({nodes}) {name:10} round({total * 1000:.2f}ms) "
+                f"refresh({REFRESH * 1000:.0f}ms)"
+            )
+    finally:
+        coreemu.delete_session(session.id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="waypoint mobility benchmark")
+    parser.add_argument(
+        "-n", "--nodes", type=int, nargs="+", default=[1000, 5000], help="nodes"
+    )
+    parser.add_argument("-r", "--rounds", type=int, default=20, help="rounds to run")
+    parser.add_argument("-a", "--area", type=int, default=5000, help="area size")
+    args = parser.parse_args()
+    coreemu = CoreEmu()
+    try:
+        for nodes in args.nodes:
+            run(coreemu, nodes, args.rounds, args.area)
+    finally:
+        coreemu.shutdown()
+
+
+if __name__ == "__main__":
+    main()